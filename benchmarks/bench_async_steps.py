@@ -0,0 +1,224 @@
+"""
+Benchmark comparing the number of Jobs executed per worker process for latency-bound (e.g. HTTP) Steps,
+with synchronous Steps executed by Dramatiq worker threads (Job.execute) and async Steps executed
+in the asyncio worker mode (Job.aexecute), including the engine's database queries.
+
+The Jobs are executed the way process_job executes them (claimed, then executed, or submitted to the event loop
+without waiting for it), by the same number of worker threads in both modes, in a temporary PostgreSQL test database
+created with the provided connection parameters.
+
+Usage:
+    python benchmarks/bench_async_steps.py [--jobs 200] [--steps 3] [--latency 0.05] [--threads 8] [--concurrency 100]
+        [--db-name postgres] [--db-host localhost] [--db-port 5432] [--db-user postgres] [--db-password ...]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import contextlib
+import concurrent.futures
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# latency of the Steps' requests in seconds
+LATENCY = 0.05
+
+
+def define_workflows(steps_count: int):
+    from django_wfe import steps, workflows
+
+    class SyncRequestStep(steps.Step):
+        def execute(self, _input=None, external_input=None, *args, **kwargs):
+            time.sleep(LATENCY)
+            return (_input or 0) + 1
+
+    class AsyncRequestStep(steps.Step):
+        async def execute(self, _input=None, external_input=None, *args, **kwargs):
+            await asyncio.sleep(LATENCY)
+            return (_input or 0) + 1
+
+    defined = {}
+    for name, StepClass in (
+        ("SyncWorkflow", SyncRequestStep),
+        ("AsyncWorkflow", AsyncRequestStep),
+    ):
+        # the same Step repeated in the Workflow has to be a separate class
+        chain = [
+            type(f"{StepClass.__name__}{number}", (StepClass,), {})
+            for number in range(steps_count)
+        ]
+        digraph = {steps.__start__: [chain[0]]}
+        digraph.update(
+            {previous: [next_step] for previous, next_step in zip(chain, chain[1:])}
+        )
+
+        for StepType in chain:
+            StepType.__module__ = __name__
+            globals()[StepType.__name__] = StepType
+
+        WorkflowClass = type(name, (workflows.Workflow,), {"DIGRAPH": digraph})
+        WorkflowClass.__module__ = __name__
+        globals()[name] = WorkflowClass
+        defined[name] = WorkflowClass
+
+    return defined
+
+
+def create_jobs(name: str, jobs: int):
+    from django_wfe.models import Job, Workflow
+
+    workflow = Workflow.objects.get_or_create(name=name, path=f"{__name__}.{name}")[0]
+    created = [Job(workflow=workflow) for _ in range(jobs)]
+    for job in created:
+        job.save()
+
+    return list(Job.objects.select_related("workflow").filter(workflow=workflow))
+
+
+def run_job(job):
+    from django.db import connection
+
+    try:
+        if job.claim():
+            job.execute()
+    finally:
+        connection.close()
+
+
+def bench_threads(jobs: int, threads: int) -> float:
+    created = create_jobs("SyncWorkflow", jobs)
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(run_job, created))
+    return time.perf_counter() - start
+
+
+def bench_event_loop(jobs: int, threads: int) -> float:
+    from django_wfe import aio
+
+    created = create_jobs("AsyncWorkflow", jobs)
+
+    def run_async_job(job):
+        from django.db import connection
+
+        # Dramatiq worker thread returns once its Job is submitted to the event loop
+        try:
+            if job.claim():
+                return aio.submit(job.aexecute())
+        finally:
+            connection.close()
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+        submitted = [
+            future for future in executor.map(run_async_job, created) if future
+        ]
+    concurrent.futures.wait(submitted)
+    for future in submitted:
+        future.result()
+    return time.perf_counter() - start
+
+
+def check_finished(name: str, jobs: int):
+    from django_wfe.models import Job, JobState
+
+    finished = Job.objects.filter(workflow__name=name, state=JobState.FINISHED).count()
+    if finished != jobs:
+        raise RuntimeError(f"Only {finished} of {jobs} {name} Jobs finished.")
+
+
+def main():
+    global LATENCY
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--steps", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument(
+        "--threads", type=int, default=8, help="Dramatiq worker threads"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=100,
+        help="Jobs executed concurrently on the event loop (WFE_ASYNC_CONCURRENCY)",
+    )
+    parser.add_argument("--db-name", default="postgres")
+    parser.add_argument("--db-host", default="localhost")
+    parser.add_argument("--db-port", default="5432")
+    parser.add_argument("--db-user", default="postgres")
+    parser.add_argument("--db-password", default="")
+    args = parser.parse_args()
+
+    LATENCY = args.latency
+
+    sys.path.insert(0, ROOT)
+
+    import django
+    from django.conf import settings
+
+    settings.configure(
+        INSTALLED_APPS=[
+            "django.contrib.contenttypes",
+            "django.contrib.auth",
+            "django_dramatiq",
+            "django_wfe",
+        ],
+        DATABASES={
+            "default": {
+                "ENGINE": "django.db.backends.postgresql_psycopg2",
+                "NAME": args.db_name,
+                "HOST": args.db_host,
+                "PORT": args.db_port,
+                "USER": args.db_user,
+                "PASSWORD": args.db_password,
+            }
+        },
+        DRAMATIQ_BROKER={
+            "BROKER": "dramatiq.brokers.stub.StubBroker",
+            "OPTIONS": {},
+            "MIDDLEWARE": [],
+        },
+        WFE_LOG_DIR=tempfile.mkdtemp(),
+        WFE_ASYNC_CONCURRENCY=args.concurrency,
+        USE_TZ=True,
+    )
+    django.setup()
+
+    from django.db import connection
+
+    define_workflows(args.steps)
+
+    test_database = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        print(
+            f"{args.jobs} jobs x {args.steps} steps, {args.latency * 1000:.0f} ms latency per step"
+        )
+
+        # the Jobs' logs printed by the engine are not shown
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            elapsed = bench_threads(args.jobs, args.threads)
+        check_finished("SyncWorkflow", args.jobs)
+        print(
+            f"sync steps, {args.threads} worker threads: {elapsed:.2f} s, {args.jobs / elapsed:.1f} jobs/s per worker"
+        )
+
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            elapsed = bench_event_loop(args.jobs, args.threads)
+        check_finished("AsyncWorkflow", args.jobs)
+        print(
+            f"async steps, asyncio worker mode ({args.threads} worker threads, "
+            f"{args.concurrency} concurrent jobs): "
+            f"{elapsed:.2f} s, {args.jobs / elapsed:.1f} jobs/s per worker"
+        )
+    finally:
+        connection.creation.destroy_test_db(test_database, verbosity=0)
+
+
+if __name__ == "__main__":
+    main()
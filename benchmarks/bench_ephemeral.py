@@ -0,0 +1,79 @@
+"""
+Benchmark of the ephemeral (in-memory) execution of the Workflows, executing a chain of trivial Steps
+with a Decision, and reporting the number of executed Steps per second.
+
+Usage:
+    python benchmarks/bench_ephemeral.py [--steps 10] [--jobs 20000]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from django.conf import settings
+
+settings.configure()
+
+from django_wfe import ephemeral, steps, workflows
+
+
+class IncrementStep(steps.Step):
+    def execute(self, _input=None, external_input=None, *args, **kwargs):
+        return (_input or 0) + 1
+
+
+class EvenStep(IncrementStep):
+    pass
+
+
+class OddStep(IncrementStep):
+    pass
+
+
+class ParityDecision(steps.Decision):
+    def transition(self, _input=None, external_input=None, *args, **kwargs):
+        return _input % 2
+
+
+def make_workflow(steps_count: int):
+    # chain of IncrementSteps (distinct classes, as the DIGRAPH is keyed by the Step class)
+    chain = [
+        type(f"IncrementStep{i}", (IncrementStep,), {}) for i in range(steps_count)
+    ]
+
+    digraph = {steps.__start__: [chain[0]]}
+    for previous, step in zip(chain, chain[1:]):
+        digraph[previous] = [step]
+    digraph[chain[-1]] = [ParityDecision]
+    digraph[ParityDecision] = [EvenStep, OddStep]
+
+    return type("BenchmarkWorkflow", (workflows.Workflow,), {"DIGRAPH": digraph})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--steps", type=int, default=10, help="number of Steps in the chain"
+    )
+    parser.add_argument("--jobs", type=int, default=20000)
+    args = parser.parse_args()
+
+    WorkflowClass = make_workflow(args.steps)
+
+    executed = 0
+    start = time.perf_counter()
+    for _ in range(args.jobs):
+        executed += len(ephemeral.execute(WorkflowClass))
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{args.jobs} jobs, {executed} steps: {elapsed:.2f} s, "
+        f"{executed / elapsed:,.0f} steps/s, {args.jobs / elapsed:,.0f} jobs/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
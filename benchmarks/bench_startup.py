@@ -0,0 +1,115 @@
+"""
+Benchmark of the Django startup with django_wfe installed: time of django.setup() and of the system checks
+(run by every manage.py command), measured in fresh interpreters, along with the engine's modules imported
+by the startup.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 5] [--broker-url amqp://localhost:5672]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def child(broker_url: str):
+    started = time.perf_counter()
+
+    sys.path.insert(0, ROOT)
+
+    import django
+    from django.conf import settings
+
+    broker = (
+        {
+            "BROKER": "dramatiq.brokers.rabbitmq.RabbitmqBroker",
+            "OPTIONS": {"url": broker_url},
+        }
+        if broker_url
+        else {"BROKER": "dramatiq.brokers.stub.StubBroker", "OPTIONS": {}}
+    )
+    settings.configure(
+        INSTALLED_APPS=[
+            "django.contrib.contenttypes",
+            "django.contrib.auth",
+            "django_dramatiq",
+            "django_wfe",
+        ],
+        DATABASES={
+            "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}
+        },
+        DRAMATIQ_BROKER={**broker, "MIDDLEWARE": []},
+        WFE_WORKFLOWS="django_wfe.tests.wdk_models",
+        WFE_LOG_DIR=tempfile.gettempdir(),
+    )
+    django.setup()
+    setup = time.perf_counter() - started
+
+    from django.core import checks
+
+    started = time.perf_counter()
+    checks.run_checks()
+    check = time.perf_counter() - started
+
+    started = time.perf_counter()
+    checks.run_checks(include_deployment_checks=True)
+    deploy_check = time.perf_counter() - started
+
+    print(
+        json.dumps(
+            {
+                "setup": setup,
+                "check": check,
+                "deploy_check": deploy_check,
+                "modules": sorted(
+                    module
+                    for module in ("django_wfe.models", "django_wfe.tasks")
+                    if module in sys.modules
+                ),
+            }
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--broker-url", help="RabbitMQ broker's URL (a stub broker by default)"
+    )
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.broker_url)
+        return
+
+    command = [sys.executable, os.path.abspath(__file__), "--child"]
+    if args.broker_url:
+        command += ["--broker-url", args.broker_url]
+
+    runs = [
+        json.loads(subprocess.run(command, check=True, capture_output=True).stdout)
+        for _ in range(args.repeat)
+    ]
+
+    for key, label in (
+        ("setup", "django.setup()"),
+        ("check", "system checks"),
+        ("deploy_check", "system checks --deploy"),
+    ):
+        print(
+            f"{label + ':':<25} {statistics.median(run[key] for run in runs) * 1000:.1f} ms (median of {args.repeat})"
+        )
+    print(f"{'imported at startup:':<25} {', '.join(runs[0]['modules']) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
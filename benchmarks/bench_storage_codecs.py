@@ -0,0 +1,102 @@
+"""
+Benchmark of the Job's storage codecs, encoding and decoding a realistic multi-MB step history
+(feature lists with coordinates, floats, datetimes and Decimals returned by the Steps).
+
+Codecs, which dependencies are not installed, are skipped.
+
+Usage:
+    python benchmarks/bench_storage_codecs.py [--steps 20] [--features 2000] [--repeat 5]
+"""
+
+import os
+import sys
+import time
+import random
+import decimal
+import argparse
+import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from django.conf import settings
+
+settings.configure()
+
+from django_wfe.storage_codecs import CODECS, get_codec
+
+
+def make_storage(steps: int, features: int):
+    random.seed(0)
+    now = datetime.datetime(2020, 5, 21, 8, 54)
+
+    def feature(i):
+        return {
+            "id": i,
+            "type": "Feature",
+            "geometry": {
+                "type": "Polygon",
+                "coordinates": [
+                    [
+                        [random.uniform(-180, 180), random.uniform(-90, 90)]
+                        for _ in range(10)
+                    ]
+                ],
+            },
+            "properties": {
+                "name": f"tile_{i}",
+                "acquired": now + datetime.timedelta(minutes=i),
+                "cloud_cover": decimal.Decimal("0.25"),
+                "mean": random.random(),
+            },
+        }
+
+    return {
+        "data": [
+            {
+                "step": f"myapp.steps.Step{n}",
+                "result": [feature(i) for i in range(features)],
+            }
+            for n in range(steps)
+        ]
+    }
+
+
+def bench(codec, storage, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        data = codec.encode(storage)
+    encode = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        codec.decode(data)
+    decode = (time.perf_counter() - start) / repeat
+
+    return len(data), encode, decode
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--steps", type=int, default=20)
+    parser.add_argument("--features", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    storage = make_storage(args.steps, args.features)
+
+    print(f"{'codec':<14}{'size [MB]':>12}{'encode [ms]':>14}{'decode [ms]':>14}")
+    for name in CODECS:
+        try:
+            codec = get_codec(name)
+        except ImportError as e:
+            print(f"{name:<14}skipped ({e})")
+            continue
+
+        size, encode, decode = bench(codec, storage, args.repeat)
+        print(
+            f"{name:<14}{size / 1024 / 1024:>12.2f}{encode * 1000:>14.1f}{decode * 1000:>14.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
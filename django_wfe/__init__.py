@@ -3,8 +3,16 @@ A Django app providing multi-step workflow execution tools.
 """
 
 from django.apps import AppConfig
-from .app_utils import execute_workflow, execute_workflow_sync, provide_input
-
+from .app_utils import (
+    cancel_job,
+    cancel_workflow_jobs,
+    execute_workflow,
+    execute_workflow_ephemeral,
+    execute_workflow_sync,
+    execute_workflows,
+    provide_input,
+    provide_inputs,
+)
 
 VERSION = (0, 1, 0)
 __version__ = ".".join([str(i) for i in VERSION])
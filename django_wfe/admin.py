@@ -1,10 +1,92 @@
+import json
+
 from django.urls import reverse_lazy
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils.functional import cached_property
 from django.utils.html import format_html
 
 
-from .tasks import process_job
-from .models import Workflow, Job
+from .models import Workflow, Job, JobState
+from .settings import WFE_ADMIN_EXACT_COUNT_LIMIT
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator counting the Jobs exactly only up to WFE_ADMIN_EXACT_COUNT_LIMIT. Above the limit, the number
+    of the (filtered) Jobs is estimated by the PostgreSQL planner, instead of scanning the table with COUNT(*).
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return super().count
+
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        if estimate <= WFE_ADMIN_EXACT_COUNT_LIMIT:
+            return super().count
+
+        return estimate
+
+
+class WorkflowListFilter(admin.SimpleListFilter):
+    """
+    Filter of the Jobs' Workflows, listing only the registered (not deleted) Workflows
+    """
+
+    title = "workflow"
+    parameter_name = "workflow"
+
+    def lookups(self, request, model_admin):
+        return (
+            Workflow.objects.filter(deleted=False)
+            .order_by("name")
+            .values_list("id", "name")
+        )
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(workflow_id=self.value())
+        return queryset
+
+
+class JobStateListFilter(admin.SimpleListFilter):
+    """
+    Filter of the Jobs' states, listing all the states instead of querying the distinct states of the Jobs
+    """
+
+    title = "state"
+    parameter_name = "state"
+
+    def lookups(self, request, model_admin):
+        return [
+            (state, state)
+            for state in (
+                JobState.QUEUED,
+                JobState.PENDING,
+                JobState.ONGOING,
+                JobState.INPUT_REQUIRED,
+                JobState.INPUT_RECEIVED,
+                JobState.WAITING,
+                *JobState.TERMINAL,
+            )
+        ]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(state=self.value())
+        return queryset
 
 
 @admin.register(Workflow)
@@ -23,17 +105,75 @@ class WorkflowAdmin(admin.ModelAdmin):
 
 @admin.register(Job)
 class JobAdmin(admin.ModelAdmin):
-    list_display = ("__str__", "workflow", "state", "logs")
-    list_filter = ("workflow", "state")
-    search_fields = ("workflow__path", "state")
+    list_display = ("__str__", "workflow", "state", "created_at", "logs")
+    list_select_related = ("workflow",)
+    # filters backed by the indexes of the Jobs' Workflows, active states and creation time (a range of the BRIN index,
+    # unlike date_hierarchy querying the distinct dates of the Jobs)
+    list_filter = (
+        WorkflowListFilter,
+        JobStateListFilter,
+        ("created_at", admin.DateFieldListFilter),
+    )
+    # Jobs are searched by their ID, or by the exact name or the python path's prefix of their Workflow
+    search_fields = ("=workflow__name", "^workflow__path")
+    paginator = EstimatedCountPaginator
+    # the number of all Jobs is not counted next to the filtered ones
+    show_full_result_count = False
     readonly_fields = ("current_step", "storage", "state", "logfile")
     exclude = ("uuid",)
+    actions = ["cancel_jobs", "rerun_jobs"]
 
     def logs(self, obj):
         return format_html(
             f"<a href='{reverse_lazy('django_wfe:job_logs', args=[obj.id])}'>{obj}</a>"
         )
 
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if search_term.isdigit():
+            return queryset.filter(id=int(search_term)), False
+        if not search_term:
+            return queryset, False
+
+        # the matching Workflows (see search_fields) are fetched first, so the Jobs are filtered with the index
+        # of their Workflow's ID, instead of joining the Workflows to every Job
+        workflow_ids = Workflow.objects.filter(
+            Q(name__iexact=search_term) | Q(path__istartswith=search_term)
+        ).values_list("id", flat=True)
+
+        return queryset.filter(workflow_id__in=list(workflow_ids)), False
+
+    def cancel_jobs(self, request, queryset):
+        cancelled = Job.cancel(queryset)
+        self.message_user(request, f"Cancelled {cancelled} Jobs.")
+
+    cancel_jobs.short_description = "Cancel selected Jobs"
+
+    def rerun_jobs(self, request, queryset):
+        from . import scheduling
+
+        jobs = []
+        with transaction.atomic():
+            for job in (
+                queryset.filter(parent=None, workflow__deleted=False)
+                .select_related("workflow")
+                .order_by("id")
+            ):
+                rerun = Job(
+                    workflow=job.workflow,
+                    storage={"data": [], "input": job.storage.get("input")},
+                )
+                rerun.save()
+                jobs.append(rerun)
+
+        sent = scheduling.submit_many(jobs)
+        self.message_user(
+            request,
+            f"Started {len(jobs)} Jobs ({len(jobs) - len(sent)} queued by the concurrency limits).",
+        )
+
+    rerun_jobs.short_description = "Re-run selected Jobs"
+
     def has_change_permission(self, request, obj=None):
         return False
 
@@ -43,4 +183,4 @@ class JobAdmin(admin.ModelAdmin):
     def save_model(self, request, obj, form, change):
         super().save_model(request, obj, form, change)
         # saving a Jobs instance in the Django Admin Panel also starts the Job execution
-        process_job.send(obj.id)
+        obj.submit()
@@ -0,0 +1,88 @@
+"""
+The module implementing the asyncio worker mode (WFE_ASYNC_WORKER setting), in which Jobs are executed concurrently
+on a single event loop per worker process, instead of occupying Dramatiq worker threads for the whole execution.
+"""
+
+import asyncio
+import logging
+import threading
+import concurrent.futures
+
+from .settings import WFE_ASYNC_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+
+class EventLoopThread(threading.Thread):
+    """
+    Daemon thread running the asyncio event loop shared by all Jobs executed in the worker process
+    """
+
+    def __init__(self, concurrency: int):
+        super().__init__(name="django-wfe-event-loop", daemon=True)
+
+        self.loop = asyncio.new_event_loop()
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.started = threading.Event()
+
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self.started.set)
+        self.loop.run_forever()
+
+    def submit(self, coroutine) -> concurrent.futures.Future:
+        """
+        Method scheduling the coroutine on the event loop.
+
+        The calling thread is blocked only while the event loop is saturated with the maximum number of coroutines,
+        which applies backpressure on the Dramatiq worker consuming the messages.
+
+        :param coroutine: coroutine to be executed
+        :return: future of the coroutine's result
+        """
+        self.slots.acquire()
+
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        future.add_done_callback(self._on_done)
+
+        return future
+
+    def _on_done(self, future: concurrent.futures.Future):
+        self.slots.release()
+
+        if not future.cancelled() and future.exception() is not None:
+            logger.error(
+                "Coroutine executed in the asyncio worker mode failed.",
+                exc_info=future.exception(),
+            )
+
+
+_event_loop_thread = None
+_event_loop_thread_lock = threading.Lock()
+
+
+def get_event_loop_thread() -> EventLoopThread:
+    """
+    Function returning the worker process' event loop thread, starting it on the first call
+
+    :return: EventLoopThread instance
+    """
+    global _event_loop_thread
+
+    with _event_loop_thread_lock:
+        if _event_loop_thread is None:
+            _event_loop_thread = EventLoopThread(WFE_ASYNC_CONCURRENCY)
+            _event_loop_thread.start()
+            _event_loop_thread.started.wait()
+
+    return _event_loop_thread
+
+
+def submit(coroutine) -> concurrent.futures.Future:
+    """
+    Function scheduling the coroutine on the worker process' event loop
+
+    :param coroutine: coroutine to be executed
+    :return: future of the coroutine's result
+    """
+    return get_event_loop_thread().submit(coroutine)
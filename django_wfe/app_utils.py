@@ -2,43 +2,112 @@
 The module implementing functions used among others in the AppConfig, before Django imports work properly.
 As long as this module is imported in django_wfe.__init__, all functions should define imports within themselves.
 """
+
 import typing
+import datetime
 
 
-def execute_workflow(workflow_id: typing.Union[int, str]) -> int:
+def execute_workflow(
+    workflow_id: typing.Union[int, str],
+    deadline: datetime.datetime = None,
+    idempotency_key: str = None,
+    profile: bool = False,
+) -> int:
     """
     A function handling Django WFE Workflow execution order.
 
     :param workflow_id: django_wfe.models.Workflow record's ID
+    :param deadline: time, after which the Job is cancelled if it has not ended
+    :param idempotency_key: key, under which the Job is ordered only once (a repeated call returns the existing Job)
+    :param profile: profile the execution of the Job's Steps (see django_wfe.profiling)
     :return: Ordered workflow's execution ID (django_wfe.models.Job instance's ID)
     """
+    return execute_workflows(
+        workflow_id, [idempotency_key], deadline=deadline, profile=profile
+    )[0]
+
+
+def execute_workflows(
+    workflow_id: typing.Union[int, str],
+    idempotency_keys: typing.List[typing.Optional[str]],
+    deadline: datetime.datetime = None,
+    profile: bool = False,
+) -> typing.List[int]:
+    """
+    A function handling Django WFE Workflow's multiple executions order, a single execution per idempotency key.
+
+    :param workflow_id: django_wfe.models.Workflow record's ID
+    :param idempotency_keys: keys of the executions (already ordered ones are not ordered again, None is never repeated)
+    :param deadline: time, after which the Jobs are cancelled if they have not ended
+    :param profile: profile the execution of the Jobs' Steps (see django_wfe.profiling)
+    :return: Ordered (or already existing) workflow's executions IDs (django_wfe.models.Job instances' IDs)
+    """
     from .models import Workflow, Job
-    from .tasks import process_job
 
-    job = Job(workflow=Workflow.objects.get(id=int(workflow_id)))
-    job.save()
-    process_job.send(job_id=job.id)
+    workflow = Workflow.objects.get(id=int(workflow_id))
+    jobs = Job.create_idempotent(
+        [
+            Job(
+                workflow=workflow,
+                deadline=deadline,
+                idempotency_key=key,
+                profile=profile,
+            )
+            for key in idempotency_keys
+        ]
+    )
 
-    return job.id
+    for job, created in jobs:
+        if created:
+            # the Job may be queued, if its Workflow's concurrency limit is reached
+            job.submit()
+
+    return [job.id for job, _ in jobs]
 
 
-def execute_workflow_sync(workflow_id: typing.Union[int, str]):
+def execute_workflow_sync(
+    workflow_id: typing.Union[int, str], deadline: datetime.datetime = None
+):
     """
     A function handling Django WFE Workflow execution synchronously.
 
     :param workflow_id: django_wfe.models.Workflow record's ID
+    :param deadline: time, after which the Job is cancelled if it has not ended
     :return: Workflow's execution ID (django_wfe.models.Job instance's ID)
     """
     from .models import Workflow, Job
     from .tasks import process_job
 
-    job = Job(workflow=Workflow.objects.get(id=int(workflow_id)))
+    job = Job(workflow=Workflow.objects.get(id=int(workflow_id)), deadline=deadline)
     job.save()
     process_job(job_id=job.id)
 
     return job.id
 
 
+def execute_workflow_ephemeral(
+    workflow: typing.Union[type, str],
+    _input=None,
+    external_inputs: typing.Dict[typing.Union[type, str], typing.Dict] = None,
+) -> typing.List[typing.Dict]:
+    """
+    A function executing Django WFE Workflow in memory, without the database and the Dramatiq workers
+    (for transient Workflows and unit tests of the Workflows' DIGRAPHs).
+
+    :param workflow: class object inheriting from django_wfe.workflows.Workflow or its python path
+    :param _input: initial input of the Workflow (passed to its first Step)
+    :param external_inputs: external inputs of the Steps requiring them, by the Step class or its python path
+    :return: history of the execution: list of the executed Steps' data (python path, result and external data)
+    """
+    from django.utils.module_loading import import_string
+    from . import ephemeral
+
+    if isinstance(workflow, str):
+        workflow = import_string(workflow)
+
+    return ephemeral.execute(workflow, _input=_input, external_inputs=external_inputs)
+
+
 def provide_input(job_id: typing.Union[int, str], external_data: typing.Dict) -> None:
     """
     A function handling Django WFE external input's and resuming the execution of the Workflow.
@@ -53,3 +122,57 @@ def provide_input(job_id: typing.Union[int, str], external_data: typing.Dict) ->
     job = Job.objects.get(id=job_id)
     job.provide_external_input(external_data)
     process_job.send(job.id)
+
+
+def provide_inputs(
+    inputs: typing.Dict[typing.Union[int, str], typing.Dict],
+) -> typing.Dict[int, str]:
+    """
+    A function handling Django WFE external inputs of multiple Jobs at once and resuming the execution of their
+    Workflows. The Jobs are updated in a single transaction, and their execution is ordered with a single group
+    of messages once it's committed. Invalid inputs do not prevent the other Jobs from being resumed.
+
+    :param inputs: a dictionary mapping django_wfe.models.Job records' IDs to their external data
+    :return: a dictionary mapping IDs of the Jobs, which were not resumed, to the errors
+    """
+    import dramatiq
+    from django.db import router, transaction
+    from .models import Job
+    from .tasks import process_job
+
+    using = router.db_for_write(Job)
+
+    with transaction.atomic(using=using):
+        received, errors = Job.provide_external_inputs(inputs, using=using)
+
+        if received:
+            messages = dramatiq.group(
+                process_job.message(job_id=job_id) for job_id in received
+            )
+            transaction.on_commit(messages.run, using=using)
+
+    return errors
+
+
+def cancel_job(job_id: typing.Union[int, str]) -> bool:
+    """
+    A function cancelling the Django WFE Job (along with its sub-workflows' Jobs), unless it has already ended.
+
+    :param job_id: django_wfe.models.Job record's ID
+    :return: True if the Job was cancelled
+    """
+    from .models import Job
+
+    return Job.cancel(Job.objects.filter(id=int(job_id))) > 0
+
+
+def cancel_workflow_jobs(workflow_id: typing.Union[int, str]) -> int:
+    """
+    A function cancelling all not ended Jobs of the Django WFE Workflow.
+
+    :param workflow_id: django_wfe.models.Workflow record's ID
+    :return: number of cancelled Jobs (including their sub-workflows' Jobs)
+    """
+    from .models import Job
+
+    return Job.cancel(Job.objects.filter(workflow_id=int(workflow_id)))
@@ -0,0 +1,222 @@
+"""
+The module implementing the artifact store, keeping large Steps' results outside of the Job's storage.
+
+Results which serialized size exceeds WFE_ARTIFACT_THRESHOLD bytes are saved in the store as content-addressed blobs
+(serialized with the Job's storage codec), and replaced in Job's storage with a reference, which is loaded lazily,
+when the next Step actually reads its _input.
+"""
+
+import os
+import mmap
+import typing
+import hashlib
+import tempfile
+
+from django.utils.functional import SimpleLazyObject
+from django.utils.module_loading import import_string
+
+from .settings import WFE_ARTIFACT_STORE, WFE_ARTIFACT_DIR, WFE_ARTIFACT_THRESHOLD
+from .storage_codecs import get_codec
+
+REFERENCE_KEY = "__artifact__"
+
+
+class BaseArtifactStore:
+    """
+    Base class for artifact store backends, keeping blobs under the keys derived from their content
+    """
+
+    @staticmethod
+    def get_key(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def put(self, data: bytes) -> str:
+        """
+        Method saving the blob in the store
+
+        :param data: blob's content
+        :return: key of the blob
+        """
+        raise NotImplementedError
+
+    def get(self, key: str) -> typing.Union[bytes, mmap.mmap]:
+        """
+        Method reading the blob from the store
+
+        :param key: key of the blob
+        :return: blob's content (bytes-like object)
+        """
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def modified_at(self, key: str) -> typing.Optional[float]:
+        """
+        Method returning the time the blob was last put in the store (so blobs put again, e.g. by a new Job with
+        the same result, are not removed as unreferenced)
+
+        :param key: key of the blob
+        :return: POSIX timestamp, or None if it's not known
+        """
+        return None
+
+
+class FileSystemArtifactStore(BaseArtifactStore):
+    """
+    Artifact store keeping blobs in the local file system (WFE_ARTIFACT_DIR), in the directories sharded by the key
+    """
+
+    def __init__(self, location: str = None):
+        self.location = location or WFE_ARTIFACT_DIR
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.location, key[:2], key[2:4], key)
+
+    def put(self, data: bytes) -> str:
+        key = self.get_key(data)
+        path = self.path(key)
+
+        # blobs are immutable, the same content is stored only once (its modification time is updated)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+            # write to a temporary file first, so incomplete blobs are never visible
+            with tempfile.NamedTemporaryFile(
+                dir=os.path.dirname(path), delete=False
+            ) as file:
+                file.write(data)
+            os.replace(file.name, path)
+
+        return key
+
+    def get(self, key: str) -> typing.Union[bytes, mmap.mmap]:
+        with open(self.path(key), "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return b""
+
+            # the mapping stays valid after the file is closed
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def modified_at(self, key: str) -> typing.Optional[float]:
+        try:
+            return os.path.getmtime(self.path(key))
+        except FileNotFoundError:
+            return None
+
+
+_store = None
+
+
+def get_store() -> BaseArtifactStore:
+    """
+    Function returning the artifact store defined with WFE_ARTIFACT_STORE setting
+
+    :return: BaseArtifactStore subclass instance
+    """
+    global _store
+
+    if _store is None:
+        _store = import_string(WFE_ARTIFACT_STORE)()
+
+    return _store
+
+
+class LazyArtifact(SimpleLazyObject):
+    """
+    Proxy of the artifact's content, loading it from the store on the first access
+    """
+
+    def __init__(self, reference: typing.Dict):
+        self.__dict__["reference"] = reference
+        super().__init__(lambda: load(reference))
+
+
+def is_reference(value) -> bool:
+    return isinstance(value, dict) and REFERENCE_KEY in value
+
+
+def find_references(value) -> typing.Iterator[str]:
+    """
+    Function finding the keys of the artifacts referenced in the Job's storage
+
+    :param value: Job's storage or its part
+    :return: iterator of the artifacts' keys
+    """
+    if is_reference(value):
+        yield value[REFERENCE_KEY]
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from find_references(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from find_references(item)
+
+
+def offload(result, codec: str = None):
+    """
+    Function replacing the Step's result with the artifact reference, if its serialized size exceeds the threshold
+
+    :param result: result of the Step's execution
+    :param codec: name of the Job's storage codec (None: "json"), serializing the result
+    :return: result or its artifact reference
+    """
+    if isinstance(result, LazyArtifact):
+        # the Step passed its _input through, without loading it
+        return result.reference
+
+    if WFE_ARTIFACT_THRESHOLD is None or not isinstance(result, (dict, list, str)):
+        return result
+
+    codec = codec or "json"
+    data = get_codec(codec).encode(result)
+
+    if len(data) <= WFE_ARTIFACT_THRESHOLD:
+        return result
+
+    return {REFERENCE_KEY: get_store().put(data), "size": len(data), "codec": codec}
+
+
+def load(reference: typing.Dict):
+    """
+    Function loading the artifact's content from the store
+
+    :param reference: artifact reference
+    :return: deserialized result
+    """
+    data = get_store().get(reference[REFERENCE_KEY])
+
+    try:
+        # the content is decoded directly from the memory-mapped file
+        return get_codec(reference.get("codec")).decode(data)
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
+
+
+def resolve(value, lazy: bool = False):
+    """
+    Function returning the Step's result, resolving its artifact reference
+
+    :param value: result kept in the Job's storage
+    :param lazy: if True, the artifact is loaded only when the returned object is accessed
+    :return: result of the Step
+    """
+    if not is_reference(value):
+        return value
+
+    return LazyArtifact(value) if lazy else load(value)
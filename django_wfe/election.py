@@ -0,0 +1,131 @@
+"""
+The module implementing the leader election of the wfe_watchdog processes.
+
+Every node may run the wfe_watchdog, while only the elected leader performs the periodic work. With PostgreSQL,
+the leader holds a session-level advisory lock on a dedicated connection. The lock is released by the database
+as soon as the leader's session ends (also when its process is killed, or - detected with TCP keepalives -
+when its node goes down), and another watchdog takes it over on its next attempt. With other databases,
+the leadership is a lease of the Watchdog record, renewed by the leader's heartbeat and taken over once it expires.
+
+The current leader and the time of its last heartbeat are kept in the Watchdog record.
+"""
+
+import os
+import socket
+import datetime
+
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Watchdog
+from .settings import WFE_WATCHDOG_LEASE
+
+# key of the PostgreSQL advisory lock held by the leader
+LEADER_LOCK_KEY = 0x77666502
+
+
+class LeaderElection:
+    """
+    Leader election of the watchdog process, to be attempted periodically with elect()
+    """
+
+    def __init__(self, using: str = "default", node: str = None):
+        self.using = using
+        self.node = node or f"{socket.gethostname()}:{os.getpid()}"
+        self.connection = None
+        self.is_leader = False
+
+    def elect(self) -> bool:
+        """
+        Method acquiring (or keeping) the leadership, and saving the leader's heartbeat
+
+        :return: True if the process is the leader
+        """
+        if connections[self.using].vendor == "postgresql":
+            is_leader = self._lock()
+            if is_leader:
+                Watchdog.objects.using(self.using).filter(pk=1).update(
+                    leader=self.node, heartbeat_at=timezone.now()
+                )
+        else:
+            is_leader = self._lease()
+
+        if is_leader != self.is_leader:
+            print(
+                f"Watchdog {self.node} "
+                f"{'is the leader' if is_leader else 'has lost the leadership'}."
+            )
+        self.is_leader = is_leader
+
+        return is_leader
+
+    def resign(self):
+        """
+        Method releasing the leadership (on the process exit)
+
+        :return: None
+        """
+        self._close()
+
+        Watchdog.objects.using(self.using).filter(pk=1, leader=self.node).update(
+            leader=None
+        )
+        self.is_leader = False
+
+    def _lock(self) -> bool:
+        try:
+            if self.connection is None:
+                wrapper = connections[self.using]
+                self.connection = wrapper.get_new_connection(
+                    wrapper.get_connection_params()
+                )
+                self.connection.autocommit = True
+
+                with self.connection.cursor() as cursor:
+                    # the database detects the leader's node going down within seconds
+                    cursor.execute(
+                        "SET tcp_keepalives_idle = 5; SET tcp_keepalives_interval = 2; "
+                        "SET tcp_keepalives_count = 2"
+                    )
+
+            with self.connection.cursor() as cursor:
+                if self.is_leader:
+                    # the lock is held as long as the session is alive
+                    cursor.execute("SELECT true")
+                else:
+                    cursor.execute("SELECT pg_try_advisory_lock(%s)", [LEADER_LOCK_KEY])
+
+                return cursor.fetchone()[0]
+
+        except Exception as e:
+            print(f"Watchdog {self.node} leader election failed: {e}")
+            self._close()
+            return False
+
+    def _lease(self) -> bool:
+        now = timezone.now()
+        Watchdog.load()
+
+        return (
+            Watchdog.objects.using(self.using)
+            .filter(pk=1)
+            .filter(
+                Q(leader=self.node)
+                | Q(leader=None)
+                | Q(
+                    heartbeat_at__lt=now
+                    - datetime.timedelta(seconds=WFE_WATCHDOG_LEASE)
+                )
+            )
+            .update(leader=self.node, heartbeat_at=now)
+            > 0
+        )
+
+    def _close(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+            self.connection = None
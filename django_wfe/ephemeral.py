@@ -0,0 +1,242 @@
+"""
+The module implementing the ephemeral execution of the Workflows: in memory, without the database, the log file
+and the Dramatiq workers.
+
+It is meant for transient Workflows executed within the request handlers, and for fast unit tests of the Workflows'
+DIGRAPHs. Steps are executed with the same _input, external_input and transition() semantics as by the engine,
+and the history of the execution is kept in the same format as the Job's storage["data"]. Sub-workflows and MapSteps
+are executed inline, while the Steps suspending the execution (e.g. Wait Steps) are not supported. Rate limits,
+retention policies, logs and events of the Steps apply only to the Jobs executed by the engine.
+"""
+
+import typing
+import asyncio
+import functools
+
+from django.utils.module_loading import import_string
+
+from . import steps
+from .exceptions import InputRequired, RuntimeWFEError, Suspended
+
+
+@functools.lru_cache(maxsize=1024)
+def get_plan(StepClass: type) -> typing.Tuple[str, bool, bool]:
+    """
+    Function inspecting the Step class once, instead of on every execution of the Step
+
+    :param StepClass: class object inheriting from django_wfe.steps.Step
+    :return: tuple of the Step's python path, the flag if it requires an external input, and the flag if its
+        execute() and transition() can be called directly (synchronous Step, not overriding the engine's calls)
+    """
+    direct = (
+        StepClass._perform_execute is steps.BaseStep._perform_execute
+        and StepClass._perform_transition is steps.BaseStep._perform_transition
+        and not asyncio.iscoroutinefunction(StepClass.execute)
+    )
+
+    return (
+        f"{StepClass.__module__}.{StepClass.__name__}",
+        bool(StepClass.UserInputSchema.__fields__),
+        direct,
+    )
+
+
+class EphemeralJob:
+    """
+    In-memory counterpart of django_wfe.models.Job, executing the Workflow class directly and passed to its Steps
+
+    Usage:
+    job = EphemeralJob(ApprovalWorkflow, _input=order, external_inputs={ApproveStep: {"approved": True}})
+    history = job.execute()
+    """
+
+    id = pk = None
+    logfile = None
+    wake_at = None
+    deadline = None
+
+    def __init__(
+        self,
+        WorkflowClass: type,
+        _input=None,
+        external_inputs: typing.Dict[typing.Union[type, str], typing.Dict] = None,
+    ):
+        """
+        :param WorkflowClass: class object inheriting from django_wfe.workflows.Workflow
+        :param _input: initial input of the Workflow (passed to its first Step)
+        :param external_inputs: external inputs of the Steps requiring them, by the Step class or its python path
+        """
+        self.workflow = WorkflowClass
+        self.external_inputs = external_inputs or {}
+        self.storage = {"data": []}
+        if _input is not None:
+            self.storage["input"] = _input
+
+        self.current_step = "django_wfe.steps.__start__"
+        self.current_step_number = 0
+        self.progress = None
+
+    @property
+    def result(self):
+        """
+        Result of the last executed Step of the Job (the final result for finished Jobs)
+        """
+        try:
+            return self.storage["data"][-1].get("result")
+        except IndexError:
+            return None
+
+    @property
+    def context(self) -> typing.Dict:
+        # data shared between the Job's Steps (a plain dict, with the same interface as django_wfe.storage.JobContext)
+        return self.storage.setdefault("context", {})
+
+    def execute(self) -> typing.List[typing.Dict]:
+        """
+        A method executing the Workflow until its last Step
+
+        :return: history of the execution: list of the executed Steps' data (python path, result and external data)
+        :raises InputRequired: in case the external input of a Step requiring it was not provided
+        :raises pydantic.ValidationError: in case the external input does not match the Step's UserInputSchema
+        :raises RuntimeWFEError: in case a Step suspends the execution
+        """
+        digraph = self.workflow.DIGRAPH
+        data = self.storage["data"]
+
+        StepClass = steps.__start__
+        _input = self.storage.get("input")
+
+        while True:
+            path, requires_input, direct = get_plan(StepClass)
+
+            self.current_step = path
+            step = StepClass(job=self)
+
+            if requires_input:
+                external_input = self._validate_input(StepClass)
+                data.append({"step": path, "external_data": external_input})
+            else:
+                external_input = None
+                data.append({"step": path})
+
+            if direct:
+                # the same calls as in BaseStep._perform_execute() and _perform_transition()
+                result = step.execute(
+                    _input, external_input=external_input, logfile=None
+                )
+                data[-1]["result"] = result
+                transition = step.transition(
+                    _input, external_input=external_input, result=result
+                )
+            else:
+                result = self._execute_step(step, _input)
+                data[-1]["result"] = result
+                transition = step._perform_transition(_input=_input, result=result)
+
+            next_steps = digraph.get(StepClass)
+            if not next_steps:
+                return data
+
+            StepClass = next_steps[transition]
+            self.current_step_number += 1
+            _input = result
+
+    def _validate_input(self, StepClass: type) -> typing.Dict:
+        """
+        Method validating the provided external input of the Step
+
+        :param StepClass: class object inheriting from django_wfe.steps.Step
+        :return: validated external input
+        """
+        external_data = self.external_inputs.get(StepClass)
+        if external_data is None:
+            external_data = self.external_inputs.get(
+                f"{StepClass.__module__}.{StepClass.__name__}"
+            )
+        if external_data is None:
+            raise InputRequired(
+                f"Step #{self.current_step_number} '{StepClass.__name__}' requires an external input."
+            )
+
+        # pydantic validate the data structure
+        return StepClass.UserInputSchema.parse_obj(external_data).dict()
+
+    def _execute_step(self, step, _input=None):
+        """
+        Method conducting execute() method of the Step, executing sub-workflows and MapSteps inline
+
+        :param step: instance of the class inheriting from django_wfe.steps.Step
+        :param _input: previous step's output
+        :return: result of the step execution
+        """
+        if isinstance(step, steps.SubWorkflow):
+            WorkflowClass = step.WORKFLOW
+            if isinstance(WorkflowClass, str):
+                WorkflowClass = import_string(WorkflowClass)
+
+            child = EphemeralJob(
+                WorkflowClass, _input=_input, external_inputs=self.external_inputs
+            )
+            child.execute()
+            return child.result
+
+        if isinstance(step, steps.MapStep):
+            items = list(_input or [])
+            item_step = step.STEP(job=self)
+
+            return step.reduce(
+                [
+                    [
+                        item_step._perform_execute(_input=item, logfile=None)
+                        for item in items[i : i + step.CHUNK_SIZE]
+                    ]
+                    for i in range(0, len(items), step.CHUNK_SIZE)
+                ]
+            )
+
+        try:
+            if isinstance(step, steps.Wait):
+                raise Suspended
+
+            return step._perform_execute(_input=_input, logfile=None)
+        except Suspended:
+            raise RuntimeWFEError(
+                f"Step #{self.current_step_number} '{step.__class__.__name__}' suspended the execution, "
+                f"which is not supported by the ephemeral execution."
+            )
+
+    def _get_step_storage(self) -> typing.Dict:
+        return self.storage["data"][self.current_step_number]
+
+    def report_progress(self, fraction: float, message: str = None):
+        self.progress = {
+            "step_number": self.current_step_number,
+            "fraction": min(max(float(fraction), 0.0), 1.0),
+            "message": message,
+        }
+
+    def _progress_due(self, fraction: float, message: str = None) -> bool:
+        # the progress is kept in memory, so async Steps do not need to save it
+        self.report_progress(fraction, message)
+        return False
+
+    def is_cancelled(self) -> bool:
+        return False
+
+
+def execute(
+    WorkflowClass: type,
+    _input=None,
+    external_inputs: typing.Dict[typing.Union[type, str], typing.Dict] = None,
+) -> typing.List[typing.Dict]:
+    """
+    Function executing the Workflow in memory
+
+    :param WorkflowClass: class object inheriting from django_wfe.workflows.Workflow
+    :param _input: initial input of the Workflow (passed to its first Step)
+    :param external_inputs: external inputs of the Steps requiring them, by the Step class or its python path
+    :return: history of the execution: list of the executed Steps' data (python path, result and external data)
+    """
+    return EphemeralJob(
+        WorkflowClass, _input=_input, external_inputs=external_inputs
+    ).execute()
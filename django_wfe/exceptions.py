@@ -1,6 +1,5 @@
 from django.core.exceptions import ValidationError
 
-
 # base exception classes:
 
 
@@ -27,9 +26,29 @@ class InputRequired(WFEException):
     pass
 
 
+class Suspended(WFEException):
+    """
+    Exception raised by a Step, which has to release the worker and wait for an external event
+    (e.g. a child Job's completion) before it can be finished.
+
+    :param callback: optional callable executed once the Job is persisted in the JobState.WAITING state
+    """
+
+    def __init__(self, *args, callback=None):
+        super().__init__(*args)
+        self.callback = callback
+
+
 class WrongState(RuntimeWFEError):
     pass
 
 
 class WorkflowDeleted(ValidationWFEError):
     pass
+
+
+class Cancelled(WFEException):
+    """
+    Exception raised when the Job turns out to be cancelled (or its deadline has passed) during the execution.
+    Long-running Steps may raise it themselves, after polling their cancelled property.
+    """
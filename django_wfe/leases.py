@@ -0,0 +1,118 @@
+"""
+The module implementing the leases of the executed Jobs and MapStep's chunks.
+
+A worker claiming a Job (see django_wfe.models.Job.claim) or a chunk (django_wfe.models.MapChunk.claim) holds its lease
+for WFE_CLAIM_LEASE seconds. The lease is renewed by a single heartbeat thread per process (with one query per model
+for all the Jobs and chunks executed by the process), as long as they are executed. Jobs and chunks left ONGOING by
+a crashed worker are claimed again once their lease has expired, by the redelivered message, or re-queued by
+the watchdog (see django_wfe.utils.requeue_expired_jobs).
+"""
+
+import logging
+import datetime
+import threading
+import contextlib
+import collections
+
+from django.db import connection
+from django.utils import timezone
+
+from .settings import WFE_CLAIM_LEASE
+
+logger = logging.getLogger(__name__)
+
+
+def expired_before(now: datetime.datetime = None) -> datetime.datetime:
+    """
+    Function returning the time of the last heartbeat, before which the leases have expired
+
+    :param now: current time (timezone.now(), if not provided)
+    :return: datetime of the expiry
+    """
+    return (now or timezone.now()) - datetime.timedelta(seconds=WFE_CLAIM_LEASE)
+
+
+class Heartbeat(threading.Thread):
+    """
+    Daemon thread renewing the leases of the Jobs and chunks executed by the process
+    """
+
+    def __init__(self):
+        super().__init__(name="django-wfe-heartbeat", daemon=True)
+
+        # IDs of the executed instances by their model
+        self.ids = collections.defaultdict(collections.Counter)
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def add(self, instance):
+        with self.lock:
+            self.ids[type(instance)][instance.pk] += 1
+
+    def remove(self, instance):
+        with self.lock:
+            ids = self.ids[type(instance)]
+            ids[instance.pk] -= 1
+            if ids[instance.pk] <= 0:
+                del ids[instance.pk]
+            if not ids:
+                del self.ids[type(instance)]
+
+    def run(self):
+        while not self.stopped.wait(WFE_CLAIM_LEASE / 3):
+            try:
+                self.beat()
+            except Exception:
+                logger.exception("Renewing the leases of the Jobs failed.")
+                connection.close()
+
+    def beat(self):
+        from .models import JobState
+
+        with self.lock:
+            ids = {Model: list(model_ids) for Model, model_ids in self.ids.items()}
+
+        now = timezone.now()
+        for Model, model_ids in ids.items():
+            # Jobs and chunks share the ONGOING state's name
+            Model.objects.filter(id__in=model_ids, state=JobState.ONGOING).update(
+                claimed_at=now
+            )
+
+    def stop(self):
+        self.stopped.set()
+
+
+_heartbeat = None
+_heartbeat_lock = threading.Lock()
+
+
+def get_heartbeat() -> Heartbeat:
+    """
+    Function returning the process' heartbeat, starting its thread on the first call
+
+    :return: Heartbeat instance
+    """
+    global _heartbeat
+
+    with _heartbeat_lock:
+        if _heartbeat is None:
+            _heartbeat = Heartbeat()
+            _heartbeat.start()
+
+    return _heartbeat
+
+
+@contextlib.contextmanager
+def held(instance):
+    """
+    Context manager renewing the lease of the Job or the chunk, while the enclosed code executes it
+
+    :param instance: django_wfe.models.Job or django_wfe.models.MapChunk instance
+    """
+    heartbeat = get_heartbeat()
+    heartbeat.add(instance)
+    try:
+        yield
+    finally:
+        heartbeat.remove(instance)
@@ -1,9 +1,47 @@
+import io
+import os
 import sys
+import gzip
+import typing
+import shutil
+import threading
+
+
+class _ThreadRedirect:
+    """
+    Stream replacing stdout or stderr, duplicating the output to the log files of the Tee contexts entered by the
+    current thread (Jobs executed concurrently by the worker threads do not write to each other's logs)
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, data):
+        for file in getattr(_tee_files, "files", ()):
+            file.write(data)
+
+        return self.stream.write(data)
+
+    def flush(self):
+        for file in getattr(_tee_files, "files", ()):
+            file.flush()
+
+        self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+# log files of the Tee contexts entered by the current thread
+_tee_files = threading.local()
+_redirect_lock = threading.Lock()
+# number of the Tee contexts entered by all the threads, the streams are restored when the last one exits
+_redirect_count = 0
 
 
 class Tee:
     """
-    Class duplicating stdout and stderr to a specified log file and
+    Class duplicating stdout and stderr (of the current thread) to a specified log file
     """
 
     def __init__(self, name, mode):
@@ -11,24 +49,114 @@ class Tee:
         self.mode = mode
         self.file = None
 
-        self.stdout = sys.stdout
-        self.stderr = sys.stderr
-
-        sys.stdout = self
-        sys.stderr = self
-
     def write(self, data):
-
         self.file.write(data)
-        self.stdout.write(data)
 
     def flush(self):
         self.file.flush()
 
     def __enter__(self):
+        global _redirect_count
+
         self.file = open(self.file_name, self.mode)
 
+        with _redirect_lock:
+            if not isinstance(sys.stdout, _ThreadRedirect):
+                sys.stdout = _ThreadRedirect(sys.stdout)
+            if not isinstance(sys.stderr, _ThreadRedirect):
+                sys.stderr = _ThreadRedirect(sys.stderr)
+            _redirect_count += 1
+
+        if not hasattr(_tee_files, "files"):
+            _tee_files.files = []
+        _tee_files.files.append(self.file)
+
+        return self
+
     def __exit__(self, _type, _value, _traceback):
-        sys.stdout = self.stdout
-        sys.stderr = self.stderr
+        global _redirect_count
+
+        _tee_files.files.remove(self.file)
         self.file.close()
+
+        with _redirect_lock:
+            _redirect_count -= 1
+            if not _redirect_count:
+                # the streams replaced in the meantime by someone else are left in place
+                if isinstance(sys.stdout, _ThreadRedirect):
+                    sys.stdout = sys.stdout.stream
+                if isinstance(sys.stderr, _ThreadRedirect):
+                    sys.stderr = sys.stderr.stream
+
+
+def compress_log(path: str) -> bool:
+    """
+    Function compressing the log file to path.gz and removing the original file.
+
+    If the compressed log already exists (e.g. the Job was executed again), the log is appended to it as another
+    gzip member, so it's still decompressed as a single file.
+
+    :param path: path to the log file
+    :return: True if the log was compressed, False if it does not exist
+    """
+    try:
+        with open(path, "rb") as log, gzip.open(f"{path}.gz", "ab") as compressed:
+            shutil.copyfileobj(log, compressed)
+    except FileNotFoundError:
+        return False
+
+    os.remove(path)
+    return True
+
+
+class _ConcatenatedFiles(io.RawIOBase):
+    """
+    Binary stream reading the files one after another
+    """
+
+    def __init__(self, files: typing.List[typing.BinaryIO]):
+        self.files = files
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while self.files:
+            data = self.files[0].read(len(buffer))
+            if data:
+                buffer[: len(data)] = data
+                return len(data)
+
+            self.files.pop(0).close()
+
+        return 0
+
+    def close(self):
+        while self.files:
+            self.files.pop().close()
+
+        super().close()
+
+
+def open_log(path: str) -> typing.BinaryIO:
+    """
+    Function opening the log for reading: its compressed part (if any), followed by the lines written after
+    the log was compressed
+
+    :param path: path to the log file
+    :return: binary file object
+    :raises: FileNotFoundError in case the log does not exist
+    """
+    files = []
+    if os.path.exists(f"{path}.gz"):
+        files.append(gzip.open(f"{path}.gz", "rb"))
+    try:
+        files.append(open(path, "rb"))
+    except FileNotFoundError:
+        if not files:
+            raise
+
+    if len(files) == 1:
+        return files[0]
+
+    return io.BufferedReader(_ConcatenatedFiles(files))
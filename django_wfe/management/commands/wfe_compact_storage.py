@@ -0,0 +1,57 @@
+from django.core.management import BaseCommand
+
+from django_wfe.models import Job, JobState
+from django_wfe.storage import Retention
+
+
+class Command(BaseCommand):
+
+    help = "Drops the Steps' results of the finished Django WFE Jobs, according to their retention policies"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workflow",
+            help="Python path of the Workflow, which Jobs should be compacted (all Jobs by default)",
+        )
+        parser.add_argument(
+            "--retention",
+            choices=Retention.POLICIES,
+            help="Retention policy overriding the ones defined by the Steps and the Workflows",
+        )
+        parser.add_argument(
+            "--last-n",
+            type=int,
+            default=1,
+            help=f'Number of the most recent results kept by "{Retention.KEEP_LAST_N}" overriding policy',
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of Jobs loaded from the database at once",
+        )
+
+    def handle(self, *args, **options):
+        jobs = Job.objects.filter(state=JobState.FINISHED).select_related("workflow")
+        if options["workflow"]:
+            jobs = jobs.filter(workflow__path=options["workflow"])
+
+        compacted = dropped = 0
+        for job in jobs.order_by("id").iterator(chunk_size=options["batch_size"]):
+            try:
+                WorkflowClass = job.import_class(job.workflow.path)
+            except (ImportError, AttributeError):
+                self.stderr.write(
+                    f"Job {job}: import error of {job.workflow.path}, skipping."
+                )
+                continue
+
+            paths = job.get_expired_results(
+                WorkflowClass, retention=options["retention"], last_n=options["last_n"]
+            )
+            if paths:
+                job.delete_storage_paths(paths)
+                compacted += 1
+                dropped += len(paths)
+
+        self.stdout.write(f"Dropped {dropped} results of {compacted} Jobs.")
@@ -0,0 +1,45 @@
+from django.core.management import BaseCommand, CommandError
+
+from django_wfe.models import Job
+from django_wfe.storage_codecs import get_codec
+
+
+class Command(BaseCommand):
+
+    help = "Converts the storage of existing Django WFE Jobs to the provided codec (e.g. after changing Workflow's STORAGE_CODEC)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "codec",
+            help='Name of the codec ("json", "orjson", "msgpack", "msgpack+zstd") or a python path to the codec class',
+        )
+        parser.add_argument(
+            "--workflow",
+            help="Python path of the Workflow, which Jobs should be converted (all Jobs by default)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of Jobs loaded from the database at once",
+        )
+
+    def handle(self, *args, **options):
+        codec = options["codec"]
+
+        try:
+            get_codec(codec)
+        except (ImportError, ValueError) as e:
+            raise CommandError(f"Codec {codec} cannot be used: {e}")
+
+        jobs = Job.objects.exclude(storage_codec=codec)
+        if options["workflow"]:
+            jobs = jobs.filter(workflow__path=options["workflow"])
+
+        converted = 0
+        for job in jobs.order_by("id").iterator(chunk_size=options["batch_size"]):
+            job.storage_codec = codec
+            job.save(update_fields=["storage", "storage_codec", "storage_blob"])
+            converted += 1
+
+        self.stdout.write(f"Converted storage of {converted} Jobs to {codec}.")
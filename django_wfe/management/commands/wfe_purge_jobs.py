@@ -0,0 +1,210 @@
+import os
+import gzip
+import json
+import datetime
+
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from django_wfe import artifacts
+from django_wfe.models import Job, JobState
+from django_wfe.storage_codecs import WFEJSONEncoder
+
+# blobs put in the store recently are not removed, as their references may not be saved in the Jobs' storage yet
+ARTIFACT_GRACE_PERIOD = datetime.timedelta(hours=1)
+
+
+class Command(BaseCommand):
+
+    help = (
+        "Deletes old, ended Django WFE Jobs (along with their sub-workflows' Jobs) in batches and removes "
+        "their log files and the artifacts no longer referenced by other Jobs, optionally archiving them to a JSON "
+        "lines file"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than",
+            type=int,
+            default=30,
+            help="Minimum age in days of the Jobs to be deleted",
+        )
+        parser.add_argument(
+            "--state",
+            action="append",
+            choices=JobState.TERMINAL,
+            help="State of the Jobs to be deleted (may be repeated, all ended Jobs by default)",
+        )
+        parser.add_argument(
+            "--workflow",
+            help="Python path of the Workflow, which Jobs should be deleted (all Jobs by default)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of Jobs deleted in a single transaction",
+        )
+        parser.add_argument(
+            "--archive",
+            help="Path to the JSON lines file (gzipped, if ends with .gz), to which deleted Jobs are appended",
+        )
+        parser.add_argument(
+            "--keep-artifacts",
+            action="store_true",
+            help="Don't remove the artifacts referenced only by the deleted Jobs (e.g. to keep the archive complete)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the Jobs to be deleted",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - datetime.timedelta(days=options["older_than"])
+
+        jobs = Job.objects.filter(
+            created_at__lt=cutoff, state__in=options["state"] or JobState.TERMINAL
+        )
+        if options["workflow"]:
+            jobs = jobs.filter(workflow__path=options["workflow"])
+
+        if options["dry_run"]:
+            self.stdout.write(f"{jobs.count()} Jobs would be deleted.")
+            return
+
+        archive = None
+        if options["archive"]:
+            opener = gzip.open if options["archive"].endswith(".gz") else open
+            archive = opener(options["archive"], "at")
+
+        deleted = 0
+        # keys of the artifacts referenced by the deleted Jobs
+        artifact_keys = set()
+        try:
+            while True:
+                with transaction.atomic():
+                    # Jobs locked by the workers (or concurrent purges) are skipped
+                    ids = list(
+                        jobs.select_for_update(skip_locked=True, of=("self",))
+                        .order_by("id")
+                        .values_list("id", flat=True)[: options["batch_size"]]
+                    )
+                    if not ids:
+                        break
+
+                    ids = self.with_children(ids)
+                    batch = Job.objects.filter(id__in=ids)
+
+                    if archive is not None:
+                        self.archive(batch, archive)
+                    if not options["keep_artifacts"]:
+                        artifact_keys.update(self.find_artifacts(batch))
+
+                    logfiles = list(batch.values_list("logfile", flat=True))
+                    batch.delete()
+
+                # log files are removed only after the deletion is committed
+                for logfile in logfiles:
+                    self.remove_logfile(logfile)
+
+                deleted += len(ids)
+        finally:
+            if archive is not None:
+                archive.close()
+
+        self.stdout.write(f"Deleted {deleted} Jobs.")
+
+        if artifact_keys:
+            removed = self.remove_artifacts(artifact_keys)
+            self.stdout.write(f"Removed {removed} artifacts.")
+
+    @staticmethod
+    def with_children(ids):
+        """
+        Method extending the list of Jobs with their sub-workflows' Jobs, which are deleted in cascade
+
+        :param ids: list of Job IDs
+        :return: list of Job IDs along with their descendants' IDs
+        """
+        children = ids
+        while children:
+            children = list(
+                Job.objects.filter(parent_id__in=children).values_list("id", flat=True)
+            )
+            ids = ids + children
+
+        # old sub-workflows' Jobs may have been selected along with their parents
+        return list(dict.fromkeys(ids))
+
+    @staticmethod
+    def archive(jobs, file):
+        for job in jobs.select_related("workflow").order_by("id"):
+            record = {
+                "id": job.id,
+                "uuid": job.uuid,
+                "workflow": job.workflow.path,
+                "parent": job.parent_id,
+                "state": job.state,
+                "current_step": job.current_step,
+                "current_step_number": job.current_step_number,
+                "created_at": job.created_at,
+                "storage": job.storage,
+            }
+            file.write(json.dumps(record, cls=WFEJSONEncoder) + "\n")
+
+    @staticmethod
+    def find_artifacts(jobs):
+        """
+        Method collecting the keys of the artifacts referenced by the Jobs' storage
+
+        :param jobs: Job queryset
+        :return: set of the artifacts' keys
+        """
+        keys = set()
+        for job in jobs.only("storage", "storage_codec", "storage_blob").iterator():
+            keys.update(artifacts.find_references(job.storage))
+
+        return keys
+
+    @staticmethod
+    def remove_artifacts(keys):
+        """
+        Method removing the artifacts, which are not referenced by any of the remaining Jobs (the blobs are
+        content-addressed, so other Jobs with the same results share them)
+
+        :param keys: keys of the artifacts referenced by the deleted Jobs
+        :return: number of the removed artifacts
+        """
+        cutoff = (timezone.now() - ARTIFACT_GRACE_PERIOD).timestamp()
+
+        keys = set(keys)
+        for job in Job.objects.only(
+            "storage", "storage_codec", "storage_blob"
+        ).iterator():
+            keys.difference_update(artifacts.find_references(job.storage))
+            if not keys:
+                return 0
+
+        store = artifacts.get_store()
+        removed = 0
+        for key in keys:
+            modified_at = store.modified_at(key)
+            if modified_at is None or modified_at < cutoff:
+                store.delete(key)
+                removed += 1
+
+        return removed
+
+    @staticmethod
+    def remove_logfile(logfile):
+        if logfile is None:
+            return
+
+        # logs of the ended Jobs are compressed, and profiles are kept next to the logs
+        for path in (logfile, f"{logfile}.gz", f"{logfile}.prof"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
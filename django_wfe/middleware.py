@@ -0,0 +1,12 @@
+import dramatiq
+
+
+class WarmUpMiddleware(dramatiq.Middleware):
+    """
+    Dramatiq middleware warming up the worker process (see django_wfe.warmup) before it starts consuming the messages
+    """
+
+    def before_worker_boot(self, broker, worker):
+        from .warmup import warm_up
+
+        warm_up()
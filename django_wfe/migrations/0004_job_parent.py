@@ -0,0 +1,27 @@
+# Generated by Django 3.1.14 on 2026-10-18 22:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_wfe", "0003_auto_20200521_0854"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="parent",
+            field=models.ForeignKey(
+                blank=True,
+                default=None,
+                help_text="Job which launched this Job as its sub-workflow",
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="children",
+                to="django_wfe.job",
+            ),
+        ),
+    ]
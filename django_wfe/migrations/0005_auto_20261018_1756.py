@@ -0,0 +1,65 @@
+# Generated by Django 3.1.14 on 2026-10-18 22:56
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_wfe", "0004_job_parent"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MapChunk",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("step_number", models.IntegerField()),
+                ("index", models.IntegerField()),
+                (
+                    "items",
+                    django.contrib.postgres.fields.jsonb.JSONField(
+                        help_text="Chunk of the MapStep's _input"
+                    ),
+                ),
+                (
+                    "result",
+                    django.contrib.postgres.fields.jsonb.JSONField(
+                        default=None,
+                        help_text="Results of the chunk's items execution",
+                        null=True,
+                    ),
+                ),
+                ("state", models.CharField(default="PENDING", max_length=20)),
+                (
+                    "job",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="map_chunks",
+                        to="django_wfe.job",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="mapchunk",
+            index=models.Index(
+                fields=["job", "step_number", "state"],
+                name="django_wfe__job_id_ddf1f4_idx",
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="mapchunk",
+            unique_together={("job", "step_number", "index")},
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 3.1.14 on 2026-10-18 22:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_wfe", "0005_auto_20261018_1756"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="wake_at",
+            field=models.DateTimeField(
+                blank=True,
+                db_index=True,
+                default=None,
+                help_text="Time of resuming the Job suspended by a django_wfe.steps.Wait Step",
+                null=True,
+            ),
+        ),
+    ]
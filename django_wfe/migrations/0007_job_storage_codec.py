@@ -0,0 +1,62 @@
+# Generated by Django 3.1.14 on 2026-10-18 23:03
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations, models
+import django_wfe.models
+import django_wfe.storage_codecs
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_wfe", "0006_job_wake_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="storage_blob",
+            field=models.BinaryField(
+                default=None,
+                help_text="Job's storage serialized with a binary codec",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="job",
+            name="storage_codec",
+            field=models.CharField(
+                default=None,
+                help_text="Codec serializing the Job's storage (json, if not defined)",
+                max_length=100,
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="job",
+            name="storage",
+            field=django_wfe.models.StorageField(
+                default=django_wfe.models.default_storage,
+                encoder=django_wfe.storage_codecs.WFEJSONEncoder,
+                help_text="Serialized output of executed Workflow's Steps and data shared between Steps",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="mapchunk",
+            name="items",
+            field=django.contrib.postgres.fields.jsonb.JSONField(
+                encoder=django_wfe.storage_codecs.WFEJSONEncoder,
+                help_text="Chunk of the MapStep's _input",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="mapchunk",
+            name="result",
+            field=django.contrib.postgres.fields.jsonb.JSONField(
+                default=None,
+                encoder=django_wfe.storage_codecs.WFEJSONEncoder,
+                help_text="Results of the chunk's items execution",
+                null=True,
+            ),
+        ),
+    ]
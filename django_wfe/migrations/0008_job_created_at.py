@@ -0,0 +1,36 @@
+# Generated by Django 3.1.14 on 2026-10-18 23:10
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_wfe", "0007_job_storage_codec"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="created_at",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, editable=False
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="job",
+            index=django.contrib.postgres.indexes.BrinIndex(
+                fields=["created_at"], name="django_wfe_job_created_brin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                condition=models.Q(_negated=True, state__in=("FAILED", "FINISHED")),
+                fields=["state"],
+                name="django_wfe_job_active_idx",
+            ),
+        ),
+    ]
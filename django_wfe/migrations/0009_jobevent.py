@@ -0,0 +1,110 @@
+# Generated by Django 3.1.14 on 2026-10-18 23:14
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_wfe", "0008_job_created_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="JobEvent",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "step",
+                    models.CharField(
+                        help_text="Python path of the Step", max_length=300
+                    ),
+                ),
+                ("step_number", models.IntegerField()),
+                (
+                    "event",
+                    models.CharField(
+                        choices=[
+                            ("STEP_STARTED", "STEP_STARTED"),
+                            ("STEP_INPUT_REQUIRED", "STEP_INPUT_REQUIRED"),
+                            ("STEP_SUSPENDED", "STEP_SUSPENDED"),
+                            ("STEP_FINISHED", "STEP_FINISHED"),
+                            ("STEP_FAILED", "STEP_FAILED"),
+                            ("JOB_FINISHED", "JOB_FINISHED"),
+                            ("JOB_FAILED", "JOB_FAILED"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                ("timestamp", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "duration",
+                    models.FloatField(
+                        default=None,
+                        help_text="Time of the Step's execution in seconds",
+                        null=True,
+                    ),
+                ),
+                (
+                    "error",
+                    models.CharField(
+                        default=None,
+                        help_text="Class of the exception which caused the failure",
+                        max_length=200,
+                        null=True,
+                    ),
+                ),
+                (
+                    "job",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="events",
+                        to="django_wfe.job",
+                    ),
+                ),
+                (
+                    "workflow",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="django_wfe.workflow",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="jobevent",
+            index=django.contrib.postgres.indexes.BrinIndex(
+                fields=["timestamp"], name="django_wfe_event_time_brin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="jobevent",
+            index=models.Index(
+                fields=["event", "timestamp"], name="django_wfe_event_type_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="jobevent",
+            index=models.Index(
+                fields=["step", "timestamp"], name="django_wfe_event_step_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="jobevent",
+            index=models.Index(
+                fields=["workflow", "timestamp"], name="django_wfe_event_wf_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 3.1.14 on 2026-10-18 23:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_wfe", "0009_jobevent"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="job",
+            name="django_wfe_job_active_idx",
+        ),
+        migrations.AddField(
+            model_name="job",
+            name="deadline",
+            field=models.DateTimeField(
+                blank=True,
+                default=None,
+                help_text="Time, after which the Job is cancelled if it has not ended",
+                null=True,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="jobevent",
+            name="event",
+            field=models.CharField(
+                choices=[
+                    ("STEP_STARTED", "STEP_STARTED"),
+                    ("STEP_INPUT_REQUIRED", "STEP_INPUT_REQUIRED"),
+                    ("STEP_SUSPENDED", "STEP_SUSPENDED"),
+                    ("STEP_FINISHED", "STEP_FINISHED"),
+                    ("STEP_FAILED", "STEP_FAILED"),
+                    ("JOB_FINISHED", "JOB_FINISHED"),
+                    ("JOB_FAILED", "JOB_FAILED"),
+                    ("JOB_CANCELLED", "JOB_CANCELLED"),
+                ],
+                max_length=30,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="job",
+            index=models.Index(
+                condition=models.Q(
+                    _negated=True, state__in=("FAILED", "FINISHED", "CANCELLED")
+                ),
+                fields=["state"],
+                name="django_wfe_job_active_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 3.1.14 on 2026-10-18 23:21
+
+import django.contrib.postgres.fields.jsonb
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_wfe", "0010_job_cancellation"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="progress",
+            field=django.contrib.postgres.fields.jsonb.JSONField(
+                blank=True,
+                default=None,
+                help_text="Progress reported by the currently executed Step",
+                null=True,
+            ),
+        ),
+    ]
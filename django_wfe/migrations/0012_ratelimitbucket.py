@@ -0,0 +1,35 @@
+# Generated by Django 3.1.14 on 2026-10-18 23:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_wfe", "0011_job_progress"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RateLimitBucket",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=300, unique=True)),
+                (
+                    "tokens",
+                    models.FloatField(
+                        help_text="Tokens left in the bucket (negative, if calls are reserved)"
+                    ),
+                ),
+                ("updated_at", models.DateTimeField()),
+            ],
+        ),
+    ]
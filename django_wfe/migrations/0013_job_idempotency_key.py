@@ -0,0 +1,25 @@
+# Generated by Django 3.1.14 on 2026-10-18 23:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_wfe", "0012_ratelimitbucket"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="idempotency_key",
+            field=models.CharField(
+                blank=True,
+                default=None,
+                help_text="Client-supplied key, under which the Job is created only once",
+                max_length=255,
+                null=True,
+                unique=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 3.1.14 on 2026-10-18 23:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_wfe", "0013_job_idempotency_key"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="watchdog",
+            name="running",
+        ),
+        migrations.AddField(
+            model_name="watchdog",
+            name="heartbeat_at",
+            field=models.DateTimeField(
+                blank=True,
+                default=None,
+                help_text="Time of the leader's last heartbeat",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="watchdog",
+            name="leader",
+            field=models.CharField(
+                blank=True,
+                default=None,
+                help_text="Host and process ID of the elected watchdog",
+                max_length=300,
+                null=True,
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.1.14 on 2026-10-18 23:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_wfe", "0014_watchdog_leader"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="job",
+            name="profile",
+            field=models.BooleanField(
+                default=False,
+                help_text="Profile the execution of the Job's Steps (see django_wfe.profiling)",
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.1.14 on 2026-10-19 00:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_wfe", "0016_job_claimed_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="mapchunk",
+            name="wake_at",
+            field=models.DateTimeField(
+                blank=True,
+                default=None,
+                help_text="Time of the next item's call reserved by the STEP's RATE_LIMIT, until which the chunk is deferred",
+                null=True,
+            ),
+        ),
+    ]
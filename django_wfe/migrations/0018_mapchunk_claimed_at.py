@@ -0,0 +1,23 @@
+# Generated by Django 3.1.14 on 2026-10-19 00:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("django_wfe", "0017_mapchunk_wake_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="mapchunk",
+            name="claimed_at",
+            field=models.DateTimeField(
+                blank=True,
+                default=None,
+                help_text="Time of the last heartbeat of the worker executing the chunk (see django_wfe.leases)",
+                null=True,
+            ),
+        ),
+    ]
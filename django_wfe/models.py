@@ -1,31 +1,154 @@
 import os
+import time
 import uuid
 import typing
 import datetime
+import functools
 import importlib
 import traceback
 
-from django.db import models
-from django.contrib.postgres.fields import JSONField
+import pydantic
 
-from .logging import Tee
-from .settings import WFE_LOG_DIR
-from .exceptions import FinishedWorkflow, InputRequired, WrongState, WorkflowDeleted
+from asgiref.sync import sync_to_async
+from django.db import models, router, transaction, connections
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.contrib.postgres.fields import JSONField
+from django.contrib.postgres.indexes import BrinIndex
+
+from . import (
+    artifacts,
+    leases,
+    notifications,
+    process_pool,
+    profiling,
+    rate_limits,
+)
+from .logging import Tee, compress_log, open_log
+from .settings import (
+    WFE_CANCEL_CHECK_INTERVAL,
+    WFE_JOB_EVENTS,
+    WFE_LOG_DIR,
+    WFE_LOG_COMPRESSION,
+    WFE_PROGRESS_INTERVAL,
+    WFE_STORAGE_CODEC,
+)
+from .storage import (
+    CONTEXT_KEY,
+    JobContext,
+    JSONBDelete,
+    JSONBSet,
+    JSONBValue,
+    Retention,
+    get_context_key,
+    get_retention,
+    get_retention_window,
+    set_context_key,
+)
+from .storage_codecs import JSONCodec, WFEJSONEncoder, get_codec
+from .exceptions import (
+    Cancelled,
+    FinishedWorkflow,
+    InputRequired,
+    Suspended,
+    WrongState,
+    WorkflowDeleted,
+)
 
 
 class JobState:
+    QUEUED = "QUEUED"
     PENDING = "PENDING"
     ONGOING = "ONGOING"
     INPUT_REQUIRED = "INPUT_REQUIRED"
     INPUT_RECEIVED = "INPUT_RECEIVED"
+    WAITING = "WAITING"
+    FAILED = "FAILED"
+    FINISHED = "FINISHED"
+    CANCELLED = "CANCELLED"
+
+    # states of the Jobs, which execution has ended
+    TERMINAL = (FAILED, FINISHED, CANCELLED)
+    # states of the Jobs, which execution can be started (or resumed) by a worker
+    RUNNABLE = (PENDING, INPUT_RECEIVED)
+
+
+class JobEventType:
+    STEP_STARTED = "STEP_STARTED"
+    STEP_INPUT_REQUIRED = "STEP_INPUT_REQUIRED"
+    STEP_SUSPENDED = "STEP_SUSPENDED"
+    STEP_FINISHED = "STEP_FINISHED"
+    STEP_FAILED = "STEP_FAILED"
+    JOB_FINISHED = "JOB_FINISHED"
+    JOB_FAILED = "JOB_FAILED"
+    JOB_CANCELLED = "JOB_CANCELLED"
+
+    CHOICES = [
+        (event, event)
+        for event in (
+            STEP_STARTED,
+            STEP_INPUT_REQUIRED,
+            STEP_SUSPENDED,
+            STEP_FINISHED,
+            STEP_FAILED,
+            JOB_FINISHED,
+            JOB_FAILED,
+            JOB_CANCELLED,
+        )
+    ]
+
+
+class ChunkState:
+    PENDING = "PENDING"
+    QUEUED = "QUEUED"
+    ONGOING = "ONGOING"
     FAILED = "FAILED"
     FINISHED = "FINISHED"
+    CANCELLED = "CANCELLED"
 
 
 def default_storage():
     return {"data": []}
 
 
+class EncodedStorage:
+    """
+    Job's storage to be serialized with a custom JSON codec
+    """
+
+    def __init__(self, obj, codec):
+        self.obj = obj
+        self.codec = codec
+
+
+class StorageField(JSONField):
+    """
+    JSONField serializing the Job's storage with the Job's storage codec
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("encoder", WFEJSONEncoder)
+        super().__init__(*args, **kwargs)
+
+    def pre_save(self, model_instance, add):
+        value = super().pre_save(model_instance, add)
+        codec = get_codec(model_instance.storage_codec)
+
+        if codec.binary:
+            # the storage is kept in the storage_blob column
+            return {"codec": model_instance.storage_codec}
+        elif not isinstance(codec, JSONCodec):
+            return EncodedStorage(value, codec)
+
+        return value
+
+    def get_prep_value(self, value):
+        if isinstance(value, EncodedStorage):
+            return value.codec.dumps(value.obj)
+
+        return super().get_prep_value(value)
+
+
 class Singleton(models.Model):
     """
     Abstract class for Django Singleton models
@@ -74,18 +197,97 @@ class Job(models.Model):
     A table keeping the serialized state of a certain workflows' executions.
     """
 
+    # fields describing the execution's state, saved by the engine without rewriting the storage
+    STATE_FIELDS = [
+        "current_step",
+        "current_step_number",
+        "state",
+        "wake_at",
+        "progress",
+    ]
+
     uuid = models.UUIDField(default=uuid.uuid4)
     workflow = models.ForeignKey(Workflow, on_delete=models.CASCADE)
     current_step = models.CharField(
         max_length=300, default="django_wfe.steps.__start__"
     )
     current_step_number = models.IntegerField(default=0)
-    storage = JSONField(
+    storage = StorageField(
         help_text="Serialized output of executed Workflow's Steps and data shared between Steps",
         default=default_storage,
     )
+    storage_codec = models.CharField(
+        max_length=100,
+        null=True,
+        default=None,
+        help_text="Codec serializing the Job's storage (json, if not defined)",
+    )
+    storage_blob = models.BinaryField(
+        null=True,
+        default=None,
+        help_text="Job's storage serialized with a binary codec",
+    )
     state = models.CharField(max_length=20, null=True, default=JobState.PENDING)
     logfile = models.CharField(max_length=300, default=None)
+    parent = models.ForeignKey(
+        "self",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        default=None,
+        related_name="children",
+        help_text="Job which launched this Job as its sub-workflow",
+    )
+    wake_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        default=None,
+        db_index=True,
+        help_text="Time of resuming the Job suspended by a django_wfe.steps.Wait Step",
+    )
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    deadline = models.DateTimeField(
+        null=True,
+        blank=True,
+        default=None,
+        help_text="Time, after which the Job is cancelled if it has not ended",
+    )
+    progress = JSONField(
+        null=True,
+        blank=True,
+        default=None,
+        help_text="Progress reported by the currently executed Step",
+    )
+    idempotency_key = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        default=None,
+        unique=True,
+        help_text="Client-supplied key, under which the Job is created only once",
+    )
+    profile = models.BooleanField(
+        default=False,
+        help_text="Profile the execution of the Job's Steps (see django_wfe.profiling)",
+    )
+    claimed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        default=None,
+        help_text="Time of the last heartbeat of the worker executing the Job (see django_wfe.leases)",
+    )
+
+    class Meta:
+        indexes = [
+            # Jobs are created in time order, so the BRIN index is tiny compared to the B-tree
+            BrinIndex(fields=["created_at"], name="django_wfe_job_created_brin"),
+            # queries of the engine and the watchdog select only the Jobs which are not ended
+            models.Index(
+                fields=["state"],
+                name="django_wfe_job_active_idx",
+                condition=~models.Q(state__in=JobState.TERMINAL),
+            ),
+        ]
 
     def save(
         self, force_insert=False, force_update=False, using=None, update_fields=None
@@ -94,22 +296,273 @@ class Job(models.Model):
         :raises: django_wfe.models.Workflow.DoesNotExist in case provided workflow's ID is not present in the database
         :raises: django_wfe.exceptions.WorkflowDeleted in case provided workflow is marked as deleted (implementation was not found by the wfe_watchdog)
         """
-        workflow = Workflow.objects.get(pk=self.workflow_id)
+        self._prepare_save(update_fields=update_fields)
+
+        super().save(
+            force_insert=force_insert,
+            force_update=force_update,
+            using=using,
+            update_fields=update_fields,
+        )
+
+    def _prepare_save(self, workflow: Workflow = None, update_fields=None):
+        """
+        Method preparing the Job's fields to be saved (the log file, the storage codec and the encoded storage)
+
+        :param workflow: the Job's Workflow (fetched from the database, if not provided)
+        :param update_fields: names of the fields to be saved (all fields, if not provided)
+        :raises: django_wfe.models.Workflow.DoesNotExist in case provided workflow's ID is not present in the database
+        :raises: django_wfe.exceptions.WorkflowDeleted in case provided workflow is marked as deleted
+        :return: None
+        """
+        if workflow is None:
+            workflow = Workflow.objects.get(pk=self.workflow_id)
         if workflow.deleted:
             raise WorkflowDeleted(
                 message=f"Provided workflow implementation cannot be found: {workflow.path}"
             )
 
         if self.logfile is None:
-            self.logfile = os.path.join(
-                WFE_LOG_DIR, f"{self.workflow.name}_{self.uuid}.log"
-            )
+            # logs are sharded into subdirectories, to keep the number of files in a single directory small
+            log_dir = os.path.join(WFE_LOG_DIR, self.uuid.hex[:2], self.uuid.hex[2:4])
+            os.makedirs(log_dir, exist_ok=True)
+            self.logfile = os.path.join(log_dir, f"{self.uuid}.log")
+
+        if self._state.adding and (self.storage_codec is None or not self.profile):
+            try:
+                WorkflowClass = self.import_class(workflow.path)
+            except (ImportError, AttributeError, ValueError):
+                WorkflowClass = None
+            if self.storage_codec is None:
+                self.storage_codec = (
+                    getattr(WorkflowClass, "STORAGE_CODEC", None) or WFE_STORAGE_CODEC
+                )
+            # Jobs not flagged for profiling are sampled with the Workflow's profiling rate
+            self.profile = self.profile or profiling.is_sampled(WorkflowClass)
+
+        if update_fields is None or "storage_blob" in update_fields:
+            codec = get_codec(self.storage_codec)
+            self.storage_blob = codec.encode(self.storage) if codec.binary else None
+
+    @classmethod
+    def create_idempotent(
+        cls, jobs: typing.List["Job"]
+    ) -> typing.List[typing.Tuple["Job", bool]]:
+        """
+        Method saving the new Jobs, unless Jobs with the same idempotency keys already exist.
+
+        Jobs with the idempotency keys are inserted with a single INSERT ... ON CONFLICT DO NOTHING query,
+        so concurrent (e.g. retried) requests create each Job only once.
+
+        :param jobs: list of unsaved Job instances
+        :return: list of tuples of the saved (or already existing) Job and a flag, if it was created
+        :raises: django_wfe.models.Workflow.DoesNotExist in case provided workflow's ID is not present in the database
+        :raises: django_wfe.exceptions.WorkflowDeleted in case provided workflow is marked as deleted
+        """
+        keyed = [job for job in jobs if job.idempotency_key is not None]
+
+        workflows = Workflow.objects.in_bulk({job.workflow_id for job in keyed})
+        for job in keyed:
+            job._prepare_save(workflow=workflows.get(job.workflow_id))
+
+        cls.objects.bulk_create(keyed, ignore_conflicts=True)
+        existing = cls.objects.select_related("workflow").in_bulk(
+            {job.idempotency_key for job in keyed}, field_name="idempotency_key"
+        )
+
+        results = []
+        for job in jobs:
+            if job.idempotency_key is None:
+                job.save()
+                results.append((job, True))
+            else:
+                saved = existing[job.idempotency_key]
+                # the Job was created, unless another Job was inserted with the same key before
+                results.append((saved, saved.uuid == job.uuid))
+
+        return results
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+
+        # decode the storage kept in the binary column
+        blob = instance.__dict__.get("storage_blob")
+        if blob is not None:
+            instance.storage = get_codec(instance.storage_codec).decode(bytes(blob))
 
-        super().save()
+        return instance
 
     def __str__(self):
         return f"{self.workflow.name}:{self.id}"
 
+    @property
+    def result(self):
+        """
+        Result of the last executed Step of the Job (the final result for finished Jobs)
+        """
+        try:
+            return artifacts.resolve(self.storage["data"][-1].get("result"))
+        except IndexError:
+            return None
+
+    @classmethod
+    def wake(cls, job_id: typing.Union[str, int]) -> bool:
+        """
+        Method resuming the execution of a Job suspended in the JobState.WAITING state.
+
+        The state is switched atomically, so concurrent wake ups of the same Job enqueue it only once.
+
+        :param job_id: django_wfe.models.Job ID
+        :return: True if the Job was resumed, False if it was not waiting
+        """
+        from .tasks import process_job
+
+        resumed = cls.objects.filter(id=job_id, state=JobState.WAITING).update(
+            state=JobState.PENDING
+        )
+        if resumed:
+            notifications.publish(job_id, JobState.PENDING)
+            process_job.send(job_id=job_id)
+
+        return bool(resumed)
+
+    @classmethod
+    def cancel(cls, jobs: models.QuerySet) -> int:
+        """
+        Method cancelling the Jobs, which have not ended yet, along with their sub-workflows' Jobs.
+
+        The Jobs are cancelled with a single UPDATE (per level of the sub-workflows). Jobs being executed are
+        interrupted by the engine before their next Step (or by the Steps polling their cancelled property),
+        while queued messages of the cancelled Jobs and their MapStep's chunks are dropped by the workers.
+
+        :param jobs: QuerySet of the Jobs to be cancelled
+        :return: number of cancelled Jobs (including the sub-workflows' Jobs)
+        """
+        using = jobs.db
+
+        with transaction.atomic(using=using):
+            cancelled = list(
+                jobs.exclude(state__in=JobState.TERMINAL)
+                .select_for_update(of=("self",))
+                .values_list("id", "workflow_id", "current_step", "current_step_number")
+            )
+            if not cancelled:
+                return 0
+
+            ids = [job_id for job_id, *_ in cancelled]
+            cls.objects.using(using).filter(id__in=ids).update(state=JobState.CANCELLED)
+            MapChunk.objects.using(using).filter(
+                job_id__in=ids, state__in=(ChunkState.PENDING, ChunkState.QUEUED)
+            ).update(state=ChunkState.CANCELLED)
+
+            if WFE_JOB_EVENTS:
+                JobEvent.objects.using(using).bulk_create(
+                    JobEvent(
+                        job_id=job_id,
+                        workflow_id=workflow_id,
+                        step=step,
+                        step_number=step_number,
+                        event=JobEventType.JOB_CANCELLED,
+                    )
+                    for job_id, workflow_id, step, step_number in cancelled
+                )
+            notifications.publish_many(ids, JobState.CANCELLED, using=using)
+
+        cancelled = len(ids) + cls.cancel(
+            cls.objects.using(using).filter(parent_id__in=ids)
+        )
+
+        # slots of the cancelled Jobs, which were not being executed, are released here
+        from . import scheduling
+
+        scheduling.release()
+
+        return cancelled
+
+    def is_cancelled(self) -> bool:
+        """
+        A method checking if the Job was cancelled or its deadline has passed, to be polled by long-running Steps.
+
+        The database is queried at most once per WFE_CANCEL_CHECK_INTERVAL seconds.
+
+        :return: True if the Job's execution should be interrupted
+        """
+        if self.deadline is not None and timezone.now() >= self.deadline:
+            return True
+
+        now = time.monotonic()
+        if now - getattr(self, "_cancel_checked_at", 0) >= WFE_CANCEL_CHECK_INTERVAL:
+            self._cancel_checked_at = now
+            self._cancelled = Job.objects.filter(
+                pk=self.pk, state=JobState.CANCELLED
+            ).exists()
+
+        return self._cancelled
+
+    def report_progress(self, fraction: float, message: str = None):
+        """
+        A method reporting the progress of the currently executed Step.
+
+        The method is meant to be called in the Step's loops: the progress is saved (and published)
+        with a single column's update at most once per WFE_PROGRESS_INTERVAL seconds, and the latest
+        reported progress is saved along with the Step's result.
+
+        :param fraction: completed fraction of the Step's work (from 0 to 1)
+        :param message: optional description of the Step's work
+        :raises Cancelled: in case the Job was cancelled
+        :return: None
+        """
+        if self._progress_due(fraction, message):
+            self._save_progress()
+
+    def _progress_due(self, fraction: float, message: str = None) -> bool:
+        """
+        Method keeping the reported progress, and checking if it should be saved
+
+        :param fraction: completed fraction of the Step's work
+        :param message: optional description of the Step's work
+        :return: True if WFE_PROGRESS_INTERVAL has passed since the last save
+        """
+        self._reported_progress = (fraction, message)
+
+        now = time.monotonic()
+        if now - getattr(self, "_progress_saved_at", -WFE_PROGRESS_INTERVAL) < (
+            WFE_PROGRESS_INTERVAL
+        ):
+            return False
+
+        self._progress_saved_at = now
+        return True
+
+    def _set_reported_progress(self):
+        """
+        Method setting the progress field with the progress kept by _progress_due()
+
+        :return: None
+        """
+        fraction, message = self.__dict__.pop("_reported_progress", (None, None))
+        if fraction is None:
+            return
+
+        self.progress = {
+            "step_number": self.current_step_number,
+            "fraction": min(max(float(fraction), 0.0), 1.0),
+            "message": message,
+            "updated_at": timezone.now().isoformat(),
+        }
+
+    def _save_progress(self):
+        """
+        Method saving (and publishing) the reported progress, without saving other fields
+
+        :raises Cancelled: in case the Job was cancelled
+        :return: None
+        """
+        self._set_reported_progress()
+        self._update(progress=self.progress)
+        self._notify()
+
     @staticmethod
     def import_class(path: str):
         """
@@ -138,168 +591,850 @@ class Job(models.Model):
         :return: None
         """
         try:
-            self._run_next()
+            with leases.held(self):
+                self._run_next()
+        except Cancelled:
+            self._end_cancelled()
         except Exception:
-            self._log("---- WORKFLOW EXECUTION FAILED ----")
-            self.state = JobState.FAILED
-            self.save()
+            self._fail()
 
-    def provide_external_input(self, external_data: typing.Dict):
+    async def aexecute(self):
         """
-        A method gathering user's input for the current Step
+        A coroutine executing the Workflow on the asyncio event loop, until the end or until a Step with required
+        user input is encountered. Async Steps are awaited on the loop, while database access and synchronous Steps
+        are executed in a thread pool.
 
-        :return:
-        :raises: pydantic.ValidationError
+        :return: None
         """
         try:
-            CurrentStep = self.import_class(self.current_step)
-        except ImportError:
-            print(
-                f"Provide Exteranal input for {self.workflow.name}: import error of {self.current_step}"
-            )
-            self.state = JobState.FAILED
-            return
+            with leases.held(self):
+                await self._arun_next()
+        except Cancelled:
+            await sync_to_async(self._end_cancelled, thread_sensitive=False)()
+        except Exception:
+            await sync_to_async(self._fail, thread_sensitive=False)()
 
-        if not CurrentStep.UserInputSchema.__fields__:
-            raise WrongState(
-                f"Current Workflow's Step {CurrentStep} does not accept external input."
-            )
+    def claim(self) -> bool:
+        """
+        A method atomically marking the Job as being executed, so the duplicated deliveries
+        of the process_job message for the same Job are skipped. ONGOING Jobs are claimed again,
+        once the lease of the worker executing them has expired (see django_wfe.leases).
 
-        if self.state != JobState.INPUT_REQUIRED:
-            raise WrongState(f"Wrong Workflow's state: {self.state}.")
+        :return: True if the Job was claimed, False if it was not runnable (e.g. it's being executed by another worker)
+        """
+        now = timezone.now()
+        return bool(
+            Job.objects.filter(
+                models.Q(state__in=JobState.RUNNABLE)
+                | models.Q(
+                    state=JobState.ONGOING, claimed_at__lt=leases.expired_before(now)
+                ),
+                pk=self.pk,
+            ).update(state=JobState.ONGOING, claimed_at=now)
+        )
 
-        # pydantic validate the data structure
-        external_data = CurrentStep.UserInputSchema(**external_data)
+    @classmethod
+    def requeue_expired(cls) -> typing.List[int]:
+        """
+        Method re-queueing the ONGOING Jobs, which lease has expired (e.g. their worker crashed and their process_job
+        message was not redelivered)
 
-        # update serialized job's state with provided external data
-        try:
-            self.storage["data"][self.current_step_number][
-                "external_data"
-            ] = external_data.dict()
-        except IndexError:
-            self.storage["data"].append(
-                {"step": self.current_step, "external_data": external_data.dict()}
-            )
+        :return: IDs of the re-queued Jobs
+        """
+        from .tasks import process_job
+
+        expired = cls.objects.filter(
+            state=JobState.ONGOING, claimed_at__lt=leases.expired_before()
+        ).values_list("id", flat=True)
+
+        requeued = []
+        for job_id in expired:
+            # the state is switched atomically, so the Job claimed meanwhile is not re-queued
+            if cls.objects.filter(
+                id=job_id,
+                state=JobState.ONGOING,
+                claimed_at__lt=leases.expired_before(),
+            ).update(state=JobState.PENDING, claimed_at=None):
+                notifications.publish(job_id, JobState.PENDING)
+                process_job.send(job_id=job_id)
+                requeued.append(job_id)
+
+        return requeued
+
+    def submit(self) -> bool:
+        """
+        A method ordering the Job's execution by the Dramatiq workers, unless the concurrency limits
+        of its Workflow are reached (see django_wfe.scheduling)
 
-        self.state = JobState.INPUT_RECEIVED
-        self.save()
+        :return: True if the Job was sent to the workers, False if it was queued
+        """
+        from . import scheduling
 
-    def _run_next(self):
+        return scheduling.submit(self)
+
+    def schedule_wake(self):
         """
-        A method recursively executing Steps of the Workflow
+        A method ordering the Job's wake up at the time defined by the Job's wake_at
 
         :return: None
         """
+        from .tasks import wake_job
 
-        try:
-            WorkflowClass = self.import_class(self.workflow.path)
-        except ImportError:
-            print(
-                f"Execute of {self.workflow.name} failed: import error of {self.workflow.path}"
-            )
-            raise
+        delay = max((self.wake_at - timezone.now()).total_seconds(), 0)
+        wake_job.send_with_options(kwargs={"job_id": self.id}, delay=int(delay * 1000))
 
-        # try importing current step class
-        try:
-            StepClass = self.import_class(self.current_step)
-        except ImportError:
-            print(
-                f"Execute of {self.workflow.name} failed: import error of {self.current_step}"
-            )
-            raise
+    @property
+    def compressed_logfile(self) -> str:
+        """
+        Path to the Job's log compressed after the Job ended
+        """
+        return f"{self.logfile}.gz"
 
-        try:
-            current_step = self._step_initialize(StepClass)
-        except InputRequired:
-            return
+    @property
+    def profile_file(self) -> str:
+        """
+        Path to the profile of the Job's Steps (see django_wfe.profiling)
+        """
+        return f"{self.logfile}.prof"
 
-        # previous step result
-        _input = (
-            self.storage["data"][self.current_step_number - 1]["result"]
-            if self.storage["data"]
-            else None
-        )
+    def open_log(self) -> typing.BinaryIO:
+        """
+        A method opening the Job's log for reading, decompressing it if needed
 
-        result = self._step_execute(current_step, _input=_input)
-        transition = self._step_calculate_transition(
-            current_step, result=result, _input=_input
-        )
+        :return: binary file object
+        :raises: FileNotFoundError in case the Job's log does not exist
+        """
+        return open_log(self.logfile)
+
+    @property
+    def map_progress(self) -> typing.Optional[typing.Dict]:
+        """
+        Progress of the currently executed django_wfe.steps.MapStep (None, if current Step is not a MapStep)
+        """
+        if "map_total" in self.__dict__:
+            # counted along with the Jobs (see MapChunk.annotate_progress)
+            if self.map_total is None:
+                return None
+
+            return {
+                "total": self.map_total,
+                "finished": self.map_finished or 0,
+                "failed": self.map_failed or 0,
+            }
 
         try:
-            self._workflow_transition(WorkflowClass, StepClass, transition)
-        except FinishedWorkflow:
-            return
+            self.storage["data"][self.current_step_number]["map"]
+        except (IndexError, KeyError):
+            return None
 
-        self._run_next()
+        return MapChunk.progress(self.id, self.current_step_number)
 
-    def _step_initialize(self, StepClass: type):
+    @property
+    def context(self) -> JobContext:
         """
-        Method initializing currently executed Step instance
-
-        :param StepClass: class object inheriting from django_wfe.steps.Step
-        :raises InputRequired: in case current Step requires an external input (similarly to StopIteration exception)
-        :return: StepClass instance
+        Data shared between the Job's Steps, read and written by single keys
         """
-        step = StepClass(job=self)
+        return JobContext(self)
+
+    @property
+    def _partial_storage_updates(self) -> bool:
+        # jsonb_set() is available only for the JSON codecs in PostgreSQL
+        db = router.db_for_write(Job, instance=self)
+        return (
+            connections[db].vendor == "postgresql"
+            and not get_codec(self.storage_codec).binary
+        )
 
-        # break execution if input is required by the current Step
-        if step.requires_input and self.state != JobState.INPUT_RECEIVED:
-            self.state = JobState.INPUT_REQUIRED
-            self.save()
+    def update_storage(
+        self,
+        path: typing.List[typing.Union[str, int]],
+        value,
+        update_fields: typing.List[str] = None,
+    ):
+        """
+        A method setting the value under the path of the Job's storage, updating only this path in the database.
 
-            self._log(
-                f"Step #{self.current_step_number} '{StepClass.__name__}': input required"
-            )
+        :param path: list of keys (and list indexes) leading to the value, its last element is created if missing
+        :param value: value to be set
+        :param update_fields: names of other Job's fields saved in the same query
+        :return: None
+        """
+        # keep the loaded storage in sync with the database
+        target = self.storage
+        for key in path[:-1]:
+            target = target[key]
 
-            raise InputRequired
+        if isinstance(target, list) and path[-1] >= len(target):
+            target.append(value)
         else:
-            self._log(
-                f"Step #{self.current_step_number} '{step.__class__.__name__}': processing started"
-            )
+            target[path[-1]] = value
 
-        self.state = JobState.ONGOING
-        self.save()
+        fields = {field: getattr(self, field) for field in update_fields or []}
 
-        return step
+        if not self._partial_storage_updates:
+            self._update(**self._storage_values(), **fields)
+            return
 
-    def _step_execute(self, step, _input=None):
-        """
-        Method conducting execute() method of the Step
+        data = get_codec(self.storage_codec).dumps(value)
+        self._update(storage=JSONBSet("storage", path, JSONBValue(data)), **fields)
 
-        :param step: instance of the class inheriting from django_wfe.steps.Step
-        :param _input: previous step's output
-        :return: result of the step execution
+    def set_step_data(self, key: str, value, update_fields: typing.List[str] = None):
         """
+        A method setting the key of the currently executed Step's data in the Job's storage (e.g. its result)
 
-        self._log(
-            f"Step #{self.current_step_number} '{step.__class__.__name__}': performing execute():"
-        )
-
+        :param key: key of the Step's data
+        :param value: value to be set
+        :param update_fields: names of other Job's fields saved in the same query
+        :return: None
+        """
         try:
-            with Tee(self.logfile, "a"):
-                result = step._perform_execute(_input=_input, logfile=self.logfile)
+            self.storage["data"][self.current_step_number]
+        except IndexError:
+            self.update_storage(
+                ["data", self.current_step_number],
+                {"step": self.current_step, key: value},
+                update_fields=update_fields,
+            )
+        else:
+            self.update_storage(
+                ["data", self.current_step_number, key],
+                value,
+                update_fields=update_fields,
+            )
 
-        except Exception as exception:
-            # log exception in the logfile
-            with open(self.logfile, "a") as log:
-                log.write(
-                    "".join(
-                        traceback.TracebackException.from_exception(exception).format()
-                    )
-                )
-            raise
+    def get_context_value(self, key: str, default=None):
+        """
+        A method reading the key of the data shared between the Job's Steps, without loading the whole storage
 
-        self._log(
-            f"Step #{self.current_step_number} '{step.__class__.__name__}': execution finished successfully with a result: {result}"
+        :param key: context's key
+        :param default: value returned if the key is not set
+        :return: value of the key
+        """
+        if get_codec(self.storage_codec).binary:
+            # binary storage cannot be queried, it's kept in sync with the database by the executing Job
+            return self.storage.get(CONTEXT_KEY, {}).get(key, default)
+
+        values = (
+            Job.objects.filter(pk=self.pk, **{f"storage__{CONTEXT_KEY}__has_key": key})
+            .annotate(value=get_context_key(key))
+            .values_list("value", flat=True)
         )
+        for value in values:
+            return value
 
-        try:
-            self.storage["data"][self.current_step_number]["result"] = result
-        except IndexError:
-            self.storage["data"].append({"step": self.current_step, "result": result})
-        self.save()
+        return default
 
-        return result
+    def set_context_value(self, key: str, value):
+        """
+        A method setting the key of the data shared between the Job's Steps, without rewriting the whole storage
+
+        :param key: context's key
+        :param value: value to be set
+        :return: None
+        """
+        self.storage.setdefault(CONTEXT_KEY, {})[key] = value
+
+        if not self._partial_storage_updates:
+            self._update(**self._storage_values())
+            return
+
+        data = get_codec(self.storage_codec).dumps(value)
+        self._update(storage=set_context_key(key, data))
+
+    def delete_context_value(self, key: str):
+        """
+        A method removing the key of the data shared between the Job's Steps
+
+        :param key: context's key
+        :return: None
+        """
+        self.delete_storage_paths([[CONTEXT_KEY, key]])
+
+    def delete_storage_paths(
+        self,
+        paths: typing.List[typing.List[typing.Union[str, int]]],
+        update_fields: typing.List[str] = None,
+    ):
+        """
+        A method removing the keys under the paths of the Job's storage, updating only these paths in the database
+
+        :param paths: list of paths (lists of keys and list indexes), each ending with a key of a dict
+        :param update_fields: names of other Job's fields saved in the same query
+        :return: None
+        """
+        for path in paths:
+            try:
+                target = self.storage
+                for key in path[:-1]:
+                    target = target[key]
+            except (KeyError, IndexError):
+                continue
+
+            target.pop(path[-1], None)
+
+        fields = {field: getattr(self, field) for field in update_fields or []}
+
+        if not self._partial_storage_updates:
+            self._update(**self._storage_values(), **fields)
+            return
+
+        expression = "storage"
+        for path in paths:
+            expression = JSONBDelete(expression, path)
+
+        self._update(storage=expression, **fields)
+
+    def _update(self, **values):
+        """
+        Method updating the Job's columns in the database, unless the Job was cancelled in the meantime
+
+        :param values: values (or expressions) of the Job's fields
+        :raises Cancelled: in case the Job was cancelled
+        :return: None
+        """
+        updated = (
+            Job.objects.filter(pk=self.pk)
+            .exclude(state=JobState.CANCELLED)
+            .update(**values)
+        )
+        if not updated:
+            raise Cancelled(f"Job {self.pk} was cancelled.")
+
+    def _storage_values(self) -> typing.Dict:
+        """
+        Method returning the whole Job's storage prepared for saving, as done by save()
+
+        :return: values of the storage and storage_blob fields
+        """
+        codec = get_codec(self.storage_codec)
+        self.storage_blob = codec.encode(self.storage) if codec.binary else None
+
+        return {
+            "storage": self._meta.get_field("storage").pre_save(self, False),
+            "storage_blob": self.storage_blob,
+        }
+
+    def get_expired_results(
+        self,
+        WorkflowClass: type,
+        retention: str = None,
+        last_n: int = None,
+        window: int = None,
+    ) -> typing.List[typing.List[typing.Union[str, int]]]:
+        """
+        A method selecting the results of the executed Steps, which should be dropped according to their retention policy
+
+        :param WorkflowClass: class object inheriting from django_wfe.workflows.Workflow
+        :param retention: policy overriding the ones defined by the Steps and the Workflow
+        :param last_n: number of the most recent results kept by the overriding Retention.KEEP_LAST_N policy
+        :param window: number of the most recent results to be checked (all results, if not provided)
+        :return: list of the results' paths in the Job's storage
+        """
+        paths = []
+        # policies by the Steps' paths
+        policies = {}
+
+        # the current Step's result has not been consumed yet
+        start = max(self.current_step_number - window, 0) if window is not None else 0
+        for number, step_data in enumerate(
+            self.storage["data"][start : self.current_step_number], start
+        ):
+            if "result" not in step_data:
+                continue
+
+            if retention is not None:
+                policy = retention
+                kept = last_n or 1
+            else:
+                if step_data["step"] not in policies:
+                    try:
+                        StepClass = self.import_class(step_data["step"])
+                    except (ImportError, AttributeError, ValueError):
+                        policies[step_data["step"]] = (Retention.KEEP, 1)
+                    else:
+                        policies[step_data["step"]] = get_retention(
+                            StepClass, WorkflowClass
+                        )
+                policy, kept = policies[step_data["step"]]
+
+            if policy == Retention.DROP_AFTER_CONSUMED or (
+                policy == Retention.KEEP_LAST_N
+                and self.current_step_number - number >= kept
+            ):
+                paths.append(["data", number, "result"])
+
+        return paths
+
+    def spawn_child(self, workflow_path: str, _input=None):
+        """
+        A method creating a child Job of the provided Workflow, launched as a sub-workflow of this Job
+
+        :param workflow_path: python path of the registered Workflow definition
+        :param _input: input passed to the child's first Step
+        :return: saved child Job instance
+        :raises: django_wfe.models.Workflow.DoesNotExist in case the Workflow is not registered in the database
+        """
+        child = Job(
+            workflow=Workflow.objects.get(path=workflow_path),
+            parent=self,
+            # large inputs (and the not loaded artifacts passed through) are kept as the artifact references
+            storage={
+                "data": [],
+                "input": artifacts.offload(_input, codec=self.storage_codec),
+            },
+        )
+        child.save()
+
+        return child
+
+    def provide_external_input(self, external_data: typing.Dict):
+        """
+        A method gathering user's input for the current Step
+
+        :return:
+        :raises: pydantic.ValidationError
+        """
+        try:
+            CurrentStep = self.import_class(self.current_step)
+        except ImportError:
+            print(
+                f"Provide Exteranal input for {self.workflow.name}: import error of {self.current_step}"
+            )
+            self.state = JobState.FAILED
+            return
+
+        if not CurrentStep.UserInputSchema.__fields__:
+            raise WrongState(
+                f"Current Workflow's Step {CurrentStep} does not accept external input."
+            )
+
+        if self.state != JobState.INPUT_REQUIRED:
+            raise WrongState(f"Wrong Workflow's state: {self.state}.")
+
+        # pydantic validate the data structure
+        external_data = CurrentStep.UserInputSchema(**external_data)
+
+        # update serialized job's state with provided external data
+        self.state = JobState.INPUT_RECEIVED
+        self.set_step_data(
+            "external_data", external_data.dict(), update_fields=["state"]
+        )
+        self._notify()
+
+    @classmethod
+    def provide_external_inputs(
+        cls, inputs: typing.Dict[int, typing.Dict], using: str = None
+    ) -> typing.Tuple[typing.List[int], typing.Dict[int, str]]:
+        """
+        Method gathering user's input for the current Steps of multiple Jobs in a single transaction.
+
+        The Jobs are locked for the time of the update, and the inputs are validated with the UserInputSchema
+        of their Steps (grouped by the Step, so every Step is imported once). Invalid inputs do not prevent
+        the valid ones from being saved.
+
+        :param inputs: dictionary mapping the Jobs' IDs to their external data
+        :param using: alias of the database (the default write database of the Jobs if not provided)
+        :return: tuple of the IDs of the Jobs, which received their input, and the errors of the other Jobs (by ID)
+        """
+        using = using or router.db_for_write(cls)
+        inputs = {int(job_id): data for job_id, data in inputs.items()}
+        received, errors = [], {}
+
+        with transaction.atomic(using=using):
+            jobs = (
+                cls.objects.using(using)
+                .select_for_update(of=("self",))
+                .select_related("workflow")
+                .in_bulk(list(inputs))
+            )
+
+            steps = {}
+            for job_id in inputs:
+                if job_id not in jobs:
+                    errors[job_id] = "Job does not exist."
+                else:
+                    steps.setdefault(jobs[job_id].current_step, []).append(jobs[job_id])
+
+            for step, step_jobs in steps.items():
+                try:
+                    CurrentStep = cls.import_class(step)
+                except (ImportError, AttributeError, ValueError):
+                    errors.update(
+                        {job.id: f"Import error of {step}." for job in step_jobs}
+                    )
+                    continue
+
+                if not CurrentStep.UserInputSchema.__fields__:
+                    errors.update(
+                        {
+                            job.id: f"Current Workflow's Step {CurrentStep} does not accept external input."
+                            for job in step_jobs
+                        }
+                    )
+                    continue
+
+                for job in step_jobs:
+                    if job.state != JobState.INPUT_REQUIRED:
+                        errors[job.id] = f"Wrong Workflow's state: {job.state}."
+                        continue
+
+                    try:
+                        external_data = CurrentStep.UserInputSchema.parse_obj(
+                            inputs[job.id]
+                        )
+                    except pydantic.ValidationError as exception:
+                        errors[job.id] = str(exception)
+                        continue
+
+                    job.state = JobState.INPUT_RECEIVED
+                    job.set_step_data(
+                        "external_data", external_data.dict(), update_fields=["state"]
+                    )
+                    received.append(job.id)
+
+            notifications.publish_many(received, JobState.INPUT_RECEIVED, using=using)
+
+        return received, errors
+
+    def _run_next(self):
+        """
+        A method recursively executing Steps of the Workflow
+
+        :return: None
+        """
+
+        WorkflowClass, StepClass = self._import_classes()
+
+        try:
+            current_step = self._step_initialize(StepClass)
+        except InputRequired:
+            return
+
+        _input = self._get_step_input()
+
+        try:
+            self._step_rate_limit(current_step)
+            result = self._step_execute(current_step, _input=_input)
+        except Suspended:
+            return
+
+        transition = self._step_calculate_transition(
+            current_step, result=result, _input=_input
+        )
+
+        try:
+            self._workflow_transition(WorkflowClass, StepClass, transition)
+        except FinishedWorkflow:
+            return
+
+        self._run_next()
+
+    async def _arun_next(self):
+        """
+        A coroutine iteratively executing Steps of the Workflow (the async counterpart of _run_next())
+
+        :return: None
+        """
+        in_thread = functools.partial(sync_to_async, thread_sensitive=False)
+
+        while True:
+            WorkflowClass, StepClass = await in_thread(self._import_classes)()
+
+            try:
+                current_step = await in_thread(self._step_initialize)(StepClass)
+            except InputRequired:
+                return
+
+            _input = self._get_step_input()
+
+            try:
+                await in_thread(self._step_rate_limit)(current_step)
+                result = await self._astep_execute(current_step, _input=_input)
+            except Suspended:
+                return
+
+            transition = await in_thread(self._step_calculate_transition)(
+                current_step, result=result, _input=_input
+            )
+
+            try:
+                await in_thread(self._workflow_transition)(
+                    WorkflowClass, StepClass, transition
+                )
+            except FinishedWorkflow:
+                return
+
+    def _import_classes(self) -> typing.Tuple[type, type]:
+        """
+        Method importing the Workflow class and the currently executed Step class
+
+        :return: tuple of the Workflow class and the Step class
+        """
+        try:
+            WorkflowClass = self.import_class(self.workflow.path)
+        except ImportError:
+            print(
+                f"Execute of {self.workflow.name} failed: import error of {self.workflow.path}"
+            )
+            raise
+
+        # try importing current step class
+        try:
+            StepClass = self.import_class(self.current_step)
+        except ImportError:
+            print(
+                f"Execute of {self.workflow.name} failed: import error of {self.current_step}"
+            )
+            raise
+
+        return WorkflowClass, StepClass
+
+    def _get_step_input(self):
+        """
+        Method returning _input of the currently executed Step
+
+        :return: previous step result (or the Job's initial input for the first step)
+        """
+        _input = (
+            self.storage["data"][self.current_step_number - 1]["result"]
+            if self.storage["data"]
+            else self.storage.get("input")
+        )
+
+        # results kept in the artifact store are loaded on the first access
+        return artifacts.resolve(_input, lazy=True)
+
+    def _step_initialize(self, StepClass: type):
+        """
+        Method initializing currently executed Step instance
+
+        :param StepClass: class object inheriting from django_wfe.steps.Step
+        :raises InputRequired: in case current Step requires an external input (similarly to StopIteration exception)
+        :raises Cancelled: in case the Job was cancelled or its deadline has passed
+        :return: StepClass instance
+        """
+        if self.deadline is not None and timezone.now() >= self.deadline:
+            self._log(f"Deadline of the Job ({self.deadline}) has passed")
+            raise Cancelled(f"Deadline of the Job {self.pk} has passed.")
+
+        step = StepClass(job=self)
+
+        # break execution if input is required by the current Step and it was not provided yet (the stored input
+        # is checked, as the Job may be resumed in other states, e.g. after the Step was deferred by its rate limit)
+        if step.requires_input and step._get_external_input() is None:
+            self.state = JobState.INPUT_REQUIRED
+            self._save_state()
+
+            self._log(
+                f"Step #{self.current_step_number} '{StepClass.__name__}': input required"
+            )
+            self._emit_event(JobEventType.STEP_INPUT_REQUIRED)
+            self._release_slot()
+
+            raise InputRequired
+        else:
+            self._log(
+                f"Step #{self.current_step_number} '{step.__class__.__name__}': processing started"
+            )
+
+        self.state = JobState.ONGOING
+        self.progress = None
+        # the Job is resumed: its wake up time has passed (the Steps suspending it keep their own times in their data)
+        self.wake_at = None
+        self._save_state()
+        self._emit_event(JobEventType.STEP_STARTED)
+
+        return step
+
+    def _step_rate_limit(self, step):
+        """
+        Method enforcing the Step's RATE_LIMIT, deferring the Step's execution until its reserved call is due
+
+        :param step: instance of the class inheriting from django_wfe.steps.Step
+        :raises Suspended: in case the Step's execution was deferred
+        :return: None
+        """
+        if step.RATE_LIMIT is None:
+            return
+
+        reserved_at = self._get_step_storage().get("rate_limit_at")
+        if reserved_at is None:
+            wake_at = rate_limits.reserve(step.__class__)
+            # the reserved call is kept in the Step's data, so it's not reserved again once the Job is resumed
+            # (after the deferral, or e.g. by a Wait Step's wake up)
+            self.set_step_data("rate_limit_at", (wake_at or timezone.now()).isoformat())
+            if wake_at is None:
+                return
+
+            self._log(
+                f"Step #{self.current_step_number} '{step.__class__.__name__}': rate limit {step.RATE_LIMIT} "
+                f"exceeded, execution deferred until {wake_at}"
+            )
+        else:
+            wake_at = parse_datetime(reserved_at)
+            if wake_at <= timezone.now():
+                # the Job was resumed after the deferral, its call has been already reserved
+                return
+
+        self.wake_at = wake_at
+        suspension = Suspended(callback=self.schedule_wake)
+        self._step_suspend(step, suspension)
+        raise suspension
+
+    def _step_execute(self, step, _input=None):
+        """
+        Method conducting execute() method of the Step
+
+        :param step: instance of the class inheriting from django_wfe.steps.Step
+        :param _input: previous step's output
+        :return: result of the step execution
+        """
+
+        self._log(
+            f"Step #{self.current_step_number} '{step.__class__.__name__}': performing execute():"
+        )
+        started = time.perf_counter()
+
+        try:
+            if step.executor == "process":
+                result = process_pool.execute(
+                    self.current_step,
+                    _input=_input,
+                    external_input=step._get_external_input(),
+                    logfile=self.logfile,
+                    # the Step is profiled in the pool's process
+                    profile_file=self.profile_file if self.profile else None,
+                )
+            elif self.profile:
+                with Tee(self.logfile, "a"), profiling.profile(self.profile_file):
+                    result = step._perform_execute(_input=_input, logfile=self.logfile)
+            else:
+                with Tee(self.logfile, "a"):
+                    result = step._perform_execute(_input=_input, logfile=self.logfile)
+
+        except Suspended as suspension:
+            self._step_suspend(step, suspension, time.perf_counter() - started)
+            raise
+
+        except Cancelled:
+            raise
+
+        except Exception as exception:
+            self._log_exception(exception)
+            self._emit_event(
+                JobEventType.STEP_FAILED,
+                duration=time.perf_counter() - started,
+                error=exception,
+            )
+            raise
+
+        self._step_store_result(step, result, time.perf_counter() - started)
+
+        return result
+
+    async def _astep_execute(self, step, _input=None):
+        """
+        Coroutine conducting execute() method of the Step, awaiting async Steps on the event loop
+
+        Note: the output printed by async Steps is not duplicated to the logfile, and async Steps are not profiled.
+
+        :param step: instance of the class inheriting from django_wfe.steps.Step
+        :param _input: previous step's output
+        :return: result of the step execution
+        """
+        in_thread = functools.partial(sync_to_async, thread_sensitive=False)
+
+        if not step.is_async:
+            return await in_thread(self._step_execute)(step, _input=_input)
+
+        await in_thread(self._log)(
+            f"Step #{self.current_step_number} '{step.__class__.__name__}': performing execute():"
+        )
+        if self.profile:
+            # the profiler would measure the other Jobs' coroutines awaited on the same event loop as well
+            await in_thread(self._log)(
+                f"Step #{self.current_step_number} '{step.__class__.__name__}': async Step executed "
+                f"on the event loop is not profiled"
+            )
+        started = time.perf_counter()
+
+        try:
+            result = await step._aperform_execute(_input=_input, logfile=self.logfile)
+
+        except Suspended as suspension:
+            await in_thread(self._step_suspend)(
+                step, suspension, time.perf_counter() - started
+            )
+            raise
+
+        except Cancelled:
+            raise
+
+        except Exception as exception:
+            await in_thread(self._log_exception)(exception)
+            await in_thread(self._emit_event)(
+                JobEventType.STEP_FAILED,
+                duration=time.perf_counter() - started,
+                error=exception,
+            )
+            raise
+
+        await in_thread(self._step_store_result)(
+            step, result, time.perf_counter() - started
+        )
+
+        return result
+
+    def _step_suspend(
+        self, step, suspension: Suspended, duration: typing.Optional[float] = None
+    ):
+        """
+        Method suspending the Job on the Step's request
+
+        :param step: instance of the class inheriting from django_wfe.steps.Step
+        :param suspension: exception raised by the Step
+        :param duration: time of the Step's execution in seconds
+        :return: None
+        """
+        self.state = JobState.WAITING
+        self._save_state()
+
+        self._log(
+            f"Step #{self.current_step_number} '{step.__class__.__name__}': execution suspended"
+        )
+        self._emit_event(JobEventType.STEP_SUSPENDED, duration=duration)
+
+        # actions waking the Job up have to be ordered after it's marked as waiting
+        if suspension.callback is not None:
+            suspension.callback()
+
+        # the Job waiting for its sub-workflows or chunks keeps its slot
+        self._release_slot()
+
+    def _step_store_result(self, step, result, duration: typing.Optional[float] = None):
+        """
+        Method serializing the result of the Step's execution
+
+        :param step: instance of the class inheriting from django_wfe.steps.Step
+        :param result: result of the step execution
+        :param duration: time of the Step's execution in seconds
+        :return: None
+        """
+        # results passed through without loading them are logged as their artifact references
+        logged = (
+            result.reference if isinstance(result, artifacts.LazyArtifact) else result
+        )
+        self._log(
+            f"Step #{self.current_step_number} '{step.__class__.__name__}': execution finished successfully with a result: {logged}"
+        )
+
+        # large results are moved to the artifact store
+        result = artifacts.offload(result, codec=self.storage_codec)
+
+        # the latest progress (skipped by the throttling) is saved along with the result
+        self._set_reported_progress()
+        self.set_step_data("result", result, update_fields=self.STATE_FIELDS)
+        self._emit_event(JobEventType.STEP_FINISHED, duration=duration)
 
     def _step_calculate_transition(self, step, _input=None, result=None) -> int:
         """
@@ -319,13 +1454,8 @@ class Job(models.Model):
                 transition = step._perform_transition(_input=_input, result=result)
 
         except Exception as exception:
-            # log exception in the logfile
-            with open(self.logfile, "a") as log:
-                log.write(
-                    "".join(
-                        traceback.TracebackException.from_exception(exception).format()
-                    )
-                )
+            self._log_exception(exception)
+            self._emit_event(JobEventType.STEP_FAILED, error=exception)
             raise
 
         self._log(
@@ -346,6 +1476,10 @@ class Job(models.Model):
         :raises FinishedWorkflow: in case currently executed Step is the last one in the workflow (similarly to StopIteration exception)
         :return: None
         """
+        # drop the results, which are no longer needed (only the recent ones expire on the transition)
+        expired_results = self.get_expired_results(
+            WorkflowClass, window=get_retention_window(WorkflowClass)
+        )
 
         if (
             WorkflowClass.DIGRAPH.get(StepClass) is None
@@ -353,9 +1487,13 @@ class Job(models.Model):
         ):
             # workflow's finished
             self.state = JobState.FINISHED
-            self.save()
+            self._save_state(delete_paths=expired_results)
 
             self._log(f"---- WORKFLOW FINISHED SUCCESSFULLY ----")
+            self._emit_event(JobEventType.JOB_FINISHED)
+            self._compress_log()
+            self._release_slot()
+            self._wake_parent()
 
             raise FinishedWorkflow
 
@@ -369,7 +1507,155 @@ class Job(models.Model):
             + WorkflowClass.DIGRAPH.get(StepClass)[transition].__name__
         )
         self.current_step_number += 1
-        self.save()
+        self._save_state(delete_paths=expired_results)
+
+    def _save_state(self, delete_paths: typing.List = None):
+        """
+        Method saving the Job's execution state, without rewriting its storage
+
+        :param delete_paths: paths of the Job's storage to be removed in the same query
+        :raises Cancelled: in case the Job was cancelled
+        :return: None
+        """
+        if delete_paths:
+            self.delete_storage_paths(delete_paths, update_fields=self.STATE_FIELDS)
+        else:
+            self._update(**{field: getattr(self, field) for field in self.STATE_FIELDS})
+
+        self._notify()
+
+    def _notify(self):
+        """
+        Method publishing the notification of the Job's state
+
+        :return: None
+        """
+        notifications.publish(
+            self.id,
+            self.state,
+            using=router.db_for_write(Job, instance=self),
+            step=self.current_step,
+            step_number=self.current_step_number,
+            progress=self.progress,
+        )
+
+    def _fail(self):
+        """
+        Method marking the Job as failed
+
+        :return: None
+        """
+        self.state = JobState.FAILED
+        try:
+            self._save_state()
+        except Cancelled:
+            # the Job was cancelled during the failed Step
+            self._end_cancelled()
+            return
+
+        self._log("---- WORKFLOW EXECUTION FAILED ----")
+        self._emit_event(JobEventType.JOB_FAILED)
+        self._compress_log()
+        self._release_slot()
+        self._wake_parent()
+
+    def _end_cancelled(self):
+        """
+        Method ending the execution of the Job, which was cancelled, passed its deadline or was interrupted
+        by a Step raising django_wfe.exceptions.Cancelled
+
+        :return: None
+        """
+        # no-op for the Jobs already cancelled with Job.cancel()
+        Job.cancel(Job.objects.filter(pk=self.pk))
+        self.state = JobState.CANCELLED
+
+        self._log("---- WORKFLOW CANCELLED ----")
+        self._compress_log()
+        self._release_slot()
+        self._wake_parent()
+
+    def _log_exception(self, exception: Exception):
+        """
+        Method logging the exception's traceback in the logfile
+
+        :param exception: exception to be logged
+        :return: None
+        """
+        with open(self.logfile, "a") as log:
+            log.write(
+                "".join(traceback.TracebackException.from_exception(exception).format())
+            )
+
+    def _emit_event(
+        self,
+        event: str,
+        duration: typing.Optional[float] = None,
+        error: typing.Optional[Exception] = None,
+    ):
+        """
+        Method saving a structured event of the Job's execution
+
+        :param event: django_wfe.models.JobEventType
+        :param duration: time of the Step's execution in seconds
+        :param error: exception which caused the failure
+        :return: None
+        """
+        if not WFE_JOB_EVENTS:
+            return
+
+        JobEvent.objects.create(
+            job_id=self.id,
+            workflow_id=self.workflow_id,
+            step=self.current_step,
+            step_number=self.current_step_number,
+            event=event,
+            duration=duration,
+            error=type(error).__name__ if error is not None else None,
+        )
+
+    def _compress_log(self):
+        """
+        Method compressing the log of the ended Job, unless its MapStep's chunks are still being executed
+        (the last of them compresses the log)
+
+        :return: None
+        """
+        if (
+            WFE_LOG_COMPRESSION
+            and not self.map_chunks.filter(state=ChunkState.ONGOING).exists()
+        ):
+            compress_log(self.logfile)
+
+    def _release_slot(self):
+        """
+        Method admitting the queued Jobs in place of this ended (or suspended) Job
+
+        :return: None
+        """
+        from . import scheduling
+
+        scheduling.release_slot(self)
+
+    def _wake_parent(self):
+        """
+        Method resuming the parent Job, waiting for this Job to end
+
+        :return: None
+        """
+        if self.parent_id is not None:
+            Job.wake(self.parent_id)
+
+    def _get_step_storage(self) -> typing.Dict:
+        """
+        Method returning the serialized data of the currently executed Step (to be updated with set_step_data())
+
+        :return: dict kept in Job's storage["data"] for the current Step (empty, if it's not stored yet)
+        """
+        try:
+            return self.storage["data"][self.current_step_number]
+        except IndexError:
+            return {}
 
     def _log(self, msg: str):
         """
@@ -383,10 +1669,370 @@ class Job(models.Model):
             print(f"{datetime.datetime.now()} {msg}")
 
 
+class JobEvent(models.Model):
+    """
+    An append-only table of structured events of the Jobs' executions (steps started, finished, failed etc.)
+    """
+
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="events")
+    # denormalized, so the events can be filtered without joining the Job table
+    workflow = models.ForeignKey(Workflow, on_delete=models.CASCADE, db_index=False)
+    step = models.CharField(max_length=300, help_text="Python path of the Step")
+    step_number = models.IntegerField()
+    event = models.CharField(max_length=30, choices=JobEventType.CHOICES)
+    timestamp = models.DateTimeField(default=timezone.now)
+    duration = models.FloatField(
+        null=True, default=None, help_text="Time of the Step's execution in seconds"
+    )
+    error = models.CharField(
+        max_length=200,
+        null=True,
+        default=None,
+        help_text="Class of the exception which caused the failure",
+    )
+
+    class Meta:
+        indexes = [
+            BrinIndex(fields=["timestamp"], name="django_wfe_event_time_brin"),
+            models.Index(
+                fields=["event", "timestamp"], name="django_wfe_event_type_idx"
+            ),
+            models.Index(
+                fields=["step", "timestamp"], name="django_wfe_event_step_idx"
+            ),
+            models.Index(
+                fields=["workflow", "timestamp"], name="django_wfe_event_wf_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.job_id}:{self.step_number}:{self.event}"
+
+
+class RateLimitBucket(models.Model):
+    """
+    A table keeping the token buckets of the Steps' rate limits (see django_wfe.rate_limits.DatabaseRateLimiter)
+    """
+
+    key = models.CharField(max_length=300, unique=True)
+    tokens = models.FloatField(
+        help_text="Tokens left in the bucket (negative, if calls are reserved)"
+    )
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return self.key
+
+
+class MapChunk(models.Model):
+    """
+    A table keeping a chunk of the list _input processed by a django_wfe.steps.MapStep, along with its results.
+    """
+
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="map_chunks")
+    step_number = models.IntegerField()
+    index = models.IntegerField()
+    items = JSONField(help_text="Chunk of the MapStep's _input", encoder=WFEJSONEncoder)
+    result = JSONField(
+        null=True,
+        default=None,
+        help_text="Results of the chunk's items execution",
+        encoder=WFEJSONEncoder,
+    )
+    state = models.CharField(max_length=20, default=ChunkState.PENDING)
+    wake_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        default=None,
+        help_text="Time of the next item's call reserved by the STEP's RATE_LIMIT, until which the chunk is deferred",
+    )
+    claimed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        default=None,
+        help_text="Time of the last heartbeat of the worker executing the chunk (see django_wfe.leases)",
+    )
+
+    class Meta:
+        unique_together = ("job", "step_number", "index")
+        indexes = [models.Index(fields=["job", "step_number", "state"])]
+
+    def __str__(self):
+        return f"{self.job}:{self.step_number}:{self.index}"
+
+    @classmethod
+    def dispatch(
+        cls, job_id: typing.Union[str, int], step_number: int, count: int = 1
+    ) -> int:
+        """
+        Method enqueueing next pending chunks of the MapStep for the execution.
+
+        :param job_id: django_wfe.models.Job ID
+        :param step_number: number of the MapStep in the Job's execution
+        :param count: maximum number of the chunks to enqueue
+        :return: number of enqueued chunks
+        """
+        from .tasks import process_map_chunk
+
+        with transaction.atomic():
+            chunk_ids = list(
+                cls.objects.select_for_update(skip_locked=True)
+                .filter(
+                    job_id=job_id, step_number=step_number, state=ChunkState.PENDING
+                )
+                .order_by("index")
+                .values_list("id", flat=True)[:count]
+            )
+            cls.objects.filter(id__in=chunk_ids).update(state=ChunkState.QUEUED)
+
+        for chunk_id in chunk_ids:
+            process_map_chunk.send(chunk_id=chunk_id)
+
+        return len(chunk_ids)
+
+    @classmethod
+    def progress(cls, job_id: typing.Union[str, int], step_number: int) -> typing.Dict:
+        """
+        Method summarizing the execution of the MapStep's chunks
+
+        :param job_id: django_wfe.models.Job ID
+        :param step_number: number of the MapStep in the Job's execution
+        :return: dict with the total, finished and failed chunks' counts
+        """
+        states = dict(
+            cls.objects.filter(job_id=job_id, step_number=step_number)
+            .values_list("state")
+            .annotate(models.Count("id"))
+        )
+
+        return {
+            "total": sum(states.values()),
+            "finished": states.get(ChunkState.FINISHED, 0),
+            "failed": states.get(ChunkState.FAILED, 0),
+        }
+
+    @classmethod
+    def annotate_progress(cls, jobs: models.QuerySet) -> models.QuerySet:
+        """
+        Method counting the chunks of the Jobs' current MapSteps in the Jobs' query (map_total, map_finished and
+        map_failed annotations used by Job.map_progress), instead of a query per Job
+
+        :param jobs: django_wfe.models.Job queryset
+        :return: annotated queryset
+        """
+
+        def count(**filters):
+            return models.Subquery(
+                cls.objects.filter(
+                    job=models.OuterRef("pk"),
+                    step_number=models.OuterRef("current_step_number"),
+                    **filters,
+                )
+                .order_by()
+                .values("job")
+                .annotate(count=models.Count("id"))
+                .values("count"),
+                output_field=models.IntegerField(),
+            )
+
+        return jobs.annotate(
+            map_total=count(),
+            map_finished=count(state=ChunkState.FINISHED),
+            map_failed=count(state=ChunkState.FAILED),
+        )
+
+    def claim(self) -> bool:
+        """
+        A method atomically marking the chunk as being executed, so the duplicated deliveries of the process_map_chunk
+        message are skipped. ONGOING chunks are claimed again, once the lease of the worker executing them has expired
+        (see django_wfe.leases).
+
+        :return: True if the chunk was claimed, False if it was not queued (e.g. it's being executed by another worker)
+        """
+        now = timezone.now()
+        return bool(
+            MapChunk.objects.filter(
+                models.Q(state=ChunkState.QUEUED)
+                | models.Q(
+                    state=ChunkState.ONGOING,
+                    claimed_at__lt=leases.expired_before(now),
+                ),
+                id=self.id,
+            ).update(state=ChunkState.ONGOING, claimed_at=now)
+        )
+
+    @classmethod
+    def requeue_expired(cls) -> typing.List[int]:
+        """
+        Method re-queueing the ONGOING chunks, which lease has expired (e.g. their worker crashed and their
+        process_map_chunk message was not redelivered)
+
+        :return: IDs of the re-queued chunks
+        """
+        from .tasks import process_map_chunk
+
+        expired = cls.objects.filter(
+            state=ChunkState.ONGOING, claimed_at__lt=leases.expired_before()
+        ).values_list("id", flat=True)
+
+        requeued = []
+        for chunk_id in expired:
+            # the state is switched atomically, so the chunk claimed meanwhile is not re-queued
+            if cls.objects.filter(
+                id=chunk_id,
+                state=ChunkState.ONGOING,
+                claimed_at__lt=leases.expired_before(),
+            ).update(state=ChunkState.QUEUED, claimed_at=None):
+                process_map_chunk.send(chunk_id=chunk_id)
+                requeued.append(chunk_id)
+
+        return requeued
+
+    def execute(self):
+        """
+        A method executing MapStep's STEP on every item of the chunk, and resuming the Job after the last chunk is done
+
+        :return: None
+        """
+        job = self.job
+        if job.state in JobState.TERMINAL:
+            # chunks of the ended (e.g. failed or cancelled) Jobs are not executed
+            if MapChunk.objects.filter(
+                id=self.id, state__in=(ChunkState.PENDING, ChunkState.QUEUED)
+            ).update(state=ChunkState.CANCELLED):
+                # the chunk re-queued after its worker's crash may have deferred the log's compression
+                self._compress_job_log(job)
+            return
+
+        # claim the chunk, so duplicated messages are not processed twice
+        if not self.claim():
+            return
+
+        MapStepClass = job.import_class(job.current_step)
+        step = MapStepClass.STEP(job=job)
+        # results of the items executed before the chunk was deferred by the rate limit
+        results = list(self.result or [])
+
+        try:
+            with Tee(job.logfile, "a"), leases.held(self):
+                for item in self.items[len(results) :]:
+                    if not self._rate_limit(step):
+                        self.result = results
+                        self._defer(job, MapStepClass)
+                        return
+
+                    results.append(
+                        step._perform_execute(_input=item, logfile=job.logfile)
+                    )
+            self.result = results
+        except Exception as exception:
+            self.result = results
+            job._log_exception(exception)
+
+            self.state = ChunkState.FAILED
+            self.save()
+
+            job._log(
+                f"Step #{self.step_number} '{MapStepClass.__name__}': chunk #{self.index} failed"
+            )
+
+            # resume the Job to fail the MapStep
+            Job.wake(job.id)
+            self._compress_job_log(job)
+            return
+
+        self.state = ChunkState.FINISHED
+        self.save()
+
+        progress = MapChunk.progress(job.id, self.step_number)
+        job._log(
+            f"Step #{self.step_number} '{MapStepClass.__name__}': chunk #{self.index} finished "
+            f"({progress['finished']}/{progress['total']})"
+        )
+
+        if progress["failed"] == 0:
+            MapChunk.dispatch(job.id, self.step_number)
+
+        if progress["finished"] == progress["total"]:
+            Job.wake(job.id)
+
+        self._compress_job_log(job)
+
+    def _rate_limit(self, step) -> bool:
+        """
+        Method enforcing the STEP's RATE_LIMIT before the execution of the chunk's next item
+
+        :param step: instance of the MapStep's STEP class
+        :return: True if the item can be executed, False if its call is reserved for the time defined by wake_at
+        """
+        if step.RATE_LIMIT is None:
+            return True
+
+        if self.wake_at is None:
+            self.wake_at = rate_limits.reserve(step.__class__)
+            return self.wake_at is None
+
+        if self.wake_at <= timezone.now():
+            # the chunk was resumed after the deferral, the item's call has been already reserved
+            self.wake_at = None
+            return True
+
+        return False
+
+    def _defer(self, job: Job, MapStepClass: type):
+        """
+        Method deferring the execution of the chunk's remaining items, until the reserved call is due
+
+        :param job: the chunk's Job
+        :param MapStepClass: class object inheriting from django_wfe.steps.MapStep
+        :return: None
+        """
+        from .tasks import process_map_chunk
+
+        # the deferred chunk still counts to the MapStep's CONCURRENCY
+        self.state = ChunkState.QUEUED
+        self.save()
+
+        job._log(
+            f"Step #{self.step_number} '{MapStepClass.__name__}': chunk #{self.index} deferred by the rate limit "
+            f"{MapStepClass.STEP.RATE_LIMIT} until {self.wake_at} ({len(self.result)}/{len(self.items)} items executed)"
+        )
+
+        delay = max((self.wake_at - timezone.now()).total_seconds(), 0)
+        process_map_chunk.send_with_options(
+            kwargs={"chunk_id": self.id}, delay=int(delay * 1000)
+        )
+
+    def _compress_job_log(self, job: Job):
+        """
+        Method compressing the log of the Job, which has ended while the chunk was executed
+
+        :param job: the chunk's Job
+        :return: None
+        """
+        if (
+            WFE_LOG_COMPRESSION
+            and Job.objects.filter(id=job.id, state__in=JobState.TERMINAL).exists()
+        ):
+            job._compress_log()
+
+
 class Watchdog(Singleton):
     """
-    A flag model for the watchdog thread (updating database with user defined WDK models)
-    to be triggered only once
+    A model of the watchdog processes' leadership: the watchdog process (updating database with user defined
+    WDK models), which performs the periodic work (see django_wfe.election)
     """
 
-    running = models.BooleanField(default=False)
+    leader = models.CharField(
+        max_length=300,
+        null=True,
+        blank=True,
+        default=None,
+        help_text="Host and process ID of the elected watchdog",
+    )
+    heartbeat_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        default=None,
+        help_text="Time of the leader's last heartbeat",
+    )
@@ -0,0 +1,271 @@
+"""
+The module implementing push notifications of the Jobs' state changes.
+
+Changes are published with PostgreSQL NOTIFY on WFE_NOTIFY_CHANNEL channel (delivered only once the transaction
+is committed), and received by a single listener thread per process, which dispatches them to the subscriptions
+of the streaming endpoint. With other databases, notifications are dispatched only within the publishing process.
+"""
+
+import json
+import queue
+import select
+import typing
+import logging
+import threading
+
+from django.db import connections, transaction
+
+from .settings import WFE_NOTIFICATIONS, WFE_NOTIFY_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes or longer
+MAX_PAYLOAD_SIZE = 7999
+# characters of the reported progress message included in the notifications (the whole message is saved to the Job)
+MAX_MESSAGE_LENGTH = 1000
+
+
+class Subscription:
+    """
+    Subscription of the state changes of a set of Jobs, queueing received notifications
+    """
+
+    def __init__(self, listener, job_ids: typing.Iterable[int], maxsize: int = 1000):
+        self.listener = listener
+        self.job_ids = set(job_ids)
+        self.queue = queue.Queue(maxsize=maxsize)
+
+    def get(self, timeout: float = None) -> typing.Optional[typing.Dict]:
+        """
+        Method waiting for the next notification
+
+        :param timeout: maximum time of waiting in seconds
+        :return: notification's payload, or None if the timeout passed
+        """
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def put(self, payload: typing.Dict):
+        try:
+            self.queue.put_nowait(payload)
+        except queue.Full:
+            # the client does not keep up, it will still receive further notifications
+            pass
+
+    def close(self):
+        self.listener.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, _type, _value, _traceback):
+        self.close()
+
+
+class Listener(threading.Thread):
+    """
+    Daemon thread listening to the notifications with a dedicated database connection, and dispatching them
+    to the process' subscriptions
+    """
+
+    # time of waiting for the notifications, before checking if the thread should stop
+    POLL_TIMEOUT = 5
+    RECONNECT_DELAY = 1
+
+    def __init__(self, using: str = "default"):
+        super().__init__(name="django-wfe-notifications", daemon=True)
+
+        self.using = using
+        self.subscriptions = {}
+        self.lock = threading.Lock()
+        self.listening = threading.Event()
+        self.stopped = threading.Event()
+
+    def subscribe(self, job_ids: typing.Iterable[int]) -> Subscription:
+        subscription = Subscription(self, job_ids)
+
+        with self.lock:
+            for job_id in subscription.job_ids:
+                self.subscriptions.setdefault(job_id, set()).add(subscription)
+
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self.lock:
+            for job_id in subscription.job_ids:
+                subscriptions = self.subscriptions.get(job_id, set())
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    self.subscriptions.pop(job_id, None)
+
+    def dispatch(self, payload: typing.Dict):
+        with self.lock:
+            subscriptions = list(self.subscriptions.get(payload["job"], ()))
+
+        for subscription in subscriptions:
+            subscription.put(payload)
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                self.listen()
+            except Exception:
+                logger.exception("Listening to the Jobs' notifications failed.")
+                self.stopped.wait(self.RECONNECT_DELAY)
+
+    def listen(self):
+        wrapper = connections[self.using]
+        connection = wrapper.get_new_connection(wrapper.get_connection_params())
+        connection.autocommit = True
+
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f'LISTEN "{WFE_NOTIFY_CHANNEL}"')
+            self.listening.set()
+
+            while not self.stopped.is_set():
+                readable, _, _ = select.select([connection], [], [], self.POLL_TIMEOUT)
+                if not readable:
+                    continue
+
+                connection.poll()
+                while connection.notifies:
+                    notify = connection.notifies.pop(0)
+                    self.dispatch(json.loads(notify.payload))
+        finally:
+            self.listening.clear()
+            connection.close()
+
+    def stop(self):
+        self.stopped.set()
+
+
+def is_postgresql(using: str = "default") -> bool:
+    return connections[using].vendor == "postgresql"
+
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def get_listener() -> Listener:
+    """
+    Function returning the process' listener, starting its thread on the first call (PostgreSQL only)
+
+    :return: Listener instance
+    """
+    global _listener
+
+    with _listener_lock:
+        if _listener is None:
+            _listener = Listener()
+            if is_postgresql(_listener.using):
+                _listener.start()
+                _listener.listening.wait(timeout=Listener.POLL_TIMEOUT)
+
+    return _listener
+
+
+def subscribe(job_ids: typing.Iterable[int]) -> Subscription:
+    """
+    Function subscribing the state changes of the Jobs
+
+    :param job_ids: IDs of the Jobs
+    :return: Subscription instance (to be closed once it's no longer used)
+    """
+    return get_listener().subscribe(job_ids)
+
+
+def encode(payload: typing.Dict) -> str:
+    """
+    Function encoding the notification's payload, within the size limit of PostgreSQL NOTIFY
+
+    :param payload: notification's payload
+    :return: JSON encoded payload, with the progress message truncated (or only the Job's ID and state, if it's still
+        too long)
+    """
+    progress = payload.get("progress")
+    if progress and len(progress.get("message") or "") > MAX_MESSAGE_LENGTH:
+        payload = {
+            **payload,
+            "progress": {
+                **progress,
+                "message": progress["message"][: MAX_MESSAGE_LENGTH - 1] + "…",
+            },
+        }
+
+    # non-ASCII characters are escaped, so the length is the size in bytes
+    data = json.dumps(payload)
+    if len(data) > MAX_PAYLOAD_SIZE:
+        data = json.dumps({"job": payload["job"], "state": payload["state"]})
+
+    return data
+
+
+def notify(payloads: typing.List[str], using: str = "default"):
+    """
+    Function sending the encoded payloads with PostgreSQL NOTIFY. Failures are logged, not to fail the saved changes.
+
+    :param payloads: JSON encoded payloads
+    :param using: alias of the database
+    :return: None
+    """
+    try:
+        # the savepoint keeps the current transaction usable, if NOTIFY fails
+        with transaction.atomic(using=using), connections[using].cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_notify(%s, payload) FROM unnest(%s::text[]) AS payload",
+                [WFE_NOTIFY_CHANNEL, payloads],
+            )
+    except Exception:
+        logger.exception("Publishing the Jobs' notifications failed.")
+
+
+def publish(job_id: int, state: str, using: str = "default", **extra):
+    """
+    Function publishing the state of the Job, once the current transaction is committed
+
+    :param job_id: django_wfe.models.Job ID
+    :param state: django_wfe.models.JobState
+    :param using: alias of the database, to which the Job was saved
+    :param extra: other data of the notification
+    :return: None
+    """
+    if not WFE_NOTIFICATIONS:
+        return
+
+    payload = {"job": int(job_id), "state": state, **extra}
+
+    if is_postgresql(using):
+        # NOTIFY is delivered by PostgreSQL only when the transaction is committed
+        notify([encode(payload)], using=using)
+    else:
+        transaction.on_commit(lambda: get_listener().dispatch(payload), using=using)
+
+
+def publish_many(job_ids: typing.Iterable[int], state: str, using: str = "default"):
+    """
+    Function publishing the same state of multiple Jobs with a single query, once the current transaction is committed
+
+    :param job_ids: django_wfe.models.Job IDs
+    :param state: django_wfe.models.JobState
+    :param using: alias of the database, to which the Jobs were saved
+    :return: None
+    """
+    if not WFE_NOTIFICATIONS:
+        return
+
+    payloads = [{"job": int(job_id), "state": state} for job_id in job_ids]
+
+    if is_postgresql(using):
+        notify([encode(payload) for payload in payloads], using=using)
+    else:
+
+        def dispatch():
+            listener = get_listener()
+            for payload in payloads:
+                listener.dispatch(payload)
+
+        transaction.on_commit(dispatch, using=using)
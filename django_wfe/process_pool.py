@@ -0,0 +1,174 @@
+"""
+The module implementing execution of CPU-bound Steps (declared with executor = "process") in a managed process pool.
+
+Step's _input and result are pickled, and payloads larger than WFE_PROCESS_INLINE_LIMIT bytes are passed between
+processes through temporary files (by default in /dev/shm, i.e. shared memory, if available) instead of the pool's pipes.
+"""
+
+import os
+import pickle
+import typing
+import tempfile
+import threading
+import multiprocessing
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+
+from . import profiling
+from .logging import Tee
+from .settings import (
+    WFE_PROCESS_POOL_SIZE,
+    WFE_PROCESS_INLINE_LIMIT,
+    WFE_PROCESS_TMP_DIR,
+)
+
+INLINE = "inline"
+FILE = "file"
+
+
+def pack(obj) -> typing.Tuple[str, typing.Union[bytes, str]]:
+    """
+    Function serializing the object to be passed between processes
+
+    :param obj: picklable object
+    :return: tuple of the payload type and the pickled object (INLINE) or the path to the file keeping it (FILE)
+    """
+    data = pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+
+    if len(data) <= WFE_PROCESS_INLINE_LIMIT:
+        return INLINE, data
+
+    with tempfile.NamedTemporaryFile(
+        dir=WFE_PROCESS_TMP_DIR, prefix="wfe_", delete=False
+    ) as file:
+        file.write(data)
+
+    return FILE, file.name
+
+
+def unpack(payload: typing.Tuple[str, typing.Union[bytes, str]]):
+    """
+    Function deserializing the object packed with pack(), removing its temporary file
+
+    :param payload: tuple returned by pack()
+    :return: unpickled object
+    """
+    kind, data = payload
+
+    if kind == INLINE:
+        return pickle.loads(data)
+
+    try:
+        with open(data, "rb") as file:
+            return pickle.load(file)
+    finally:
+        os.remove(data)
+
+
+def _initialize_process():
+    # spawned pool processes have to set up Django before importing user defined Steps
+    import django
+
+    django.setup()
+
+
+def _execute_step(
+    step_path: str, payload, logfile: str, profile_file: typing.Optional[str] = None
+):
+    """
+    Function executing the Step's execute() method in the pool's process
+
+    :param step_path: python path (dot notation) to the Step class
+    :param payload: packed tuple of _input and external_input
+    :param logfile: path to the Job's logfile, to which the process' output is duplicated
+    :param profile_file: path to the Job's pstats file, into which the execution's profile is merged (None: not profiled)
+    :return: packed result of the execution
+    """
+    from .models import Job
+
+    StepClass = Job.import_class(step_path)
+    _input, external_input = unpack(payload)
+
+    # Steps executed in the process pool do not have access to the Job instance
+    step = StepClass(job=None)
+
+    with Tee(logfile, "a"):
+        if profile_file is None:
+            result = step.execute(
+                _input, external_input=external_input, logfile=logfile
+            )
+        else:
+            with profiling.profile(profile_file):
+                result = step.execute(
+                    _input, external_input=external_input, logfile=logfile
+                )
+
+    return pack(result)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> concurrent.futures.ProcessPoolExecutor:
+    """
+    Function returning the worker process' pool, creating it on the first call
+
+    :return: ProcessPoolExecutor instance
+    """
+    global _pool
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=WFE_PROCESS_POOL_SIZE,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_initialize_process,
+            )
+
+    return _pool
+
+
+def _reset_pool():
+    global _pool
+
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+            _pool = None
+
+
+def execute(
+    step_path: str,
+    _input=None,
+    external_input=None,
+    logfile: str = None,
+    profile_file: str = None,
+):
+    """
+    Function executing the Step in the process pool and waiting for its result
+
+    :param step_path: python path (dot notation) to the Step class
+    :param _input: previous step's output
+    :param external_input: external input provided for the Step
+    :param logfile: path to the Job's logfile
+    :param profile_file: path to the Job's pstats file, if the Job is profiled
+    :return: result of the step execution
+    """
+    payload = pack((_input, external_input))
+
+    try:
+        result = (
+            get_pool()
+            .submit(_execute_step, step_path, payload, logfile, profile_file)
+            .result()
+        )
+    except BrokenProcessPool:
+        # one of the pool's processes died abruptly, the pool has to be recreated
+        _reset_pool()
+        raise
+    finally:
+        if payload[0] == FILE and os.path.exists(payload[1]):
+            os.remove(payload[1])
+
+    return unpack(result)
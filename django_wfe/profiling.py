@@ -0,0 +1,73 @@
+"""
+The module implementing the opt-in profiling of the Jobs.
+
+Jobs created with the profile flag (or sampled on their creation with the Workflow's PROFILE_RATE property,
+or WFE_PROFILE_RATE setting) are executed with the Steps' execute() wrapped in the cProfile profiler. Profiles of
+the Job's Steps are merged into a single pstats file next to the Job's log, which can be downloaded with the REST API
+and inspected e.g. with "python -m pstats" or snakeviz. Jobs without the flag are executed without any profiling code.
+"""
+
+import os
+import random
+import typing
+import pstats
+import cProfile
+import contextlib
+
+from .settings import WFE_PROFILE_RATE
+
+
+def get_rate(WorkflowClass: typing.Optional[type]) -> float:
+    """
+    Function returning the share of the Workflow's Jobs to be profiled
+
+    :param WorkflowClass: class object inheriting from django_wfe.workflows.Workflow (None if it cannot be imported)
+    :return: profiling rate between 0 (no Jobs) and 1 (all Jobs)
+    """
+    rate = getattr(WorkflowClass, "PROFILE_RATE", None)
+    return WFE_PROFILE_RATE if rate is None else rate
+
+
+def is_sampled(WorkflowClass: typing.Optional[type]) -> bool:
+    """
+    Function drawing, if a new Job of the Workflow should be profiled
+
+    :param WorkflowClass: class object inheriting from django_wfe.workflows.Workflow (None if it cannot be imported)
+    :return: True if the Job should be profiled
+    """
+    rate = get_rate(WorkflowClass)
+    return rate > 0 and random.random() < rate
+
+
+@contextlib.contextmanager
+def profile(path: str):
+    """
+    Context manager profiling the enclosed code, and merging its profile into the pstats file
+
+    :param path: path of the pstats file (created, if it does not exist)
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        save(profiler, path)
+
+
+def save(profiler: cProfile.Profile, path: str):
+    """
+    Function merging the profiler's statistics into the pstats file
+
+    :param profiler: disabled profiler
+    :param path: path of the pstats file (created, if it does not exist)
+    :return: None
+    """
+    stats = pstats.Stats(profiler)
+    if os.path.exists(path):
+        stats.add(path)
+
+    # the file is replaced atomically, not to be downloaded while it's being written
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    stats.dump_stats(tmp_path)
+    os.replace(tmp_path, path)
@@ -0,0 +1,172 @@
+"""
+The module implementing rate limits of the Steps calling rate-limited services.
+
+Steps declare their limit with RATE_LIMIT property, enforced by the engine with a token bucket shared by all the
+workers (kept in the database by default). A Step, which cannot be executed yet, reserves its token and is deferred
+(suspended until the reservation is due) instead of blocking the worker.
+"""
+
+import time
+import typing
+import datetime
+import threading
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .settings import WFE_RATE_LIMITER
+
+PERIODS = {"s": 1, "m": 60, "h": 3600}
+
+
+def parse_rate(rate: typing.Union[int, float, str]) -> typing.Tuple[float, float]:
+    """
+    Function parsing the Step's RATE_LIMIT
+
+    :param rate: number of calls per second, or a string "<number>/<s|m|h>" (e.g. "50/s" or "1000/h")
+    :return: tuple of the rate in tokens per second and the default capacity of the bucket (the number of calls)
+    :raises: ValueError in case the rate cannot be parsed
+    """
+    if isinstance(rate, str):
+        count, _, period = rate.partition("/")
+        try:
+            count, seconds = float(count), PERIODS[period.strip() or "s"]
+        except (ValueError, KeyError):
+            raise ValueError(f"Invalid rate limit: {rate}")
+    else:
+        count, seconds = float(rate), 1
+
+    if count <= 0:
+        raise ValueError(f"Invalid rate limit: {rate}")
+
+    return count / seconds, max(count, 1)
+
+
+def get_bucket(StepClass: type) -> typing.Optional[typing.Tuple[str, float, float]]:
+    """
+    Function returning the token bucket of the Step
+
+    :param StepClass: class object inheriting from django_wfe.steps.Step
+    :return: tuple of the bucket's key, rate (tokens per second) and capacity, or None if the Step is not limited
+    """
+    if StepClass.RATE_LIMIT is None:
+        return None
+
+    rate, capacity = parse_rate(StepClass.RATE_LIMIT)
+    key = StepClass.RATE_LIMIT_KEY or f"{StepClass.__module__}.{StepClass.__name__}"
+
+    return key, rate, StepClass.RATE_LIMIT_BURST or capacity
+
+
+class BaseRateLimiter:
+    """
+    Base class for the rate limiter backends, keeping the token buckets
+    """
+
+    def reserve(self, key: str, rate: float, capacity: float) -> float:
+        """
+        Method taking a token from the bucket. If the bucket is empty, the token is reserved (the bucket goes
+        below zero), so the deferred calls are spread over time instead of competing for the next tokens.
+
+        :param key: key of the bucket
+        :param rate: tokens added to the bucket per second
+        :param capacity: maximum number of the tokens in the bucket (the size of the allowed burst)
+        :return: number of seconds, after which the reserved token can be used (0 if it can be used right away)
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def take(
+        tokens: float, elapsed: float, rate: float, capacity: float
+    ) -> typing.Tuple[float, float]:
+        """
+        Method refilling the bucket and taking a token
+
+        :return: tuple of the remaining tokens and the number of seconds to wait for the token
+        """
+        tokens = min(capacity, tokens + max(elapsed, 0) * rate) - 1
+
+        return tokens, max(-tokens / rate, 0)
+
+
+class LocalRateLimiter(BaseRateLimiter):
+    """
+    Rate limiter keeping the token buckets in the memory (limiting only the Steps executed by the same process)
+    """
+
+    def __init__(self):
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def reserve(self, key: str, rate: float, capacity: float) -> float:
+        with self.lock:
+            now = time.monotonic()
+            tokens, updated_at = self.buckets.get(key, (capacity, now))
+
+            tokens, wait = self.take(tokens, now - updated_at, rate, capacity)
+            self.buckets[key] = (tokens, now)
+
+        return wait
+
+
+class DatabaseRateLimiter(BaseRateLimiter):
+    """
+    Rate limiter keeping the token buckets in the database (django_wfe.models.RateLimitBucket),
+    shared by all the workers. Buckets are updated in a transaction, holding the bucket's row lock.
+    """
+
+    def reserve(self, key: str, rate: float, capacity: float) -> float:
+        from .models import RateLimitBucket
+
+        with transaction.atomic():
+            now = timezone.now()
+            bucket, _ = RateLimitBucket.objects.select_for_update().get_or_create(
+                key=key, defaults={"tokens": capacity, "updated_at": now}
+            )
+
+            bucket.tokens, wait = self.take(
+                bucket.tokens,
+                (now - bucket.updated_at).total_seconds(),
+                rate,
+                capacity,
+            )
+            bucket.updated_at = now
+            bucket.save(update_fields=["tokens", "updated_at"])
+
+        return wait
+
+
+_limiter = None
+
+
+def get_limiter() -> BaseRateLimiter:
+    """
+    Function returning the rate limiter defined with WFE_RATE_LIMITER setting
+
+    :return: BaseRateLimiter subclass instance
+    """
+    global _limiter
+
+    if _limiter is None:
+        _limiter = import_string(WFE_RATE_LIMITER)()
+
+    return _limiter
+
+
+def reserve(StepClass: type) -> typing.Optional[datetime.datetime]:
+    """
+    Function reserving a call of the rate-limited Step
+
+    :param StepClass: class object inheriting from django_wfe.steps.Step
+    :return: time, when the Step can be executed, or None if it can be executed right away (or is not limited)
+    """
+    bucket = get_bucket(StepClass)
+    if bucket is None:
+        return None
+
+    wait = get_limiter().reserve(*bucket)
+    if wait <= 0:
+        return None
+
+    return timezone.now() + datetime.timedelta(seconds=wait)
@@ -0,0 +1,261 @@
+"""
+The module implementing admission control of the Jobs.
+
+Workflows may limit the number of their concurrently executed Jobs with MAX_CONCURRENT_JOBS property, and
+WFE_MAX_CONCURRENT_JOBS setting limits the number of all concurrently executed Jobs. A Job occupies a slot
+while it's executed (PENDING, ONGOING or INPUT_RECEIVED), or while it's WAITING for its sub-workflows or MapStep's
+chunks. Jobs waiting for an external input or for the time of their Wait Steps (or rate limits) release their slots,
+and are resumed without being queued again. Jobs submitted over the limits are kept in the JobState.QUEUED state
+(without any Dramatiq message), and are admitted once the slots are released, in the weighted fair-share order:
+the next Job is taken from the Workflow executing the fewest Jobs relative to its WEIGHT.
+
+Admission decisions are serialized with a PostgreSQL transaction-level advisory lock. Sub-workflows' Jobs
+are always admitted (they are executed on behalf of their parents, which already occupy the slots).
+Without any limits defined, Jobs are sent to the workers directly, without any additional queries.
+"""
+
+import math
+import typing
+import collections
+
+import dramatiq
+from django.db import connections, transaction
+from django.db.models import Count, Min, Q
+
+from . import notifications
+from .models import ChunkState, Job, JobState, MapChunk, Workflow
+from .settings import WFE_MAX_CONCURRENT_JOBS
+
+# key of the PostgreSQL advisory lock serializing the admission decisions
+ADMISSION_LOCK_KEY = 0x77666501
+
+# states of the Jobs occupying the slots (besides the Jobs WAITING for their sub-workflows or chunks)
+ACTIVE_STATES = (JobState.PENDING, JobState.ONGOING, JobState.INPUT_RECEIVED)
+
+
+def get_limits(
+    WorkflowClass: typing.Optional[type],
+) -> typing.Tuple[typing.Optional[int], float]:
+    """
+    Function returning the admission parameters of the Workflow
+
+    :param WorkflowClass: class object inheriting from django_wfe.workflows.Workflow (None if it cannot be imported)
+    :return: tuple of the maximum number of concurrently executed Jobs (None if not limited) and the Workflow's weight
+    """
+    return (
+        getattr(WorkflowClass, "MAX_CONCURRENT_JOBS", None),
+        getattr(WorkflowClass, "WEIGHT", None) or 1,
+    )
+
+
+def is_limited(WorkflowClass: typing.Optional[type]) -> bool:
+    """
+    Function checking if the Jobs of the Workflow are subject to the admission control
+
+    :param WorkflowClass: class object inheriting from django_wfe.workflows.Workflow
+    :return: True if any limit applies to the Workflow's Jobs
+    """
+    return (
+        WFE_MAX_CONCURRENT_JOBS is not None or get_limits(WorkflowClass)[0] is not None
+    )
+
+
+def submit(job: Job) -> bool:
+    """
+    Function ordering the execution of the Job, or queueing it if the concurrency limits are reached
+    (to be called right after the Job is created, as the created Jobs occupy the slots)
+
+    :param job: saved django_wfe.models.Job instance
+    :return: True if the Job was sent to the workers, False if it was queued
+    """
+    from .tasks import process_job
+
+    if job.parent_id is not None or not is_limited(_import_workflow(job.workflow.path)):
+        process_job.send(job_id=job.id)
+        return True
+
+    with transaction.atomic():
+        Job.objects.filter(id=job.id).update(state=JobState.QUEUED)
+        admitted = job.id in release()
+
+    job.state = JobState.PENDING if admitted else JobState.QUEUED
+    if not admitted:
+        notifications.publish(job.id, JobState.QUEUED)
+
+    return admitted
+
+
+def submit_many(jobs: typing.List[Job]) -> typing.List[int]:
+    """
+    Function ordering the execution of many Jobs at once: Jobs not subject to the admission control are sent
+    to the workers as a single group of messages, while the others are queued and admitted with a single release()
+
+    :param jobs: saved django_wfe.models.Job instances
+    :return: IDs of the Jobs sent to the workers (the other Jobs were queued)
+    """
+    from .tasks import process_job
+
+    direct, limited = [], []
+    for job in jobs:
+        if job.parent_id is not None or not is_limited(
+            _import_workflow(job.workflow.path)
+        ):
+            direct.append(job)
+        else:
+            limited.append(job)
+
+    if direct:
+        dramatiq.group(process_job.message(job_id=job.id) for job in direct).run()
+
+    admitted = set()
+    if limited:
+        with transaction.atomic():
+            Job.objects.filter(id__in=[job.id for job in limited]).update(
+                state=JobState.QUEUED
+            )
+            admitted = set(release())
+
+        for job in limited:
+            job.state = JobState.PENDING if job.id in admitted else JobState.QUEUED
+        notifications.publish_many(
+            [job.id for job in limited if job.id not in admitted], JobState.QUEUED
+        )
+
+    return [job.id for job in direct] + [
+        job.id for job in limited if job.id in admitted
+    ]
+
+
+def release() -> typing.List[int]:
+    """
+    Function admitting the queued Jobs, as long as there are free slots
+
+    :return: IDs of the admitted Jobs
+    """
+    from .tasks import process_job
+
+    queued = Job.objects.filter(state=JobState.QUEUED, parent=None)
+    if not queued.exists():
+        return []
+
+    with transaction.atomic():
+        _lock()
+
+        # workflow ID: (number of the queued Jobs, ID of the oldest queued Job)
+        waiting = {
+            workflow_id: (count, oldest)
+            for workflow_id, count, oldest in queued.order_by()
+            .values_list("workflow_id")
+            .annotate(Count("id"), Min("id"))
+        }
+        if not waiting:
+            return []
+
+        running = collections.Counter(
+            dict(
+                Job.objects.filter(_occupies_slot(), parent=None)
+                .order_by()
+                .values_list("workflow_id")
+                .annotate(Count("id"))
+            )
+        )
+
+        free = (
+            WFE_MAX_CONCURRENT_JOBS - sum(running.values())
+            if WFE_MAX_CONCURRENT_JOBS is not None
+            else math.inf
+        )
+
+        limits = {
+            workflow_id: get_limits(_import_workflow(path))
+            for workflow_id, path in Workflow.objects.filter(
+                id__in=waiting
+            ).values_list("id", "path")
+        }
+
+        # weighted fair-share: the next slot goes to the Workflow with the lowest share of its weight in use
+        admitted = collections.Counter()
+        while free > 0:
+            candidates = [
+                workflow_id
+                for workflow_id, (count, _) in waiting.items()
+                if admitted[workflow_id] < count
+                and (
+                    limits[workflow_id][0] is None
+                    or running[workflow_id] < limits[workflow_id][0]
+                )
+            ]
+            if not candidates:
+                break
+
+            workflow_id = min(
+                candidates,
+                key=lambda candidate: (
+                    running[candidate] / limits[candidate][1],
+                    waiting[candidate][1],
+                ),
+            )
+            admitted[workflow_id] += 1
+            running[workflow_id] += 1
+            free -= 1
+
+        job_ids = []
+        for workflow_id, count in admitted.items():
+            job_ids += (
+                queued.filter(workflow_id=workflow_id)
+                .order_by("id")
+                .values_list("id", flat=True)[:count]
+            )
+
+        Job.objects.filter(id__in=job_ids).update(state=JobState.PENDING)
+        notifications.publish_many(job_ids, JobState.PENDING)
+
+        for job_id in job_ids:
+            transaction.on_commit(lambda job_id=job_id: process_job.send(job_id=job_id))
+
+    return job_ids
+
+
+def release_slot(job: Job):
+    """
+    Function admitting the queued Jobs after the Job has ended or was suspended, if it occupied a slot
+
+    :param job: ended or suspended django_wfe.models.Job instance
+    :return: None
+    """
+    if job.parent_id is None and is_limited(_import_workflow(job.workflow.path)):
+        release()
+
+
+def _occupies_slot() -> Q:
+    """
+    Function returning the condition of the Jobs occupying the slots
+
+    :return: Q object filtering the Jobs
+    """
+    parents = (
+        Job.objects.filter(parent__isnull=False)
+        .exclude(state__in=JobState.TERMINAL)
+        .values("parent_id")
+    )
+    mapping = MapChunk.objects.filter(
+        state__in=(ChunkState.PENDING, ChunkState.QUEUED, ChunkState.ONGOING)
+    ).values("job_id")
+
+    return Q(state__in=ACTIVE_STATES) | Q(
+        Q(id__in=parents) | Q(id__in=mapping), state=JobState.WAITING
+    )
+
+
+def _import_workflow(path: str) -> typing.Optional[type]:
+    try:
+        return Job.import_class(path)
+    except (ImportError, AttributeError, ValueError):
+        return None
+
+
+def _lock():
+    connection = connections[Job.objects.db]
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [ADMISSION_LOCK_KEY])
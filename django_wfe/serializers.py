@@ -1,7 +1,7 @@
 from rest_framework import serializers
 from django.urls import reverse_lazy
 
-from .models import Job, Workflow
+from .models import Job, JobEvent, Workflow
 
 
 class WorkflowSerializer(serializers.ModelSerializer):
@@ -21,8 +21,15 @@ class JobSerializer(serializers.ModelSerializer):
     """
 
     workflow = WorkflowSerializer(read_only=True)
-    workflow_id = serializers.IntegerField(write_only=True)
+    # unknown and deleted Workflows are rejected on the validation, before the Job is created
+    workflow_id = serializers.PrimaryKeyRelatedField(
+        source="workflow",
+        queryset=Workflow.objects.filter(deleted=False),
+        write_only=True,
+    )
     log_file = serializers.SerializerMethodField()
+    profile_file = serializers.SerializerMethodField()
+    map_progress = serializers.ReadOnlyField()
 
     class Meta:
         model = Job
@@ -35,7 +42,36 @@ class JobSerializer(serializers.ModelSerializer):
             "uuid",
             "logfile",
             "logs",
+            "parent",
+            "created_at",
+            "progress",
+            # assigned from the Workflow's STORAGE_CODEC on the Job's creation
+            "storage_codec",
+            # set by the engine only (Wait Steps' wake up time)
+            "wake_at",
+            # lease of the worker executing the Job (see django_wfe.leases)
+            "claimed_at",
+            "profile",
         ]
+        extra_kwargs = {
+            # repeated keys return the existing Jobs, instead of failing the validation
+            "idempotency_key": {"validators": []},
+        }
 
     def get_log_file(self, obj):
         return reverse_lazy("django_wfe:job_logs", args=[obj.id])
+
+    def get_profile_file(self, obj):
+        if not obj.profile:
+            return None
+        return reverse_lazy("django_wfe:job_profile", args=[obj.id])
+
+
+class JobEventSerializer(serializers.ModelSerializer):
+    """
+    Structured event of the Job's execution serializer
+    """
+
+    class Meta:
+        model = JobEvent
+        fields = "__all__"
@@ -9,6 +9,16 @@ WFE_WORKFLOWS = getattr(settings, "WFE_WORKFLOWS", None)
 WFE_WATCHDOG_INTERVAL = getattr(settings, "WFE_WATCHDOG_INTERVAL", 5)
 
 
+# Time in seconds, after which the ONGOING Job is claimed again, if the worker executing it stopped renewing its lease
+# (e.g. crashed), see django_wfe.leases
+WFE_CLAIM_LEASE = getattr(settings, "WFE_CLAIM_LEASE", 60)
+
+
+# Time in seconds, after which the watchdog's leadership is taken over, if the leader stopped renewing it
+# (used only with databases other than PostgreSQL, see django_wfe.election)
+WFE_WATCHDOG_LEASE = getattr(settings, "WFE_WATCHDOG_LEASE", 3 * WFE_WATCHDOG_INTERVAL)
+
+
 # Path to the Job logs directory
 default_log_path = (
     os.path.join(settings.BASE_DIR, "logs_wfe")
@@ -16,3 +26,100 @@ default_log_path = (
     else None
 )
 WFE_LOG_DIR = getattr(settings, "WFE_LOG_DIR", default_log_path)
+
+
+# Save structured events of the Jobs' executions (django_wfe.models.JobEvent)
+WFE_JOB_EVENTS = getattr(settings, "WFE_JOB_EVENTS", True)
+
+
+# Compress Job logs with gzip, when the Job is finished or failed
+WFE_LOG_COMPRESSION = getattr(settings, "WFE_LOG_COMPRESSION", True)
+
+
+# Execute Jobs on the asyncio event loop in Dramatiq workers (async Steps of the Jobs are awaited concurrently,
+# while the worker threads wait for their Jobs)
+WFE_ASYNC_WORKER = getattr(settings, "WFE_ASYNC_WORKER", False)
+
+
+# Maximum number of Jobs executed concurrently on the event loop of a single worker process
+WFE_ASYNC_CONCURRENCY = getattr(settings, "WFE_ASYNC_CONCURRENCY", 100)
+
+
+# Number of processes in the pool executing Steps declared with executor = "process" (None: number of CPUs)
+WFE_PROCESS_POOL_SIZE = getattr(settings, "WFE_PROCESS_POOL_SIZE", None)
+
+
+# Size in bytes of the pickled Step's _input or result, above which it's passed to/from the process pool with a file
+WFE_PROCESS_INLINE_LIMIT = getattr(settings, "WFE_PROCESS_INLINE_LIMIT", 1024 * 1024)
+
+
+# Directory of the files passing large payloads to/from the process pool (shared memory by default, if available)
+WFE_PROCESS_TMP_DIR = getattr(
+    settings, "WFE_PROCESS_TMP_DIR", "/dev/shm" if os.path.isdir("/dev/shm") else None
+)
+
+
+# Python path of the artifact store class keeping large Steps' results
+WFE_ARTIFACT_STORE = getattr(
+    settings, "WFE_ARTIFACT_STORE", "django_wfe.artifacts.FileSystemArtifactStore"
+)
+
+
+# Path to the artifacts directory of the django_wfe.artifacts.FileSystemArtifactStore
+default_artifact_path = (
+    os.path.join(settings.BASE_DIR, "artifacts_wfe")
+    if getattr(settings, "BASE_DIR", None) is not None
+    else None
+)
+WFE_ARTIFACT_DIR = getattr(settings, "WFE_ARTIFACT_DIR", default_artifact_path)
+
+
+# Serialized size in bytes of the Step's result, above which it's moved to the artifact store (None: disabled)
+WFE_ARTIFACT_THRESHOLD = getattr(settings, "WFE_ARTIFACT_THRESHOLD", 1024 * 1024)
+
+
+# Default codec serializing the Job's storage: "json", "orjson", "msgpack", "msgpack+zstd" or a python path to the codec
+WFE_STORAGE_CODEC = getattr(settings, "WFE_STORAGE_CODEC", "json")
+
+
+# Custom codecs of the Job's storage, which can be selected by the Workflows: a dict of the codec's name and the python
+# path to its class inheriting from django_wfe.storage_codecs.BaseStorageCodec
+WFE_STORAGE_CODECS = getattr(settings, "WFE_STORAGE_CODECS", {})
+
+
+# Publish notifications of the Jobs' state changes (PostgreSQL NOTIFY), streamed by the notifications endpoint
+WFE_NOTIFICATIONS = getattr(settings, "WFE_NOTIFICATIONS", True)
+
+
+# PostgreSQL channel of the Jobs' state notifications
+WFE_NOTIFY_CHANNEL = getattr(settings, "WFE_NOTIFY_CHANNEL", "django_wfe_jobs")
+
+
+# Minimum interval in seconds between the database queries of the Steps polling their cancelled property
+WFE_CANCEL_CHECK_INTERVAL = getattr(settings, "WFE_CANCEL_CHECK_INTERVAL", 1.0)
+
+
+# Minimum interval in seconds between the database writes of the progress reported by the Job's Steps
+WFE_PROGRESS_INTERVAL = getattr(settings, "WFE_PROGRESS_INTERVAL", 1.0)
+
+
+# Maximum number of the concurrently executed Jobs of all Workflows (None: not limited), see django_wfe.scheduling
+WFE_MAX_CONCURRENT_JOBS = getattr(settings, "WFE_MAX_CONCURRENT_JOBS", None)
+
+
+# Python path of the rate limiter class keeping the token buckets of the Steps' RATE_LIMIT
+WFE_RATE_LIMITER = getattr(
+    settings, "WFE_RATE_LIMITER", "django_wfe.rate_limits.DatabaseRateLimiter"
+)
+
+
+# Timeout in seconds of connecting to the Dramatiq broker by the system check (run with "manage.py check --deploy")
+WFE_BROKER_CHECK_TIMEOUT = getattr(settings, "WFE_BROKER_CHECK_TIMEOUT", 2)
+
+
+# Number of the Jobs, up to which the Admin panel's pagination counts them exactly (PostgreSQL's estimate is used above)
+WFE_ADMIN_EXACT_COUNT_LIMIT = getattr(settings, "WFE_ADMIN_EXACT_COUNT_LIMIT", 10000)
+
+
+# Share of the new Jobs profiled (0: none, 1: all), unless defined with the Workflow's PROFILE_RATE, see django_wfe.profiling
+WFE_PROFILE_RATE = getattr(settings, "WFE_PROFILE_RATE", 0)
@@ -1,6 +1,11 @@
-from typing import Dict
+import asyncio
+import datetime
+from typing import Dict, List, Union
+from asgiref.sync import async_to_sync, sync_to_async
 from pydantic import BaseModel
 
+from .exceptions import RuntimeWFEError, Suspended
+
 
 class StepType(type):
     """
@@ -16,6 +21,17 @@ class BaseStep(metaclass=StepType):
     """
 
     user_input_schema = None
+    # "thread" (executed by the worker's thread) or "process" (executed in the process pool, for CPU-bound Steps)
+    executor = "thread"
+    # retention policy of the Step's result (django_wfe.storage.Retention, the Workflow's RETENTION if not defined)
+    RETENTION = None
+    RETENTION_LAST_N = None
+    # maximum rate of the Step's executions shared by all workers: calls per second or "<number>/<s|m|h>" (e.g. "50/s")
+    RATE_LIMIT = None
+    # size of the allowed burst of the executions (by default the number of calls of the RATE_LIMIT)
+    RATE_LIMIT_BURST = None
+    # name of the token bucket, which may be shared by the Steps calling the same service (by default the Step's path)
+    RATE_LIMIT_KEY = None
 
     class UserInputSchema(BaseModel):
         pass
@@ -29,28 +45,65 @@ class BaseStep(metaclass=StepType):
     def transition(self, *args, **kwargs):
         raise NotImplementedError
 
-    def _perform_execute(self, _input=None, *args, **kwargs):
-        # pass external_input to the user defined execute() method
+    def _get_external_input(self):
         try:
-            external_input = self.job.storage["data"][self.job.current_step_number][
+            return self.job.storage["data"][self.job.current_step_number][
                 "external_data"
             ]
         except (KeyError, IndexError):
-            external_input = None
+            return None
+
+    def _perform_execute(self, _input=None, *args, **kwargs):
+        # pass external_input to the user defined execute() method
+        external_input = self._get_external_input()
+
+        if self.is_async:
+            # execute the coroutine outside of the asyncio worker mode
+            return async_to_sync(self.execute)(
+                _input, external_input=external_input, *args, **kwargs
+            )
 
         return self.execute(_input, external_input=external_input, *args, **kwargs)
 
+    async def _aperform_execute(self, _input=None, *args, **kwargs):
+        # pass external_input to the user defined async execute() method
+        external_input = self._get_external_input()
+
+        return await self.execute(
+            _input, external_input=external_input, *args, **kwargs
+        )
+
     def _perform_transition(self, _input=None, *args, **kwargs):
         # pass external_input to the user defined transition() method
-        try:
-            external_input = self.job.storage["data"][self.job.current_step_number][
-                "external_data"
-            ]
-        except (KeyError, IndexError):
-            external_input = None
+        external_input = self._get_external_input()
 
         return self.transition(_input, external_input=external_input, *args, **kwargs)
 
+    @property
+    def context(self):
+        # data shared between the Job's Steps (django_wfe.storage.JobContext)
+        return self.job.context
+
+    def report_progress(self, fraction: float, message: str = None):
+        # progress of the Step's work, saved at most once per WFE_PROGRESS_INTERVAL (see Job.report_progress())
+        if self.job is not None:
+            self.job.report_progress(fraction, message)
+
+    async def areport_progress(self, fraction: float, message: str = None):
+        # report_progress() counterpart for the async Steps, executing the database write in a thread
+        if self.job is not None and self.job._progress_due(fraction, message):
+            await sync_to_async(self.job._save_progress, thread_sensitive=False)()
+
+    @property
+    def cancelled(self) -> bool:
+        # cancellation token polled by long-running Steps, which should stop by raising django_wfe.exceptions.Cancelled
+        return self.job is not None and self.job.is_cancelled()
+
+    @property
+    def is_async(self):
+        # check if execute() is defined with async def
+        return asyncio.iscoroutinefunction(self.execute)
+
     @property
     def requires_input(self):
         # check if UserInputSchema defines any structure
@@ -84,16 +137,224 @@ class Decision(BaseStep):
         raise NotImplementedError
 
 
+class SubWorkflow(Step):
+    """
+    Base class for user defined Steps executing another Workflow as a child Job.
+
+    The child Job is launched with the Step's _input and executed by any available worker,
+    while the parent Job is suspended without occupying one. The parent resumes once the child
+    ends, passing the child's final result to the next Step as its _input.
+
+    Usage:
+    class ProcessTile(steps.SubWorkflow):
+        WORKFLOW = TileWorkflow  # Workflow class or its python path
+    """
+
+    WORKFLOW = None
+
+    @property
+    def workflow_path(self) -> str:
+        if isinstance(self.WORKFLOW, str):
+            return self.WORKFLOW
+
+        return f"{self.WORKFLOW.__module__}.{self.WORKFLOW.__name__}"
+
+    def execute(self, _input=None, external_input=None, *args, **kwargs):
+        # executed by the engine in _perform_execute()
+        return
+
+    def _perform_execute(self, _input=None, *args, **kwargs):
+        from .models import Job, JobState
+        from .tasks import process_job
+
+        step_storage = self.job._get_step_storage()
+        child_id = step_storage.get("child_job")
+
+        if child_id is None:
+            child = self.job.spawn_child(self.workflow_path, _input=_input)
+            self.job.set_step_data("child_job", child.id)
+
+            raise Suspended(callback=lambda: process_job.send(job_id=child.id))
+
+        child = Job.objects.get(id=child_id)
+
+        if child.state == JobState.FINISHED:
+            return child.result
+        elif child.state == JobState.FAILED:
+            raise RuntimeWFEError(f"Sub-workflow Job {child} failed.")
+        elif child.state == JobState.CANCELLED:
+            raise RuntimeWFEError(f"Sub-workflow Job {child} was cancelled.")
+
+        # the child is still being executed, and resumes the parent once it ends
+        raise Suspended(callback=lambda: self._wake_if_ended(child.id))
+
+    def _wake_if_ended(self, child_id: int):
+        from .models import Job, JobState
+
+        # the child may have ended (failing to resume the parent, which was not waiting yet)
+        # between checking its state and marking the parent as waiting
+        if Job.objects.filter(id=child_id, state__in=JobState.TERMINAL).exists():
+            Job.wake(self.job.id)
+
+
+class MapStep(Step):
+    """
+    Base class for user defined Steps executing STEP on every item of the list _input.
+
+    The _input is split into chunks of CHUNK_SIZE items, which are executed by Dramatiq workers,
+    at most CONCURRENCY chunks at a time, while the Job is suspended without occupying a worker.
+    Once all the chunks are executed, their results are combined with reduce() into the Step's result.
+
+    Usage:
+    class ProcessTiles(steps.MapStep):
+        STEP = ProcessTile
+        CHUNK_SIZE = 50
+        CONCURRENCY = 8
+    """
+
+    STEP = None
+    CHUNK_SIZE = 100
+    CONCURRENCY = 4
+
+    def execute(self, _input=None, external_input=None, *args, **kwargs):
+        # executed by the engine in _perform_execute()
+        return
+
+    def reduce(self, results: List) -> List:
+        """
+        Method combining the chunks' results into the result of the Step
+
+        :param results: list of chunks' results (lists of items' results), ordered as the _input
+        :return: flat list of items' results
+        """
+        return [result for chunk in results for result in chunk]
+
+    def _perform_execute(self, _input=None, *args, **kwargs):
+        from .models import ChunkState, MapChunk
+
+        step_storage = self.job._get_step_storage()
+        step_number = self.job.current_step_number
+
+        if "map" not in step_storage:
+            items = list(_input or [])
+            chunks = [
+                items[i : i + self.CHUNK_SIZE]
+                for i in range(0, len(items), self.CHUNK_SIZE)
+            ]
+
+            if not chunks:
+                return self.reduce([])
+
+            MapChunk.objects.bulk_create(
+                MapChunk(
+                    job=self.job, step_number=step_number, index=index, items=chunk
+                )
+                for index, chunk in enumerate(chunks)
+            )
+            self.job.set_step_data("map", {"chunks": len(chunks)})
+
+            raise Suspended(
+                callback=lambda: MapChunk.dispatch(
+                    self.job.id, step_number, count=self.CONCURRENCY
+                )
+            )
+
+        chunks = list(
+            MapChunk.objects.filter(job=self.job, step_number=step_number).order_by(
+                "index"
+            )
+        )
+
+        if any(chunk.state == ChunkState.FAILED for chunk in chunks):
+            # the remaining chunks are not executed
+            MapChunk.objects.filter(
+                job=self.job,
+                step_number=step_number,
+                state__in=(ChunkState.PENDING, ChunkState.QUEUED),
+            ).update(state=ChunkState.CANCELLED)
+            raise RuntimeWFEError(f"Execution of {self.STEP.__name__} chunks failed.")
+
+        if any(chunk.state != ChunkState.FINISHED for chunk in chunks):
+            # some of the chunks are still being executed, the last one resumes the Job
+            raise Suspended(callback=lambda: self._wake_if_ended(step_number))
+
+        return self.reduce([chunk.result for chunk in chunks])
+
+    def _wake_if_ended(self, step_number: int):
+        from .models import Job, MapChunk
+
+        # the last chunk may have ended (failing to resume the Job, which was not waiting yet)
+        # between checking the chunks' states and marking the Job as waiting
+        progress = MapChunk.progress(self.job.id, step_number)
+        if progress["failed"] or progress["finished"] == progress["total"]:
+            Job.wake(self.job.id)
+
+
+class Wait(Step):
+    """
+    Base class for user defined Steps delaying the execution of the next Step.
+
+    The Job is suspended without occupying a worker until the delay passes, and is then resumed
+    with a delayed Dramatiq message (or by the wfe_watchdog, in case the message is lost).
+    Wait Step passes its _input to the next Step.
+
+    Usage:
+    class CoolDown(steps.Wait):
+        DELAY = datetime.timedelta(minutes=10)  # or the number of seconds
+    """
+
+    DELAY = 0
+
+    def delay(
+        self, _input=None, external_input=None, *args, **kwargs
+    ) -> Union[int, float, datetime.timedelta]:
+        """
+        Method calculating the delay, by default returning the DELAY
+
+        :return: delay as the number of seconds or datetime.timedelta
+        """
+        return self.DELAY
+
+    def execute(self, _input=None, external_input=None, *args, **kwargs):
+        return _input
+
+    def _perform_execute(self, _input=None, *args, **kwargs):
+        from django.utils import timezone
+        from django.utils.dateparse import parse_datetime
+
+        wait_until = self.job._get_step_storage().get("wait_until")
+
+        if wait_until is None:
+            delay = self.delay(_input, external_input=self._get_external_input())
+            if not isinstance(delay, datetime.timedelta):
+                delay = datetime.timedelta(seconds=delay)
+
+            # the wake up time is kept in the Step's data, as the Job's wake_at is reset once the Job is resumed
+            wake_at = timezone.now() + delay
+            self.job.set_step_data("wait_until", wake_at.isoformat())
+        else:
+            wake_at = parse_datetime(wait_until)
+
+        if wake_at > timezone.now():
+            # the Job is suspended (or was resumed too early)
+            self.job.wake_at = wake_at
+            raise Suspended(callback=self.job.schedule_wake)
+
+        return super()._perform_execute(_input, **kwargs)
+
+
 class __start__(Step):
     """
     The first step of the Workflow, to mark where Workflow execution should begin.
 
     __start__ step allows only one outgoing graph's edge (transition is always
-    performed to the 1st defined node).
+    performed to the 1st defined node). It passes the Job's initial input (if any) to the next Step.
     """
 
-    def execute(self, input: Dict = None, external_input: Dict = None, *args, **kwargs):
-        return
+    def execute(
+        self, _input: Dict = None, external_input: Dict = None, *args, **kwargs
+    ):
+        return _input
 
     def transition(self, _input=None, external_input: Dict = None, *args, **kwargs):
         return 0
@@ -0,0 +1,183 @@
+"""
+The module implementing partial updates of the Job's storage.
+
+Instead of rewriting the whole storage document on every Step, only the changed path of the jsonb column is updated
+in place with PostgreSQL jsonb_set() function. Jobs with binary storage codecs (or kept in a database other
+than PostgreSQL) fall back to saving the whole storage.
+
+The module also defines the retention policies of the Steps' results, limiting the size of the storage["data"].
+"""
+
+import typing
+
+from django.db import models
+from django.db.models.functions import Cast, Coalesce
+from django.contrib.postgres.fields import JSONField
+from django.contrib.postgres.fields.jsonb import KeyTransform
+
+CONTEXT_KEY = "context"
+
+_missing = object()
+
+
+class Retention:
+    """
+    Retention policies of the Steps' results, applied by the engine on the Workflow's transitions
+    """
+
+    # the result is kept for the life of the Job
+    KEEP = "keep"
+    # the result is dropped once it's consumed by the next Step (as its _input)
+    DROP_AFTER_CONSUMED = "drop_after_consumed"
+    # the result is dropped once it's not among the RETENTION_LAST_N most recent results
+    KEEP_LAST_N = "keep_last_n"
+
+    POLICIES = (KEEP, DROP_AFTER_CONSUMED, KEEP_LAST_N)
+
+
+def get_retention(StepClass: type, WorkflowClass: type) -> typing.Tuple[str, int]:
+    """
+    Function returning the retention policy of the Step's result, defined by the Step or (by default) by the Workflow
+
+    :param StepClass: class object inheriting from django_wfe.steps.Step
+    :param WorkflowClass: class object inheriting from django_wfe.workflows.Workflow
+    :return: tuple of the policy and the number of the most recent results kept by Retention.KEEP_LAST_N
+    :raises: ValueError in case the policy is not known
+    """
+    policy = (
+        getattr(StepClass, "RETENTION", None)
+        or getattr(WorkflowClass, "RETENTION", None)
+        or Retention.KEEP
+    )
+    if policy not in Retention.POLICIES:
+        raise ValueError(f"Unknown retention policy of {StepClass.__name__}: {policy}")
+
+    last_n = (
+        getattr(StepClass, "RETENTION_LAST_N", None)
+        or getattr(WorkflowClass, "RETENTION_LAST_N", None)
+        or 1
+    )
+
+    return policy, last_n
+
+
+def get_retention_window(WorkflowClass: type) -> int:
+    """
+    Function returning the number of the most recent results, among which the results of the Workflow's Steps expire
+    on the Workflow's transition (the older ones have been dropped on the previous transitions, or are kept)
+
+    :param WorkflowClass: class object inheriting from django_wfe.workflows.Workflow
+    :return: number of the results to be checked
+    :raises: ValueError in case the policy is not known
+    """
+    window = 1
+    for StepClass in WorkflowClass._get_steps_classes():
+        policy, last_n = get_retention(StepClass, WorkflowClass)
+        if policy == Retention.KEEP_LAST_N:
+            window = max(window, last_n)
+
+    return window
+
+
+class JSONBValue(Cast):
+    """
+    JSON document (serialized with the Job's storage codec) cast to the jsonb type
+    """
+
+    def __init__(self, data: str):
+        super().__init__(models.Value(data), output_field=JSONField())
+
+
+class JSONBSet(models.Func):
+    """
+    jsonb_set() function replacing the value under the path (creating the last key of the path if missing)
+    """
+
+    function = "jsonb_set"
+
+    def __init__(self, expression, path: typing.List, value, **extra):
+        super().__init__(
+            expression,
+            models.Value([str(key) for key in path]),
+            value,
+            models.Value(True),
+            output_field=JSONField(),
+            **extra,
+        )
+
+
+class JSONBDelete(models.Func):
+    """
+    #- operator removing the value under the path
+    """
+
+    arg_joiner = " #- "
+    template = "(%(expressions)s)"
+
+    def __init__(self, expression, path: typing.List, **extra):
+        super().__init__(
+            expression,
+            models.Value([str(key) for key in path]),
+            output_field=JSONField(),
+            **extra,
+        )
+
+
+def set_context_key(key: str, data: str):
+    """
+    Function returning the expression setting the key of storage["context"], creating the context if missing
+
+    :param key: context's key
+    :param data: value serialized to JSON
+    :return: expression to be used in QuerySet.update(storage=...)
+    """
+    context = JSONBSet(
+        "storage",
+        [CONTEXT_KEY],
+        Coalesce(KeyTransform(CONTEXT_KEY, "storage"), JSONBValue("{}")),
+    )
+
+    return JSONBSet(context, [CONTEXT_KEY, key], JSONBValue(data))
+
+
+def get_context_key(key: str):
+    """
+    Function returning the expression selecting the key of storage["context"]
+
+    :param key: context's key
+    :return: expression to be used in QuerySet.annotate()
+    """
+    return KeyTransform(key, KeyTransform(CONTEXT_KEY, "storage"))
+
+
+class JobContext:
+    """
+    Accessor of the data shared between the Job's Steps, reading and writing single keys of storage["context"]
+    without loading or rewriting the whole storage.
+
+    Usage (in the Step's execute()):
+    self.context["tile_count"] = 42
+    count = self.context.get("tile_count", 0)
+    """
+
+    def __init__(self, job):
+        self.job = job
+
+    def get(self, key: str, default=None):
+        return self.job.get_context_value(key, default)
+
+    def __getitem__(self, key: str):
+        value = self.job.get_context_value(key, _missing)
+        if value is _missing:
+            raise KeyError(key)
+
+        return value
+
+    def __setitem__(self, key: str, value):
+        self.job.set_context_value(key, value)
+
+    def __delitem__(self, key: str):
+        self.job.delete_context_value(key)
+
+    def __contains__(self, key: str) -> bool:
+        return self.job.get_context_value(key, _missing) is not _missing
@@ -0,0 +1,202 @@
+"""
+The module implementing codecs serializing the Job's storage.
+
+JSON codecs ("json", "orjson") keep the storage in the Job's jsonb column, whereas binary codecs ("msgpack",
+"msgpack+zstd") keep it in the binary storage_blob column. The codec is selected per Workflow with its STORAGE_CODEC
+property (WFE_STORAGE_CODEC setting by default), and can be a name of the built-in codec, a name of the custom codec
+registered with WFE_STORAGE_CODECS setting, or the python path to the class inheriting from
+django_wfe.storage_codecs.BaseStorageCodec defined with WFE_STORAGE_CODEC setting. Other names are rejected, so
+the stored name of the Job's codec never imports an arbitrary class.
+"""
+
+import json
+import uuid
+import decimal
+import datetime
+import functools
+import threading
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.duration import duration_iso_string
+from django.utils.module_loading import import_string
+
+from .settings import WFE_STORAGE_CODEC, WFE_STORAGE_CODECS
+
+
+def to_builtin(o):
+    """
+    Function converting objects, which are not natively serializable (e.g. returned by scientific libraries),
+    to the built-in python types.
+
+    :param o: object to be converted
+    :return: serializable representation of the object
+    :raises: TypeError in case the object's type is not supported
+    """
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    if isinstance(o, decimal.Decimal):
+        return str(o)
+    if isinstance(o, datetime.timedelta):
+        return duration_iso_string(o)
+    if isinstance(o, (datetime.date, datetime.time)):
+        return o.isoformat()
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    # numpy scalars and arrays (numpy is not required to be installed)
+    if type(o).__module__ == "numpy" and hasattr(o, "tolist"):
+        return o.tolist()
+
+    raise TypeError(f"Object of type {type(o).__name__} is not serializable")
+
+
+class WFEJSONEncoder(DjangoJSONEncoder):
+    """
+    JSON encoder of the Job's storage, supporting (among others) datetimes, Decimals, UUIDs, sets and numpy values
+    """
+
+    def default(self, o):
+        try:
+            return super().default(o)
+        except TypeError:
+            return to_builtin(o)
+
+
+class BaseStorageCodec:
+    """
+    Base class for the Job's storage codecs
+    """
+
+    # True, if the codec keeps the storage in the binary column
+    binary = False
+
+    def encode(self, obj) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, data: bytes):
+        """
+        Method deserializing the storage
+
+        :param data: bytes-like object (e.g. bytes, or a memory-mapped artifact's file)
+        """
+        raise NotImplementedError
+
+    def dumps(self, obj) -> str:
+        """
+        Method serializing the storage to the JSON string stored in the jsonb column (JSON codecs only)
+        """
+        return self.encode(obj).decode()
+
+
+class JSONCodec(BaseStorageCodec):
+    def encode(self, obj) -> bytes:
+        return self.dumps(obj).encode()
+
+    def decode(self, data: bytes):
+        if not isinstance(data, (str, bytes, bytearray)):
+            # decoded from the buffer, without copying it to bytes first
+            data = str(data, "utf-8")
+
+        return json.loads(data)
+
+    def dumps(self, obj) -> str:
+        return json.dumps(obj, cls=WFEJSONEncoder)
+
+
+class ORJSONCodec(BaseStorageCodec):
+    def __init__(self):
+        import orjson
+
+        self.orjson = orjson
+        self.options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def encode(self, obj) -> bytes:
+        return self.orjson.dumps(obj, default=to_builtin, option=self.options)
+
+    def decode(self, data: bytes):
+        if isinstance(data, (str, bytes, bytearray, memoryview)):
+            return self.orjson.loads(data)
+
+        with memoryview(data) as view:
+            return self.orjson.loads(view)
+
+
+class MsgpackCodec(BaseStorageCodec):
+    binary = True
+
+    def __init__(self):
+        import msgpack
+
+        self.msgpack = msgpack
+
+    def encode(self, obj) -> bytes:
+        return self.msgpack.packb(obj, default=to_builtin, use_bin_type=True)
+
+    def decode(self, data: bytes):
+        return self.msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+class MsgpackZstdCodec(MsgpackCodec):
+    def __init__(self):
+        super().__init__()
+        import zstandard
+
+        self.zstandard = zstandard
+        # zstandard's (de)compressors are not thread-safe, so every worker thread uses its own ones
+        self.local = threading.local()
+
+    @property
+    def compressor(self):
+        if not hasattr(self.local, "compressor"):
+            self.local.compressor = self.zstandard.ZstdCompressor()
+
+        return self.local.compressor
+
+    @property
+    def decompressor(self):
+        if not hasattr(self.local, "decompressor"):
+            self.local.decompressor = self.zstandard.ZstdDecompressor()
+
+        return self.local.decompressor
+
+    def encode(self, obj) -> bytes:
+        return self.compressor.compress(super().encode(obj))
+
+    def decode(self, data: bytes):
+        return super().decode(self.decompressor.decompress(data))
+
+
+CODECS = {
+    "json": JSONCodec,
+    "orjson": ORJSONCodec,
+    "msgpack": MsgpackCodec,
+    "msgpack+zstd": MsgpackZstdCodec,
+}
+
+
+@functools.lru_cache(maxsize=None)
+def get_codec(name: str = None) -> BaseStorageCodec:
+    """
+    Function returning the codec instance
+
+    :param name: name of the built-in or registered codec, or python path to the codec class defined with
+        WFE_STORAGE_CODEC setting (None: "json")
+    :return: BaseStorageCodec subclass instance
+    :raises: ImportError in case the codec's dependencies are not installed
+    :raises: ValueError in case the codec is not registered
+    """
+    if name is None:
+        name = "json"
+
+    if name in CODECS:
+        CodecClass = CODECS[name]
+    elif name in WFE_STORAGE_CODECS:
+        CodecClass = import_string(WFE_STORAGE_CODECS[name])
+    elif name == WFE_STORAGE_CODEC:
+        CodecClass = import_string(name)
+    else:
+        raise ValueError(
+            f"Storage codec {name} is not registered (built-in codecs: {', '.join(CODECS)}, "
+            f"custom codecs are registered with WFE_STORAGE_CODECS setting)."
+        )
+
+    return CodecClass()
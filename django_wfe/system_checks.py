@@ -1,12 +1,12 @@
 import os
+import copy
 import tempfile
+import functools
 
 from django.conf import settings
 from django.core import checks
 
-from .tasks import test_dramatiq
-from .settings import WFE_LOG_DIR
-
+from .settings import WFE_BROKER_CHECK_TIMEOUT, WFE_LOG_DIR
 
 REQUIRED_SETTINGS = [
     "WFE_WORKFLOWS",
@@ -17,6 +17,7 @@ IMPORTANT_OPTIONAL_SETTINGS = []
 
 # DJANGO-WFE CHECK MESSAGES:
 
+
 # django_wfe.config:
 class MissingSettingsError(checks.Error):
     def __init__(self, setting_name, *args, **kwargs):
@@ -45,7 +46,7 @@ class MissingSettingsInfo(checks.Info):
 class DramatiqProblemWarning(checks.Warning):
     def __init__(self, dramatiq_exception, *args, **kwargs):
         super().__init__(
-            f"Sending a task to dramatiq finished with {type(dramatiq_exception).__name__}: {dramatiq_exception}",
+            f"Connecting to the dramatiq broker finished with {type(dramatiq_exception).__name__}: {dramatiq_exception}",
             hint="Please check dramatiq and the broker are set up and are working correctly",
             obj=settings,
             id="django_wfe.dramatiq.W001",
@@ -137,14 +138,66 @@ def settings_check(app_configs, **kwargs):
     return errors
 
 
-@checks.register()
-def dramatiq_check(app_configs, **kwargs):
-    errors = []
+@functools.lru_cache(maxsize=None)
+def get_broker_error():
+    """
+    Function connecting to the Dramatiq broker (without publishing any message), once per process
+
+    :return: exception raised while connecting to the broker, or None if the connection succeeded
+    """
+    import dramatiq
+
+    broker = dramatiq.get_broker()
 
     try:
-        test_dramatiq.send()
+        # brokers are recognized by their names, as their modules import optional dependencies
+        if type(broker).__name__ == "RabbitmqBroker":
+            import pika
+
+            parameters = broker.parameters
+            if not isinstance(parameters, list):
+                parameters = [parameters]
+
+            # connect with the broker's parameters, but a single attempt and a short timeout
+            parameters = [copy.copy(params) for params in parameters]
+            for params in parameters:
+                params.connection_attempts = 1
+                params.socket_timeout = WFE_BROKER_CHECK_TIMEOUT
+                params.stack_timeout = WFE_BROKER_CHECK_TIMEOUT
+                params.blocked_connection_timeout = WFE_BROKER_CHECK_TIMEOUT
+
+            pika.BlockingConnection(parameters).close()
+
+        elif type(broker).__name__ == "RedisBroker":
+            import redis
+
+            pool = broker.client.connection_pool
+            client = redis.Redis(
+                connection_pool=redis.ConnectionPool(
+                    connection_class=pool.connection_class,
+                    **{
+                        **pool.connection_kwargs,
+                        "socket_connect_timeout": WFE_BROKER_CHECK_TIMEOUT,
+                        "socket_timeout": WFE_BROKER_CHECK_TIMEOUT,
+                    },
+                )
+            )
+            client.ping()
+            client.connection_pool.disconnect()
+
     except Exception as e:
-        errors.append(DramatiqProblemWarning(e))
+        return e
+
+    return None
+
+
+@checks.register("django_wfe", deploy=True)
+def dramatiq_check(app_configs, **kwargs):
+    errors = []
+
+    error = get_broker_error()
+    if error is not None:
+        errors.append(DramatiqProblemWarning(error))
 
     return errors
 
@@ -3,7 +3,9 @@ import dramatiq
 from typing import Union
 
 from django.db.models import ObjectDoesNotExist
-from .models import Job
+from . import aio
+from .models import Job, MapChunk
+from .settings import WFE_ASYNC_WORKER
 
 logger = logging.getLogger(__name__)
 
@@ -17,16 +19,59 @@ def process_job(job_id: Union[str, int]):
     """
 
     try:
-        job = Job.objects.get(id=int(job_id))
+        job = Job.objects.select_related("workflow").get(id=int(job_id))
     except ObjectDoesNotExist:
         logger.error(
             f"A job with provided ID ({job_id}) does not exist in the database."
         )
         raise Exception("Job with provided ID does not exist in the database.")
 
+    if not job.claim():
+        # duplicated messages, and messages of the cancelled (or already ended) Jobs are dropped,
+        # queued Jobs are sent again on their admission
+        logger.info(f"Skipping the Job {job_id} in the {job.state} state.")
+        return
+
+    if WFE_ASYNC_WORKER:
+        # execute the Job on the worker's event loop, without occupying the worker thread (the thread waits only
+        # while the loop executes WFE_ASYNC_CONCURRENCY Jobs). The message is acknowledged right away, the Jobs
+        # of a stopped worker are claimed again once their leases have expired (see django_wfe.leases)
+        aio.submit(job.aexecute())
+        return
+
     job.execute()
 
 
+@dramatiq.actor(max_retries=1)
+def wake_job(job_id: Union[str, int]):
+    """
+    Delayed resumption of the Job suspended by django_wfe.steps.Wait Step.
+
+    :param job_id: django_wfe.models.Job ID
+    """
+
+    Job.wake(job_id)
+
+
+@dramatiq.actor(max_retries=1)
+def process_map_chunk(chunk_id: Union[str, int]):
+    """
+    Executor of the django_wfe.steps.MapStep's chunks.
+
+    :param chunk_id: django_wfe.models.MapChunk ID
+    """
+
+    try:
+        chunk = MapChunk.objects.select_related("job").get(id=int(chunk_id))
+    except ObjectDoesNotExist:
+        logger.error(
+            f"A map chunk with provided ID ({chunk_id}) does not exist in the database."
+        )
+        raise Exception("Map chunk with provided ID does not exist in the database.")
+
+    chunk.execute()
+
+
 @dramatiq.actor(max_retries=1)
 def test_dramatiq():
     pass
@@ -0,0 +1,168 @@
+import os
+import tempfile
+from unittest import mock
+from django.test import TestCase, override_settings
+
+from django_wfe import artifacts
+from django_wfe.models import Workflow, Job, JobState
+from django_wfe.tasks import process_job
+
+
+@override_settings(WFE_WORKFLOWS="django_wfe.tests.wdf_models")
+class ArtifactsTest(TestCase):
+
+    fixtures = [
+        "django_wfe/tests/wdk_fixtures.json",
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        # create the temporary log and artifacts directories
+        cls.tmp_log_dir = tempfile.TemporaryDirectory()
+        cls.tmp_artifact_dir = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+
+        # remove temporary directories
+        cls.tmp_log_dir.cleanup()
+        cls.tmp_artifact_dir.cleanup()
+
+    def setUp(self):
+        store = artifacts.FileSystemArtifactStore(self.tmp_artifact_dir.name)
+
+        patchers = [
+            mock.patch.object(artifacts, "_store", store),
+            mock.patch.object(artifacts, "WFE_ARTIFACT_THRESHOLD", 1024),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_file_system_store(self):
+        """
+        Test content addressing of the FileSystemArtifactStore
+        """
+        store = artifacts.get_store()
+
+        key = store.put(b"some data")
+
+        self.assertEqual(key, store.put(b"some data"))
+        self.assertNotEqual(key, store.put(b"other data"))
+        self.assertTrue(store.exists(key))
+        self.assertEqual(store.get(key)[:], b"some data")
+
+        store.delete(key)
+        self.assertFalse(store.exists(key))
+
+    def test_offload_and_resolve(self):
+        """
+        Test replacing large results with artifact references
+        """
+        small, large = list(range(10)), list(range(1000))
+
+        self.assertEqual(artifacts.offload(small), small)
+
+        reference = artifacts.offload(large)
+        self.assertTrue(artifacts.is_reference(reference))
+
+        lazy = artifacts.resolve(reference, lazy=True)
+        self.assertIsInstance(lazy, artifacts.LazyArtifact)
+        self.assertEqual(
+            artifacts.offload(lazy),
+            reference,
+            "Passing a not loaded artifact through shouldn't store it again",
+        )
+        self.assertEqual(list(lazy), large)
+        self.assertEqual(artifacts.resolve(reference), large)
+
+    def test_execute_large_result_workflow(self):
+        """
+        Test Job.execute() method on TestWorkflowLargeResult workflow
+        """
+        workflow = Workflow.objects.get(name="TestWorkflowLargeResult")
+
+        job = Job(
+            workflow_id=workflow.id,
+            logfile=os.path.join(self.tmp_log_dir.name, "django_wfe_tmp.log"),
+        )
+        job.save()
+
+        job.execute()
+        job.refresh_from_db()
+
+        self.assertEqual(job.state, JobState.FINISHED)
+        self.assertTrue(
+            artifacts.is_reference(job.storage["data"][1]["result"]),
+            "Large result wasn't moved to the artifact store",
+        )
+        self.assertEqual(
+            job.storage["data"][1]["result"], job.storage["data"][2]["result"]
+        )
+        self.assertEqual(job.result, 1000)
+
+    def _execute_job(self, name, **kwargs):
+        job = Job(
+            workflow=Workflow.objects.get(name=name),
+            logfile=os.path.join(self.tmp_log_dir.name, "django_wfe_tmp.log"),
+            **kwargs,
+        )
+        job.save()
+
+        job.execute()
+        job.refresh_from_db()
+
+        return job
+
+    def test_execute_typed_result_workflow(self):
+        """
+        Test results with datetimes, Decimals and sets are stored below and above the threshold
+        """
+        expected = {"at": "2020-05-21T08:54:00", "amount": "0.25", "tags": ["tile"]}
+
+        for items, offloaded in ((1, False), (100, True)):
+            with self.subTest(items=items):
+                job = self._execute_job(
+                    "TestWorkflowTypedResult", storage={"data": [], "input": items}
+                )
+
+                self.assertEqual(job.state, JobState.FINISHED)
+                self.assertEqual(
+                    artifacts.is_reference(job.storage["data"][1]["result"]),
+                    offloaded,
+                )
+                self.assertEqual(job.result, [expected] * items)
+
+    def test_pass_through_not_loaded(self):
+        """
+        Test the artifact passed through by a Step is not loaded (e.g. to be logged)
+        """
+        with mock.patch.object(artifacts, "load", wraps=artifacts.load) as load:
+            job = self._execute_job("TestWorkflowLargeResult")
+
+        self.assertEqual(job.state, JobState.FINISHED)
+        # loaded only by the CountStep
+        self.assertEqual(load.call_count, 1)
+
+    def test_sub_workflow_artifact_input(self):
+        """
+        Test the artifact passed to a sub-workflow is kept as a reference in the child Job's input
+        """
+        with mock.patch.object(process_job, "send"):
+            job = self._execute_job("TestWorkflowLargeResultSubWorkflow")
+            self.assertEqual(job.state, JobState.WAITING)
+
+            child = job.children.get()
+            self.assertEqual(child.storage["input"], job.storage["data"][1]["result"])
+
+            child.logfile = job.logfile
+            child.execute()
+            job.refresh_from_db()
+            job.execute()
+            job.refresh_from_db()
+
+        self.assertEqual(job.state, JobState.FINISHED)
+        self.assertEqual(job.result, 1000)
@@ -0,0 +1,243 @@
+import os
+import gzip
+import json
+import datetime
+import tempfile
+from io import StringIO
+from unittest import mock, skipUnless
+from django.core import checks
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from dramatiq.brokers.rabbitmq import RabbitmqBroker
+from dramatiq.brokers.stub import StubBroker
+
+from django_wfe import artifacts, system_checks, utils
+from django_wfe.election import LeaderElection
+from django_wfe.models import Workflow, Job, JobState, Watchdog
+from django_wfe.settings import WFE_BROKER_CHECK_TIMEOUT, WFE_WATCHDOG_LEASE
+
+
+@override_settings(WFE_WORKFLOWS="django_wfe.tests.wdf_models")
+class PurgeJobsCommandTest(TestCase):
+
+    fixtures = [
+        "django_wfe/tests/wdk_fixtures.json",
+    ]
+
+    def setUp(self):
+        # create the temporary log directory
+        self.tmp_log_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        # remove temporary log dir
+        self.tmp_log_dir.cleanup()
+
+    def _create_job(self, state, age, parent=None):
+        job = Job(
+            workflow=Workflow.objects.get(name="TestWorkflowSuccess"),
+            state=state,
+            parent=parent,
+            created_at=timezone.now() - datetime.timedelta(days=age),
+        )
+        job.logfile = os.path.join(self.tmp_log_dir.name, f"{job.uuid}.log")
+        job.save()
+
+        with open(job.logfile, "w") as log:
+            log.write("log")
+
+        return job
+
+    def test_purge_jobs(self):
+        """
+        Test wfe_purge_jobs command deleting old, ended Jobs with their children and log files
+        """
+        old_parent = self._create_job(JobState.FINISHED, age=40)
+        new_child = self._create_job(JobState.FINISHED, age=10, parent=old_parent)
+        old_failed = self._create_job(JobState.FAILED, age=40)
+        old_waiting = self._create_job(JobState.WAITING, age=40)
+        new_finished = self._create_job(JobState.FINISHED, age=10)
+
+        archive = os.path.join(self.tmp_log_dir.name, "archive.jsonl.gz")
+        out = StringIO()
+        call_command(
+            "wfe_purge_jobs", older_than=30, batch_size=1, archive=archive, stdout=out
+        )
+
+        self.assertIn("Deleted 3 Jobs", out.getvalue())
+        self.assertEqual(
+            set(Job.objects.values_list("id", flat=True)),
+            {old_waiting.id, new_finished.id},
+        )
+
+        for job in (old_parent, new_child, old_failed):
+            self.assertFalse(os.path.exists(job.logfile))
+        for job in (old_waiting, new_finished):
+            self.assertTrue(os.path.exists(job.logfile))
+
+        with gzip.open(archive, "rt") as file:
+            records = [json.loads(line) for line in file]
+
+        self.assertEqual(
+            sorted(record["id"] for record in records),
+            sorted([old_parent.id, new_child.id, old_failed.id]),
+        )
+
+    def test_purge_jobs_artifacts(self):
+        """
+        Test wfe_purge_jobs command removes the artifacts referenced only by the deleted Jobs
+        """
+        store = artifacts.FileSystemArtifactStore(self.tmp_log_dir.name)
+        old = timezone.now().timestamp() - 2 * 3600
+        references = {}
+        for name in ("purged", "shared", "recent"):
+            references[name] = {
+                artifacts.REFERENCE_KEY: store.put(name.encode()),
+                "size": len(name),
+            }
+            if name != "recent":
+                os.utime(
+                    store.path(references[name][artifacts.REFERENCE_KEY]), (old, old)
+                )
+
+        purged = self._create_job(JobState.FINISHED, age=40)
+        purged.storage["data"] = [
+            {"result": references[name]} for name in ("purged", "shared", "recent")
+        ]
+        purged.save()
+        kept = self._create_job(JobState.FINISHED, age=10)
+        kept.storage["data"] = [{"input": [references["shared"]]}]
+        kept.save()
+
+        out = StringIO()
+        with mock.patch.object(artifacts, "_store", store):
+            call_command("wfe_purge_jobs", older_than=30, stdout=out)
+
+        self.assertIn("Removed 1 artifacts", out.getvalue())
+        self.assertFalse(store.exists(references["purged"][artifacts.REFERENCE_KEY]))
+        self.assertTrue(store.exists(references["shared"][artifacts.REFERENCE_KEY]))
+        self.assertTrue(
+            store.exists(references["recent"][artifacts.REFERENCE_KEY]),
+            "Artifacts put in the store recently should be kept",
+        )
+
+    def test_purge_jobs_dry_run(self):
+        """
+        Test wfe_purge_jobs command doesn't delete Jobs with --dry-run option
+        """
+        job = self._create_job(JobState.FINISHED, age=40)
+
+        out = StringIO()
+        call_command("wfe_purge_jobs", dry_run=True, stdout=out)
+
+        self.assertIn("1 Jobs would be deleted", out.getvalue())
+        self.assertTrue(Job.objects.filter(id=job.id).exists())
+
+
+class SystemChecksTest(SimpleTestCase):
+    def setUp(self):
+        system_checks.get_broker_error.cache_clear()
+
+    def tearDown(self):
+        system_checks.get_broker_error.cache_clear()
+
+    def test_broker_check_deploy(self):
+        """
+        Test the broker is checked only with the deployment checks, without sending any message
+        """
+        error = ConnectionRefusedError("Connection refused")
+
+        with mock.patch.object(
+            system_checks, "get_broker_error", return_value=error
+        ), mock.patch.object(StubBroker, "enqueue") as enqueue:
+            messages = checks.run_checks(tags=["django_wfe"])
+            deploy_messages = checks.run_checks(
+                tags=["django_wfe"], include_deployment_checks=True
+            )
+
+        self.assertEqual(messages, [])
+        self.assertEqual(
+            [message.id for message in deploy_messages], ["django_wfe.dramatiq.W001"]
+        )
+        enqueue.assert_not_called()
+
+    def test_broker_error_cached(self):
+        """
+        Test the broker is connected with a short timeout, once per process
+        """
+        broker = RabbitmqBroker(url="amqp://localhost:5672")
+
+        with mock.patch("dramatiq.get_broker", return_value=broker), mock.patch(
+            "pika.BlockingConnection", side_effect=ConnectionRefusedError
+        ) as connection:
+            for _ in range(2):
+                self.assertIsInstance(
+                    system_checks.get_broker_error(), ConnectionRefusedError
+                )
+
+        connection.assert_called_once()
+        params = connection.call_args.args[0][0]
+        self.assertEqual(params.connection_attempts, 1)
+        self.assertEqual(params.socket_timeout, WFE_BROKER_CHECK_TIMEOUT)
+        # the broker's own parameters are not changed
+        self.assertNotEqual(broker.parameters.socket_timeout, WFE_BROKER_CHECK_TIMEOUT)
+
+
+class WatchdogElectionTest(TestCase):
+    def test_lease(self):
+        """
+        Test a single watchdog is elected, and the leadership is taken over once released or expired
+        """
+        first = LeaderElection(node="first")
+        second = LeaderElection(node="second")
+
+        self.assertTrue(first.elect())
+        self.assertFalse(second.elect())
+        self.assertTrue(first.elect())
+        self.assertEqual(Watchdog.load().leader, "first")
+
+        first.resign()
+        self.assertTrue(second.elect())
+        self.assertFalse(first.elect())
+
+        # the leader stopped renewing the lease (e.g. it was killed)
+        Watchdog.objects.filter(pk=1).update(
+            heartbeat_at=timezone.now()
+            - datetime.timedelta(seconds=WFE_WATCHDOG_LEASE + 1)
+        )
+        self.assertTrue(first.elect())
+        self.assertFalse(second.elect())
+
+    @skipUnless(connection.vendor == "postgresql", "advisory locks require PostgreSQL")
+    def test_advisory_lock(self):
+        """
+        Test the leadership is held with the advisory lock of the leader's session
+        """
+        first = LeaderElection(node="first")
+        second = LeaderElection(node="second")
+
+        try:
+            self.assertTrue(first.elect())
+            self.assertFalse(second.elect())
+
+            # the leader's session ended (e.g. its process was killed)
+            first.connection.close()
+            self.assertFalse(first.elect())
+            self.assertTrue(second.elect())
+        finally:
+            first.resign()
+            second.resign()
+
+    def test_run_watchdog(self):
+        """
+        Test the watchdog's work is performed only by the leader
+        """
+        LeaderElection(node="leader").elect()
+
+        with mock.patch.object(utils, "admit_queued_jobs") as admit_queued_jobs:
+            utils.run_watchdog(LeaderElection(node="follower"))
+            admit_queued_jobs.assert_not_called()
+
+            utils.run_watchdog(LeaderElection(node="leader"))
+            admit_queued_jobs.assert_called_once_with()
@@ -0,0 +1,88 @@
+import pydantic
+from unittest import mock
+from django.test import SimpleTestCase
+
+from django_wfe import ephemeral, exceptions, execute_workflow_ephemeral
+from django_wfe.tests import wdk_models
+
+
+class EphemeralTest(SimpleTestCase):
+    def test_execute(self):
+        """
+        Test the in-memory execution returns the history in the Job's storage format
+        """
+        history = ephemeral.execute(wdk_models.TestWorkflowSuccess)
+
+        self.assertEqual(
+            [data["step"] for data in history],
+            [
+                "django_wfe.steps.__start__",
+                "django_wfe.tests.wdk_models.EmptyStepA",
+                "django_wfe.tests.wdk_models.EmptyStepB",
+                "django_wfe.tests.wdk_models.EmptyStepC",
+            ],
+        )
+        self.assertEqual(history[-1]["result"], None)
+
+    def test_execute_decision(self):
+        """
+        Test transition() of a Decision selects the next Step
+        """
+        for value, step in ((0, "EmptyStepA"), (1, "EmptyStepB")):
+            with self.subTest(value=value):
+                with mock.patch.object(
+                    wdk_models.RandomIntStep, "execute", return_value=value
+                ):
+                    history = ephemeral.execute(wdk_models.TestWorkflowDecision)
+
+                self.assertEqual(
+                    history[3]["step"], f"django_wfe.tests.wdk_models.{step}"
+                )
+
+    def test_execute_external_input(self):
+        """
+        Test external inputs are validated and passed to the Steps as external_input
+        """
+        with self.assertRaises(exceptions.InputRequired):
+            ephemeral.execute(wdk_models.TestWorkflowExternalInput)
+
+        with self.assertRaises(pydantic.ValidationError):
+            ephemeral.execute(
+                wdk_models.TestWorkflowExternalInput,
+                external_inputs={wdk_models.ExternalInputStep: {"external_int": {}}},
+            )
+
+        history = execute_workflow_ephemeral(
+            "django_wfe.tests.wdk_models.TestWorkflowExternalInput",
+            external_inputs={
+                "django_wfe.tests.wdk_models.ExternalInputStep": {"external_int": "7"}
+            },
+        )
+        self.assertEqual(history[2]["external_data"], {"external_int": 7})
+        self.assertEqual(history[2]["result"], 7)
+
+    def test_execute_inline(self):
+        """
+        Test sub-workflows, MapSteps, async Steps and the context are executed in memory
+        """
+        self.assertEqual(
+            ephemeral.execute(wdk_models.TestWorkflowSubWorkflow)[-1]["result"], 2
+        )
+        self.assertEqual(
+            ephemeral.execute(wdk_models.TestWorkflowMap)[-1]["result"],
+            [1, 2, 3, 4, 5],
+        )
+        self.assertEqual(
+            ephemeral.execute(wdk_models.TestWorkflowAsync, _input=1)[-1]["result"],
+            3,
+        )
+        self.assertEqual(
+            ephemeral.execute(wdk_models.TestWorkflowContext)[-1]["result"], 6
+        )
+
+    def test_execute_suspended(self):
+        """
+        Test Steps suspending the execution are not supported
+        """
+        with self.assertRaises(exceptions.RuntimeWFEError):
+            ephemeral.execute(wdk_models.TestWorkflowWait)
@@ -1,12 +1,34 @@
 import os
+import sys
+import gzip
+import pstats
 import pydantic
+import datetime
 import tempfile
-from django.test import TestCase, override_settings
+import threading
+from io import StringIO
+from urllib.parse import unquote
+from unittest import mock, skipUnless
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
 
-from django_wfe.models import Workflow, Job, JobState
+from django_wfe.models import Workflow, Job, JobEvent, JobEventType, JobState
+from django_wfe import leases, models
+from django_wfe.logging import Tee
+from django_wfe.storage import Retention, get_retention_window
+from django_wfe.utils import cancel_overdue_jobs, requeue_expired_jobs
+from django_wfe.admin import JobAdmin
+from django_wfe.views import JobEventViewSet, JobLogsView, JobProfileView, JobViewSet
 from django_wfe import steps
 from django_wfe import workflows
 from django_wfe import exceptions
+from django_wfe import execute_workflow, provide_inputs
+from django_wfe.tasks import process_job
 
 
 @override_settings(WFE_WORKFLOWS="django_wfe.tests.wdf_models")
@@ -351,3 +373,1101 @@ class JobTest(TestCase):
             external_int,
             "ExternalInputStep didn't return expected value",
         )
+
+
+@override_settings(WFE_WORKFLOWS="django_wfe.tests.wdf_models")
+class JobStorageTest(TestCase):
+
+    fixtures = [
+        "django_wfe/tests/wdk_fixtures.json",
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        # create the temporary log directory
+        cls.tmp_log_dir = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+
+        # remove temporary log dir
+        cls.tmp_log_dir.cleanup()
+
+    def _create_job(self, name="TestWorkflowContext"):
+        job = Job(
+            workflow_id=Workflow.objects.get(name=name).id,
+            logfile=os.path.join(self.tmp_log_dir.name, "django_wfe_tmp.log"),
+        )
+        job.save()
+
+        return job
+
+    def test_context_shared_between_steps(self):
+        """
+        Test Steps' shared context on TestWorkflowContext workflow
+        """
+        job = self._create_job()
+
+        job.execute()
+        job.refresh_from_db()
+
+        self.assertEqual(job.state, JobState.FINISHED)
+        self.assertEqual(job.result, 6)
+        self.assertEqual(job.storage["context"], {"multiplier": 3})
+
+    def test_context_accessor(self):
+        """
+        Test reading, writing and removing single keys of the Job's context
+        """
+        job = self._create_job()
+
+        self.assertNotIn("key", job.context)
+        self.assertIsNone(job.context.get("key"))
+        with self.assertRaises(KeyError):
+            job.context["key"]
+
+        job.context["key"] = {"nested": [1, 2]}
+        job.context["other"] = None
+
+        # read the keys with a fresh instance
+        job = Job.objects.get(id=job.id)
+        self.assertEqual(job.context["key"], {"nested": [1, 2]})
+        self.assertIn("other", job.context)
+        self.assertIsNone(job.context["other"])
+
+        del job.context["key"]
+        job.refresh_from_db()
+
+        self.assertEqual(job.storage["context"], {"other": None})
+
+    def test_set_step_data(self):
+        """
+        Test Job.set_step_data() appending and updating the current Step's data
+        """
+        job = self._create_job()
+        job.state = JobState.ONGOING
+
+        job.set_step_data("result", 1, update_fields=["state"])
+        job.set_step_data("external_data", {"value": 2})
+        job.refresh_from_db()
+
+        self.assertEqual(job.state, JobState.ONGOING)
+        self.assertEqual(
+            job.storage["data"],
+            [
+                {
+                    "step": "django_wfe.steps.__start__",
+                    "result": 1,
+                    "external_data": {"value": 2},
+                }
+            ],
+        )
+
+    def test_retention_drop_after_consumed(self):
+        """
+        Test dropping consumed results on TestWorkflowRetention workflow
+        """
+        job = self._create_job("TestWorkflowRetention")
+
+        job.execute()
+        job.refresh_from_db()
+
+        self.assertEqual(job.state, JobState.FINISHED)
+        self.assertEqual(job.result, 3)
+        self.assertEqual(
+            ["result" in step_data for step_data in job.storage["data"]],
+            [False, False, True, True],
+            "Only the results of KeptIncrementStep and of the last Step should be kept",
+        )
+
+    def test_retention_window(self):
+        """
+        Test only the most recent results are checked on the Workflow's transitions
+        """
+        job = self._create_job("TestWorkflowRetention")
+        WorkflowClass = job.import_class(job.workflow.path)
+        self.assertEqual(get_retention_window(WorkflowClass), 1)
+
+        job.storage["data"] = [
+            {"step": "django_wfe.tests.wdk_models.IncrementStep", "result": number}
+            for number in range(5)
+        ]
+        job.current_step_number = 4
+
+        self.assertEqual(
+            job.get_expired_results(WorkflowClass, window=1), [["data", 3, "result"]]
+        )
+        self.assertEqual(
+            job.get_expired_results(WorkflowClass),
+            [["data", number, "result"] for number in range(4)],
+        )
+
+        with mock.patch.object(WorkflowClass, "RETENTION", Retention.KEEP_LAST_N):
+            with mock.patch.object(WorkflowClass, "RETENTION_LAST_N", 3):
+                self.assertEqual(get_retention_window(WorkflowClass), 3)
+
+    def test_compact_storage_command(self):
+        """
+        Test wfe_compact_storage command on the finished Jobs
+        """
+        workflow = Workflow.objects.get(name="TestWorkflowSuccess")
+        data = [
+            {"step": "django_wfe.steps.__start__", "result": None},
+            {"step": "django_wfe.tests.wdk_models.EmptyStepA", "result": 1},
+            {"step": "django_wfe.tests.wdk_models.EmptyStepB", "result": 2},
+            {"step": "django_wfe.tests.wdk_models.EmptyStepC", "result": 3},
+        ]
+
+        finished, ongoing = [
+            Job(
+                workflow=workflow,
+                current_step="django_wfe.tests.wdk_models.EmptyStepC",
+                current_step_number=3,
+                storage={"data": [dict(step_data) for step_data in data]},
+                state=state,
+                logfile=os.path.join(self.tmp_log_dir.name, "django_wfe_tmp.log"),
+            )
+            for state in (JobState.FINISHED, JobState.ONGOING)
+        ]
+        finished.save()
+        ongoing.save()
+
+        out = StringIO()
+        call_command(
+            "wfe_compact_storage",
+            retention=Retention.KEEP_LAST_N,
+            last_n=2,
+            stdout=out,
+        )
+        finished.refresh_from_db()
+        ongoing.refresh_from_db()
+
+        self.assertIn("Dropped 2 results of 1 Jobs", out.getvalue())
+        self.assertEqual(
+            [step_data.get("result") for step_data in finished.storage["data"]],
+            [None, None, 2, 3],
+        )
+        self.assertNotIn("result", finished.storage["data"][1])
+        self.assertEqual(ongoing.storage["data"], data)
+
+    @skipUnless(connection.vendor == "postgresql", "partial updates require PostgreSQL")
+    def test_partial_updates_keep_concurrent_changes(self):
+        """
+        Test updates of the storage's paths don't overwrite changes made by other Job instances
+        """
+        job = self._create_job()
+
+        other = Job.objects.get(id=job.id)
+        other.context["key"] = "value"
+
+        # the first instance's storage is outdated
+        job.set_step_data("result", 1)
+        job.refresh_from_db()
+
+        self.assertEqual(job.storage["context"], {"key": "value"})
+        self.assertEqual(job.storage["data"][0]["result"], 1)
+
+
+@override_settings(WFE_WORKFLOWS="django_wfe.tests.wdf_models")
+class JobLogTest(TestCase):
+
+    fixtures = [
+        "django_wfe/tests/wdk_fixtures.json",
+    ]
+
+    def setUp(self):
+        # create the temporary log directory
+        self.tmp_log_dir = tempfile.TemporaryDirectory()
+
+        patcher = mock.patch.object(models, "WFE_LOG_DIR", self.tmp_log_dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        # remove temporary log dir
+        self.tmp_log_dir.cleanup()
+
+    def _execute_job(self):
+        job = Job(workflow=Workflow.objects.get(name="TestWorkflowSuccess"))
+        job.save()
+
+        job.execute()
+        job.refresh_from_db()
+
+        return job
+
+    def _get_logs(self, job, **headers):
+        request = RequestFactory().get(f"/jobs/{job.id}/logs", **headers)
+        return JobLogsView.as_view()(request, job_id=job.id)
+
+    def test_tee_threads(self):
+        """
+        Test the output printed by concurrently executed threads is written only to their own logs
+        """
+        barrier = threading.Barrier(2)
+
+        def print_lines(name):
+            with Tee(os.path.join(self.tmp_log_dir.name, name), "a"):
+                for _ in range(3):
+                    barrier.wait()
+                    print(name)
+
+        threads = [threading.Thread(target=print_lines, args=(name,)) for name in "ab"]
+        with mock.patch("sys.stdout", StringIO()):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        for name in "ab":
+            with open(os.path.join(self.tmp_log_dir.name, name)) as log:
+                self.assertEqual(log.read(), f"{name}\n" * 3)
+
+    def test_tee_restores_streams(self):
+        """
+        Test the original stdout and stderr are restored once the last Tee context exits
+        """
+        stdout, stderr = StringIO(), StringIO()
+        with mock.patch("sys.stdout", stdout), mock.patch("sys.stderr", stderr):
+            with Tee(os.path.join(self.tmp_log_dir.name, "a"), "a"):
+                with Tee(os.path.join(self.tmp_log_dir.name, "b"), "a"):
+                    print("b")
+                self.assertIsNot(sys.stdout, stdout)
+                print("a")
+
+            self.assertIs(sys.stdout, stdout)
+            self.assertIs(sys.stderr, stderr)
+
+        self.assertEqual(stdout.getvalue(), "b\na\n")
+
+    def test_sharded_logfile(self):
+        """
+        Test new Jobs' logs are placed in the directories sharded by the Job's UUID
+        """
+        job = Job(workflow=Workflow.objects.get(name="TestWorkflowSuccess"))
+        job.save()
+
+        self.assertEqual(
+            job.logfile,
+            os.path.join(
+                self.tmp_log_dir.name,
+                job.uuid.hex[:2],
+                job.uuid.hex[2:4],
+                f"{job.uuid}.log",
+            ),
+        )
+        self.assertTrue(os.path.isdir(os.path.dirname(job.logfile)))
+
+    def test_log_compressed(self):
+        """
+        Test the log is compressed once the Job is finished
+        """
+        job = self._execute_job()
+
+        self.assertEqual(job.state, JobState.FINISHED)
+        self.assertFalse(os.path.exists(job.logfile))
+        self.assertTrue(os.path.exists(job.compressed_logfile))
+
+        with job.open_log() as log:
+            self.assertIn(b"WORKFLOW FINISHED SUCCESSFULLY", log.read())
+
+    def test_logs_view_compressed(self):
+        """
+        Test JobLogsView passing the compressed log through, or decompressing it for clients not accepting gzip
+        """
+        job = self._execute_job()
+
+        response = self._get_logs(job, HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn(
+            b"WORKFLOW FINISHED SUCCESSFULLY",
+            gzip.decompress(b"".join(response.streaming_content)),
+        )
+
+        for accept_encoding in ("", "gzip;q=0, deflate", "br, *;q=0.5, gzip;q=0"):
+            response = self._get_logs(job, HTTP_ACCEPT_ENCODING=accept_encoding)
+            self.assertEqual(response.status_code, 200)
+            self.assertFalse(response.has_header("Content-Encoding"))
+            self.assertIn(
+                b"WORKFLOW FINISHED SUCCESSFULLY",
+                b"".join(response.streaming_content),
+            )
+
+        response = self._get_logs(job, HTTP_ACCEPT_ENCODING="br;q=1.0, *;q=0.1")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+
+    def test_log_written_after_compression(self):
+        """
+        Test the lines written after the log was compressed are read and served after the compressed ones
+        """
+        job = self._execute_job()
+
+        with open(job.logfile, "a") as log:
+            log.write("written after the compression\n")
+
+        with job.open_log() as log:
+            content = log.read()
+        self.assertIn(b"WORKFLOW FINISHED SUCCESSFULLY", content)
+        self.assertTrue(content.endswith(b"written after the compression\n"))
+
+        response = self._get_logs(job, HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(b"".join(response.streaming_content), content)
+
+    def test_profile(self):
+        """
+        Test the Steps of the Jobs created with the profile flag are profiled into a single downloadable pstats file
+        """
+        job = self._execute_job()
+        self.assertFalse(job.profile)
+        self.assertFalse(os.path.exists(job.profile_file))
+
+        job = Job(
+            workflow=Workflow.objects.get(name="TestWorkflowSuccess"), profile=True
+        )
+        job.save()
+        job.execute()
+
+        stats = pstats.Stats(job.profile_file)
+        self.assertEqual(
+            sorted(
+                function
+                for filename, _, function in stats.stats
+                if filename.endswith("wdk_models.py")
+            ),
+            ["execute", "execute", "execute"],
+        )
+
+        request = RequestFactory().get(f"/jobs/{job.id}/profile")
+        response = JobProfileView.as_view()(request, job_id=job.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response["Content-Disposition"],
+            f'attachment; filename="job_{job.id}.prof"',
+        )
+
+    def test_profile_sampled(self):
+        """
+        Test the new Jobs are flagged for profiling with the Workflow's PROFILE_RATE (or WFE_PROFILE_RATE setting)
+        """
+        workflow = Workflow.objects.get(name="TestWorkflowSuccess")
+
+        for rate, profiled in ((None, False), (0, False), (1, True)):
+            with self.subTest(rate=rate), mock.patch(
+                "django_wfe.tests.wdk_models.TestWorkflowSuccess.PROFILE_RATE",
+                rate,
+                create=True,
+            ):
+                job = Job(workflow=workflow)
+                job.save()
+                self.assertEqual(job.profile, profiled)
+
+        with mock.patch("django_wfe.profiling.WFE_PROFILE_RATE", 1):
+            job = Job(workflow=workflow)
+            job.save()
+            self.assertTrue(job.profile)
+
+
+@override_settings(WFE_WORKFLOWS="django_wfe.tests.wdf_models")
+class JobEventTest(TestCase):
+
+    fixtures = [
+        "django_wfe/tests/wdk_fixtures.json",
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        # create the temporary log directory
+        cls.tmp_log_dir = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+
+        # remove temporary log dir
+        cls.tmp_log_dir.cleanup()
+
+    def _execute_job(self, name):
+        job = Job(
+            workflow=Workflow.objects.get(name=name),
+            logfile=os.path.join(self.tmp_log_dir.name, "django_wfe_tmp.log"),
+        )
+        job.save()
+        job.execute()
+
+        return job
+
+    def _get_response(self, path="", **params):
+        request = APIRequestFactory().get(f"/events/{path}", params)
+        force_authenticate(request, user=User(username="test"))
+
+        action = "stats" if path else "list"
+        return JobEventViewSet.as_view({"get": action})(request)
+
+    def _get_events(self, path="", **params):
+        return self._get_response(path, **params).data
+
+    def test_job_events(self):
+        """
+        Test structured events emitted on TestWorkflowError workflow execution
+        """
+        job = self._execute_job("TestWorkflowError")
+
+        events = list(
+            JobEvent.objects.filter(job=job)
+            .order_by("id")
+            .values_list("step_number", "event", "error")
+        )
+        self.assertEqual(
+            events,
+            [
+                (0, JobEventType.STEP_STARTED, None),
+                (0, JobEventType.STEP_FINISHED, None),
+                (1, JobEventType.STEP_STARTED, None),
+                (1, JobEventType.STEP_FINISHED, None),
+                (2, JobEventType.STEP_STARTED, None),
+                (2, JobEventType.STEP_FAILED, "Exception"),
+                (2, JobEventType.JOB_FAILED, None),
+            ],
+        )
+        self.assertIsNotNone(
+            JobEvent.objects.get(job=job, event=JobEventType.STEP_FAILED).duration
+        )
+
+    def test_job_events_api(self):
+        """
+        Test filtering and aggregation of the events with JobEventViewSet
+        """
+        self._execute_job("TestWorkflowError")
+        self._execute_job("TestWorkflowError")
+        success = self._execute_job("TestWorkflowSuccess")
+
+        events = self._get_events(event=JobEventType.STEP_FAILED)["results"]
+        self.assertEqual(len(events), 2)
+        self.assertEqual(
+            {event["step"] for event in events},
+            {"django_wfe.tests.wdk_models.ErrorStep"},
+        )
+
+        events = self._get_events(job=success.id, event=JobEventType.JOB_FINISHED)
+        self.assertEqual(len(events["results"]), 1)
+
+        # events are paginated with a cursor, from the newest ones
+        pages, params = [], {}
+        while params or not pages:
+            page = self._get_events(job=success.id, page_size=2, **params)
+            pages.append([event["id"] for event in page["results"]])
+            params = (
+                {"cursor": unquote(page["next"].split("cursor=")[1].split("&")[0])}
+                if page["next"]
+                else {}
+            )
+        self.assertEqual(
+            pages[0][0], JobEvent.objects.filter(job=success).latest("id").id
+        )
+        self.assertEqual(
+            sum(pages, []),
+            list(
+                JobEvent.objects.filter(job=success)
+                .order_by("-timestamp", "-id")
+                .values_list("id", flat=True)
+            ),
+        )
+
+        response = self._get_response(job="abc")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("job", response.data)
+
+        stats = self._get_events(
+            "stats/", group_by="step,error", event=JobEventType.STEP_FAILED
+        )
+        self.assertEqual(len(stats), 1)
+        self.assertEqual(stats[0]["step"], "django_wfe.tests.wdk_models.ErrorStep")
+        self.assertEqual(stats[0]["error"], "Exception")
+        self.assertEqual(stats[0]["count"], 2)
+
+
+@override_settings(WFE_WORKFLOWS="django_wfe.tests.wdf_models")
+class JobCancelTest(TestCase):
+
+    fixtures = [
+        "django_wfe/tests/wdk_fixtures.json",
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        # create the temporary log directory
+        cls.tmp_log_dir = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+
+        # remove temporary log dir
+        cls.tmp_log_dir.cleanup()
+
+    def _create_job(self, name, **kwargs):
+        job = Job(
+            workflow=Workflow.objects.get(name=name),
+            logfile=os.path.join(self.tmp_log_dir.name, "django_wfe_tmp.log"),
+            **kwargs,
+        )
+        job.save()
+
+        return job
+
+    def test_cancel_during_execution(self):
+        """
+        Test the execution of TestWorkflowCancel workflow is interrupted, once the Job is cancelled
+        """
+        job = self._create_job("TestWorkflowCancel")
+        job.execute()
+
+        job.refresh_from_db()
+        self.assertEqual(job.state, JobState.CANCELLED)
+        self.assertEqual(job.current_step_number, 2)
+        # the cancelled Step's result is not saved, and the next Step is not executed
+        self.assertEqual(len(job.storage["data"]), 2)
+
+        events = list(
+            JobEvent.objects.filter(job=job)
+            .order_by("id")
+            .values_list("event", flat=True)
+        )
+        self.assertEqual(
+            events[-2:], [JobEventType.STEP_STARTED, JobEventType.JOB_CANCELLED]
+        )
+        self.assertNotIn(JobEventType.JOB_FAILED, events)
+
+    def test_cancel_workflow_jobs(self):
+        """
+        Test cancelling all Jobs of a Workflow, along with their sub-workflows' Jobs
+        """
+        finished = self._create_job("TestWorkflowSuccess", state=JobState.FINISHED)
+        pending = [self._create_job("TestWorkflowSuccess") for _ in range(3)]
+        child = self._create_job(
+            "TestWorkflowIncrement", parent=pending[0], state=JobState.ONGOING
+        )
+        other = self._create_job("TestWorkflowIncrement")
+
+        cancelled = Job.cancel(Job.objects.filter(workflow__name="TestWorkflowSuccess"))
+        self.assertEqual(cancelled, 4)
+
+        states = dict(Job.objects.values_list("id", "state"))
+        self.assertEqual(states[finished.id], JobState.FINISHED)
+        self.assertEqual(states[child.id], JobState.CANCELLED)
+        self.assertEqual(states[other.id], JobState.PENDING)
+        for job in pending:
+            self.assertEqual(states[job.id], JobState.CANCELLED)
+
+        # messages of the cancelled Jobs are dropped by the workers
+        from django_wfe.tasks import process_job
+
+        process_job(job_id=pending[1].id)
+        pending[1].refresh_from_db()
+        self.assertEqual(pending[1].current_step_number, 0)
+
+    def test_deadline(self):
+        """
+        Test Jobs are cancelled once their deadline has passed
+        """
+        past = timezone.now() - datetime.timedelta(minutes=1)
+
+        job = self._create_job("TestWorkflowSuccess", deadline=past)
+        job.execute()
+        job.refresh_from_db()
+        self.assertEqual(job.state, JobState.CANCELLED)
+        self.assertEqual(job.storage["data"], [])
+
+        # Jobs waiting for the input are cancelled by the watchdog
+        waiting = self._create_job(
+            "TestWorkflowExternalInput", state=JobState.INPUT_REQUIRED, deadline=past
+        )
+        cancel_overdue_jobs()
+        waiting.refresh_from_db()
+        self.assertEqual(waiting.state, JobState.CANCELLED)
+
+    def test_cancelled_token(self):
+        """
+        Test the cancellation token polled by the Steps
+        """
+        job = self._create_job("TestWorkflowSuccess")
+        step = steps.Step(job=job)
+
+        with mock.patch.object(models, "WFE_CANCEL_CHECK_INTERVAL", 0):
+            self.assertFalse(step.cancelled)
+            Job.cancel(Job.objects.filter(id=job.id))
+            self.assertTrue(step.cancelled)
+
+        self.assertFalse(steps.Step().cancelled)
+
+    def test_progress(self):
+        """
+        Test the progress reported by TestWorkflowProgress workflow's Step is throttled
+        """
+        job = self._create_job("TestWorkflowProgress")
+
+        with mock.patch.object(
+            models, "WFE_PROGRESS_INTERVAL", 3600
+        ), mock.patch.object(
+            Job, "_save_progress", autospec=True, side_effect=Job._save_progress
+        ) as save_progress:
+            job.execute()
+
+        # only the first report is saved, the latest one is saved along with the result
+        self.assertEqual(save_progress.call_count, 1)
+
+        job.refresh_from_db()
+        self.assertEqual(job.state, JobState.FINISHED)
+        self.assertEqual(job.progress["step_number"], 1)
+        self.assertEqual(job.progress["fraction"], 1.0)
+        self.assertEqual(job.progress["message"], "item 1000")
+
+        # a cancelled Job is interrupted on the progress report
+        job = self._create_job("TestWorkflowProgress")
+        Job.objects.filter(id=job.id).update(state=JobState.CANCELLED)
+        with self.assertRaises(exceptions.Cancelled):
+            job.report_progress(0.5)
+
+    def test_cancel_api(self):
+        """
+        Test cancelling the Jobs with JobViewSet
+        """
+        job = self._create_job("TestWorkflowSuccess")
+        user = User(username="test")
+
+        request = APIRequestFactory().post(f"/jobs/{job.id}/cancel/")
+        force_authenticate(request, user=user)
+        response = JobViewSet.as_view({"post": "cancel"})(request, pk=job.id)
+        self.assertEqual(response.data["state"], JobState.CANCELLED)
+
+        self._create_job("TestWorkflowSuccess")
+        request = APIRequestFactory().post(
+            "/jobs/cancel/", {"workflow_id": job.workflow_id}, format="json"
+        )
+        force_authenticate(request, user=user)
+        response = JobViewSet.as_view({"post": "cancel_workflow"})(request)
+        self.assertEqual(response.data, {"cancelled": 1})
+
+
+@override_settings(WFE_WORKFLOWS="django_wfe.tests.wdf_models")
+@mock.patch.object(process_job, "send")
+class JobIdempotencyTest(TestCase):
+
+    fixtures = [
+        "django_wfe/tests/wdk_fixtures.json",
+    ]
+
+    def test_create_idempotent(self, send):
+        """
+        Test Jobs with repeated idempotency keys are created only once
+        """
+        workflow = Workflow.objects.get(name="TestWorkflowSuccess")
+
+        jobs = Job.create_idempotent(
+            [
+                Job(workflow=workflow, idempotency_key=key)
+                for key in ["a", "b", "a", None]
+            ]
+        )
+        self.assertEqual([created for _, created in jobs], [True, True, False, True])
+        self.assertEqual(jobs[0][0].id, jobs[2][0].id)
+        self.assertEqual(Job.objects.count(), 3)
+
+        job, created = Job.create_idempotent(
+            [Job(workflow=workflow, idempotency_key="b")]
+        )[0]
+        self.assertFalse(created)
+        self.assertEqual(job.id, jobs[1][0].id)
+
+    def test_execute_workflow_idempotent(self, send):
+        """
+        Test repeated execute_workflow() calls with the same idempotency key order a single execution
+        """
+        workflow = Workflow.objects.get(name="TestWorkflowSuccess")
+
+        job_ids = [
+            execute_workflow(workflow.id, idempotency_key="request-1") for _ in range(2)
+        ]
+
+        self.assertEqual(job_ids[0], job_ids[1])
+        send.assert_called_once_with(job_id=job_ids[0])
+
+    def test_duplicated_process_job(self, send):
+        """
+        Test duplicated process_job messages are skipped, once the Job is claimed by a worker
+        """
+        job = Job(workflow=Workflow.objects.get(name="TestWorkflowSuccess"))
+        job.save()
+
+        self.assertTrue(job.claim())
+        self.assertFalse(job.claim())
+
+        # the Job is being executed by another worker
+        process_job(job_id=job.id)
+        job.refresh_from_db()
+        self.assertEqual(job.current_step_number, 0)
+
+    def test_redelivered_after_crash(self, send):
+        """
+        Test the process_job message redelivered after the worker's crash executes the Job, once its lease has expired
+        """
+        with tempfile.TemporaryDirectory() as tmp_log_dir:
+            job = Job(
+                workflow=Workflow.objects.get(name="TestWorkflowSuccess"),
+                logfile=os.path.join(tmp_log_dir, "django_wfe_tmp.log"),
+            )
+            job.save()
+
+            # the worker claiming the Job crashes before executing it
+            self.assertTrue(job.claim())
+
+            # the lease is still held
+            process_job(job_id=job.id)
+            job.refresh_from_db()
+            self.assertEqual(job.state, JobState.ONGOING)
+            self.assertEqual(job.current_step_number, 0)
+
+            # the lease expires, as nobody renews it
+            Job.objects.filter(id=job.id).update(
+                claimed_at=leases.expired_before() - datetime.timedelta(seconds=1)
+            )
+            process_job(job_id=job.id)
+            job.refresh_from_db()
+
+        self.assertEqual(job.state, JobState.FINISHED)
+
+    def test_redelivered_after_input(self, send):
+        """
+        Test the Job re-claimed after the worker's crash executes its Step with the already received input
+        """
+        with tempfile.TemporaryDirectory() as tmp_log_dir:
+            job = Job(
+                workflow=Workflow.objects.get(name="TestWorkflowExternalInput"),
+                logfile=os.path.join(tmp_log_dir, "django_wfe_tmp.log"),
+            )
+            job.save()
+            job.execute()
+            job.refresh_from_db()
+            job.provide_external_input({"external_int": 1})
+
+            # the worker claiming the Job crashes, before the Step is finished
+            self.assertTrue(job.claim())
+            Job.objects.filter(id=job.id).update(
+                claimed_at=leases.expired_before() - datetime.timedelta(seconds=1)
+            )
+
+            process_job(job_id=job.id)
+            job.refresh_from_db()
+
+        self.assertEqual(job.state, JobState.FINISHED)
+        self.assertEqual(job.storage["data"][2]["result"], 1)
+
+    def test_requeue_expired_jobs(self, send):
+        """
+        Test the watchdog re-queues the ONGOING Jobs, which lease has expired
+        """
+        workflow = Workflow.objects.get(name="TestWorkflowSuccess")
+        expired, leased = Job(workflow=workflow), Job(workflow=workflow)
+        for job in (expired, leased):
+            job.save()
+            self.assertTrue(job.claim())
+
+        Job.objects.filter(id=expired.id).update(
+            claimed_at=leases.expired_before() - datetime.timedelta(seconds=1)
+        )
+
+        requeue_expired_jobs()
+
+        expired.refresh_from_db()
+        leased.refresh_from_db()
+        self.assertEqual(expired.state, JobState.PENDING)
+        self.assertEqual(leased.state, JobState.ONGOING)
+        send.assert_called_once_with(job_id=expired.id)
+
+    def test_lease_renewed(self, send):
+        """
+        Test the heartbeat renews the leases of the Jobs executed by the process
+        """
+        job = Job(workflow=Workflow.objects.get(name="TestWorkflowSuccess"))
+        job.save()
+        self.assertTrue(job.claim())
+
+        claimed_at = leases.expired_before() - datetime.timedelta(seconds=1)
+        Job.objects.filter(id=job.id).update(claimed_at=claimed_at)
+
+        heartbeat = leases.Heartbeat()
+        with mock.patch.object(leases, "get_heartbeat", return_value=heartbeat):
+            with leases.held(job):
+                heartbeat.beat()
+                job.refresh_from_db()
+                self.assertGreater(job.claimed_at, claimed_at)
+                self.assertFalse(job.claim())
+
+        self.assertEqual(heartbeat.ids, {})
+
+    def test_create_api_wake_at(self, send):
+        """
+        Test the wake up time of the Job created with the REST API cannot be set by the client
+        """
+        workflow = Workflow.objects.get(name="TestWorkflowSuccess")
+        request = APIRequestFactory().post(
+            "/jobs/",
+            {"workflow_id": workflow.id, "wake_at": "2020-05-21T08:54:00Z"},
+            format="json",
+        )
+        force_authenticate(request, user=User(username="test"))
+        response = JobViewSet.as_view({"post": "create"})(request)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertIsNone(Job.objects.get(id=response.data["id"]).wake_at)
+
+    def test_create_api_lease(self, send):
+        """
+        Test the lease and the profiling flag of the Job created with the REST API cannot be set by the client
+        """
+        workflow = Workflow.objects.get(name="TestWorkflowSuccess")
+        request = APIRequestFactory().post(
+            "/jobs/",
+            {
+                "workflow_id": workflow.id,
+                "claimed_at": "2020-05-21T08:54:00Z",
+                "profile": True,
+            },
+            format="json",
+        )
+        force_authenticate(request, user=User(username="test"))
+        response = JobViewSet.as_view({"post": "create"})(request)
+
+        self.assertEqual(response.status_code, 201)
+        job = Job.objects.get(id=response.data["id"])
+        self.assertIsNone(job.claimed_at)
+        self.assertFalse(job.profile)
+
+    def test_create_api_idempotent(self, send):
+        """
+        Test creating a list of Jobs with JobViewSet, repeating the idempotency keys
+        """
+        workflow = Workflow.objects.get(name="TestWorkflowSuccess")
+        view = JobViewSet.as_view({"post": "create"})
+        data = [
+            {"workflow_id": workflow.id, "idempotency_key": "x"},
+            {"workflow_id": workflow.id, "idempotency_key": "y"},
+        ]
+
+        statuses, ids = [], []
+        for _ in range(2):
+            request = APIRequestFactory().post("/jobs/", data, format="json")
+            force_authenticate(request, user=User(username="test"))
+            response = view(request)
+
+            statuses.append(response.status_code)
+            ids.append([job["id"] for job in response.data])
+
+        self.assertEqual(statuses, [201, 200])
+        self.assertEqual(ids[0], ids[1])
+        self.assertEqual(send.call_count, 2)
+
+    def test_create_api_unknown_workflow(self, send):
+        """
+        Test Jobs of the not existing or deleted Workflows are rejected by the REST API's validation
+        """
+        deleted = Workflow.objects.create(
+            name="Deleted", path="django_wfe.tests.wdk_models.Deleted", deleted=True
+        )
+        view = JobViewSet.as_view({"post": "create"})
+
+        for data in (
+            {"workflow_id": 0},
+            [{"workflow_id": 0, "idempotency_key": "z"}],
+            {"workflow_id": deleted.id},
+        ):
+            request = APIRequestFactory().post("/jobs/", data, format="json")
+            force_authenticate(request, user=User(username="test"))
+            response = view(request)
+
+            self.assertEqual(response.status_code, 400)
+
+        self.assertFalse(Job.objects.exists())
+        send.assert_not_called()
+
+
+@override_settings(WFE_WORKFLOWS="django_wfe.tests.wdf_models")
+@mock.patch(
+    "django.db.transaction.on_commit", side_effect=lambda func, using=None: func()
+)
+@mock.patch.object(process_job.broker, "enqueue")
+class JobInputsTest(TestCase):
+
+    fixtures = [
+        "django_wfe/tests/wdk_fixtures.json",
+    ]
+
+    def _create_job(self, state=JobState.INPUT_REQUIRED):
+        job = Job(
+            workflow=Workflow.objects.get(name="TestWorkflowExternalInput"),
+            current_step="django_wfe.tests.wdk_models.ExternalInputStep",
+            current_step_number=2,
+            storage={
+                "data": [
+                    {"step": "__start__", "result": None},
+                    {"step": "EmptyStepA", "result": None},
+                ]
+            },
+            state=state,
+        )
+        job.save()
+        return job
+
+    def test_provide_inputs(self, enqueue, on_commit):
+        """
+        Test providing inputs of multiple Jobs, some of which cannot receive them
+        """
+        jobs = [self._create_job() for _ in range(3)]
+        running = self._create_job(state=JobState.ONGOING)
+
+        errors = provide_inputs(
+            {
+                jobs[0].id: {"external_int": 1},
+                str(jobs[1].id): {"external_int": 2},
+                jobs[2].id: {"external_int": "not an int"},
+                running.id: {"external_int": 3},
+                0: {"external_int": 4},
+            }
+        )
+
+        self.assertEqual(set(errors), {jobs[2].id, running.id, 0})
+        self.assertEqual(
+            [call.args[0].kwargs for call in enqueue.call_args_list],
+            [{"job_id": jobs[0].id}, {"job_id": jobs[1].id}],
+        )
+
+        for job, external_int in zip(jobs[:2], (1, 2)):
+            job.refresh_from_db()
+            self.assertEqual(job.state, JobState.INPUT_RECEIVED)
+            self.assertEqual(
+                job.storage["data"][2]["external_data"],
+                {"external_int": external_int},
+            )
+
+        jobs[2].refresh_from_db()
+        self.assertEqual(jobs[2].state, JobState.INPUT_REQUIRED)
+
+    def test_provide_inputs_api(self, enqueue, on_commit):
+        """
+        Test providing inputs of multiple Jobs with JobViewSet
+        """
+        jobs = [self._create_job() for _ in range(2)]
+
+        request = APIRequestFactory().post(
+            "/jobs/inputs/",
+            {str(jobs[0].id): {"external_int": 1}, str(jobs[1].id): {}},
+            format="json",
+        )
+        force_authenticate(request, user=User(username="test"))
+        response = JobViewSet.as_view({"post": "inputs"})(request)
+
+        self.assertEqual(response.data["resumed"], [jobs[0].id])
+        self.assertEqual(list(response.data["errors"]), [jobs[1].id])
+        self.assertEqual(enqueue.call_count, 1)
+
+
+@override_settings(WFE_WORKFLOWS="django_wfe.tests.wdf_models")
+@mock.patch.object(process_job.broker, "enqueue")
+class JobAdminTest(TestCase):
+
+    fixtures = [
+        "django_wfe/tests/wdk_fixtures.json",
+    ]
+
+    def setUp(self):
+        self.admin = JobAdmin(Job, admin.site)
+        self.request = RequestFactory().get("/admin/django_wfe/job/")
+
+    def test_search(self, enqueue):
+        """
+        Test Jobs are searched by their ID or their Workflow, without scanning the Jobs' states
+        """
+        workflow = Workflow.objects.get(name="TestWorkflowSuccess")
+        jobs = [Job(workflow=workflow) for _ in range(2)]
+        for job in jobs:
+            job.save()
+
+        queryset, _ = self.admin.get_search_results(
+            self.request, Job.objects.all(), str(jobs[1].id)
+        )
+        self.assertEqual(list(queryset), [jobs[1]])
+
+        queryset, _ = self.admin.get_search_results(
+            self.request, Job.objects.all(), "TestWorkflowSuccess"
+        )
+        self.assertEqual(set(queryset), set(jobs))
+
+        queryset, _ = self.admin.get_search_results(
+            self.request,
+            Job.objects.all(),
+            "django_wfe.tests.wdk_models.TestWorkflowSucc",
+        )
+        self.assertEqual(set(queryset), set(jobs))
+
+        # names are not searched by their substrings
+        queryset, _ = self.admin.get_search_results(
+            self.request, Job.objects.all(), "WorkflowSuccess"
+        )
+        self.assertEqual(list(queryset), [])
+
+    def test_created_at_filter(self, enqueue):
+        """
+        Test Jobs are filtered by their creation date with a range of created_at, instead of the date hierarchy
+        """
+        workflow = Workflow.objects.get(name="TestWorkflowSuccess")
+        old, new = Job(workflow=workflow), Job(workflow=workflow)
+        old.created_at = timezone.now() - datetime.timedelta(days=30)
+        for job in (old, new):
+            job.save()
+
+        self.assertIsNone(self.admin.date_hierarchy)
+
+        request = RequestFactory().get(
+            "/admin/django_wfe/job/",
+            {"created_at__gte": (timezone.now() - datetime.timedelta(days=7)).date()},
+        )
+        request.user = User.objects.create_superuser("admin")
+        changelist = self.admin.get_changelist_instance(request)
+        self.assertEqual(list(changelist.get_queryset(request)), [new])
+
+    def test_rerun_jobs(self, enqueue):
+        """
+        Test the "Re-run selected Jobs" action creates new Jobs with the same input, and sends them in a batch
+        """
+        workflow = Workflow.objects.get(name="TestWorkflowSuccess")
+        jobs = [
+            Job(workflow=workflow, storage={"data": [], "input": number}, state=state)
+            for number, state in ((1, JobState.FINISHED), (2, JobState.FAILED))
+        ]
+        for job in jobs:
+            job.save()
+        child = Job(workflow=workflow, parent=jobs[0])
+        child.save()
+
+        with mock.patch.object(self.admin, "message_user"):
+            self.admin.rerun_jobs(self.request, Job.objects.all())
+
+        reruns = Job.objects.filter(id__gt=child.id).order_by("id")
+        self.assertEqual(
+            [(job.storage["input"], job.state, job.parent) for job in reruns],
+            [(1, JobState.PENDING, None), (2, JobState.PENDING, None)],
+        )
+        self.assertEqual(
+            [call.args[0].kwargs for call in enqueue.call_args_list],
+            [{"job_id": job.id} for job in reruns],
+        )
@@ -0,0 +1,127 @@
+import os
+import json
+import tempfile
+from unittest import mock
+from django.contrib.auth.models import User
+from django.test import TransactionTestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from django_wfe import notifications
+from django_wfe.models import Workflow, Job, JobState
+from django_wfe.views import JobNotificationsView
+
+
+@override_settings(WFE_WORKFLOWS="django_wfe.tests.wdf_models")
+class NotificationsTest(TransactionTestCase):
+
+    fixtures = [
+        "django_wfe/tests/wdk_fixtures.json",
+    ]
+
+    def setUp(self):
+        # create the temporary log directory
+        self.tmp_log_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        # remove temporary log dir
+        self.tmp_log_dir.cleanup()
+
+    def _create_job(self, name, state=JobState.PENDING):
+        job = Job(
+            workflow=Workflow.objects.get(name=name),
+            state=state,
+            logfile=os.path.join(self.tmp_log_dir.name, "django_wfe_tmp.log"),
+        )
+        job.save()
+
+        return job
+
+    def test_publish_state_changes(self):
+        """
+        Test notifications published on the state changes of TestWorkflowExternalInput workflow's Job
+        """
+        job = self._create_job("TestWorkflowExternalInput")
+
+        with notifications.subscribe([job.id]) as subscription:
+            job.execute()
+
+            states = []
+            while not states or states[-1] != JobState.INPUT_REQUIRED:
+                payload = subscription.get(timeout=5)
+                self.assertIsNotNone(payload, "Expected notification was not received")
+                self.assertEqual(payload["job"], job.id)
+                states.append(payload["state"])
+
+            self.assertEqual(states[0], JobState.ONGOING)
+
+            job.provide_external_input({"external_int": 1})
+            payload = subscription.get(timeout=5)
+
+        self.assertEqual(payload["state"], JobState.INPUT_RECEIVED)
+        self.assertEqual(
+            payload["step"], "django_wfe.tests.wdk_models.ExternalInputStep"
+        )
+
+    def test_notifications_stream(self):
+        """
+        Test JobNotificationsView streaming the states of multiple Jobs until they end
+        """
+        finished = self._create_job("TestWorkflowSuccess", state=JobState.FINISHED)
+        pending = self._create_job("TestWorkflowError")
+
+        request = APIRequestFactory().get(
+            "/jobs/notifications", {"ids": f"{finished.id},{pending.id}"}
+        )
+        force_authenticate(request, user=User(username="test"))
+        response = JobNotificationsView.as_view()(request)
+
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        stream = iter(response.streaming_content)
+        snapshot = [next(stream).decode(), next(stream).decode()]
+        self.assertIn('"state": "FINISHED"', snapshot[0])
+        self.assertIn('"state": "PENDING"', snapshot[1])
+
+        pending.execute()
+
+        events = [event.decode() for event in stream]
+        self.assertTrue(events[-1].startswith("event: state\n"))
+        self.assertIn('"state": "FAILED"', events[-1])
+
+    def test_long_progress_message(self):
+        """
+        Test the progress message is truncated in the notifications, within the size limit of PostgreSQL NOTIFY
+        """
+        job = self._create_job("TestWorkflowSuccess", state=JobState.ONGOING)
+        message = "ą" * 10000
+
+        with notifications.subscribe([job.id]) as subscription:
+            job.report_progress(0.5, message)
+            payload = subscription.get(timeout=5)
+
+        self.assertEqual(payload["progress"]["message"], message)
+
+        data = notifications.encode(payload)
+        self.assertLessEqual(len(data.encode()), notifications.MAX_PAYLOAD_SIZE)
+        self.assertEqual(
+            len(json.loads(data)["progress"]["message"]),
+            notifications.MAX_MESSAGE_LENGTH,
+        )
+
+        data = notifications.encode({**payload, "step": "a" * 10000})
+        self.assertEqual(json.loads(data), {"job": job.id, "state": JobState.ONGOING})
+
+    def test_publish_failure(self):
+        """
+        Test the failure of NOTIFY is logged, and does not fail the Job's update
+        """
+        job = self._create_job("TestWorkflowSuccess", state=JobState.ONGOING)
+
+        with mock.patch.object(
+            notifications, "is_postgresql", return_value=True
+        ), self.assertLogs("django_wfe.notifications", "ERROR"):
+            # pg_notify() fails outside PostgreSQL
+            job.report_progress(0.5, "halfway")
+
+        job.refresh_from_db()
+        self.assertEqual(job.progress["message"], "halfway")
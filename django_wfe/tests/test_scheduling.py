@@ -0,0 +1,144 @@
+import os
+import tempfile
+from unittest import mock
+from django.db.models import Count
+from django.test import TransactionTestCase, override_settings
+
+from django_wfe import scheduling
+from django_wfe.models import Workflow, Job, JobState
+
+
+@override_settings(WFE_WORKFLOWS="django_wfe.tests.wdf_models")
+@mock.patch("django_wfe.tasks.process_job.send")
+class SchedulingTest(TransactionTestCase):
+
+    fixtures = [
+        "django_wfe/tests/wdk_fixtures.json",
+    ]
+
+    def setUp(self):
+        # create the temporary log directory
+        self.tmp_log_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        # remove temporary log dir
+        self.tmp_log_dir.cleanup()
+
+    def _create_job(self, name, **kwargs):
+        job = Job(
+            workflow=Workflow.objects.get(name=name),
+            logfile=os.path.join(self.tmp_log_dir.name, "django_wfe_tmp.log"),
+            **kwargs,
+        )
+        job.save()
+
+        return job
+
+    def test_submit_not_limited(self, send):
+        """
+        Test Jobs of the Workflows without limits are sent to the workers directly
+        """
+        job = self._create_job("TestWorkflowSuccess")
+
+        self.assertTrue(job.submit())
+        send.assert_called_once_with(job_id=job.id)
+
+    def test_workflow_limit(self, send):
+        """
+        Test TestWorkflowLimited workflow's Jobs over its MAX_CONCURRENT_JOBS are queued until a slot is released
+        """
+        jobs, submitted = [], []
+        for _ in range(3):
+            jobs.append(self._create_job("TestWorkflowLimited"))
+            submitted.append(jobs[-1].submit())
+
+        self.assertEqual(submitted, [True, True, False])
+        self.assertEqual(
+            list(Job.objects.order_by("id").values_list("state", flat=True)),
+            [JobState.PENDING, JobState.PENDING, JobState.QUEUED],
+        )
+        self.assertEqual(send.call_count, 2)
+
+        # sub-workflows' Jobs are not limited
+        child = self._create_job("TestWorkflowLimited", parent=jobs[0])
+        self.assertTrue(child.submit())
+
+        jobs[0].execute()
+        jobs[0].refresh_from_db()
+        self.assertEqual(jobs[0].state, JobState.FINISHED)
+
+        jobs[2].refresh_from_db()
+        self.assertEqual(jobs[2].state, JobState.PENDING)
+        send.assert_called_with(job_id=jobs[2].id)
+
+    def test_slot_released_while_suspended(self, send):
+        """
+        Test a Job waiting for an external input releases its slot, unlike a Job waiting for its sub-workflow
+        """
+        jobs, submitted = [], []
+        for _ in range(3):
+            jobs.append(self._create_job("TestWorkflowLimitedInput"))
+            submitted.append(jobs[-1].submit())
+        self.assertEqual(submitted, [True, False, False])
+
+        jobs[0].execute()
+        jobs[0].refresh_from_db()
+        self.assertEqual(jobs[0].state, JobState.INPUT_REQUIRED)
+
+        jobs[1].refresh_from_db()
+        self.assertEqual(jobs[1].state, JobState.PENDING)
+        send.assert_called_with(job_id=jobs[1].id)
+
+        # the Job waiting for its sub-workflow keeps its slot
+        Job.objects.filter(id=jobs[1].id).update(state=JobState.WAITING)
+        self._create_job("TestWorkflowSuccess", parent=jobs[1])
+        self.assertEqual(scheduling.release(), [])
+
+        Job.objects.filter(parent=jobs[1]).update(state=JobState.FINISHED)
+        self.assertEqual(scheduling.release(), [jobs[2].id])
+
+    def test_fair_share(self, send):
+        """
+        Test queued Jobs are admitted proportionally to their Workflows' weights
+        """
+        for name in ["TestWorkflowIncrement", "TestWorkflowWeighted"]:
+            for _ in range(4):
+                self._create_job(name, state=JobState.QUEUED)
+
+        with mock.patch.object(scheduling, "WFE_MAX_CONCURRENT_JOBS", 3):
+            admitted = scheduling.release()
+            self.assertEqual(len(admitted), 3)
+            self.assertEqual(scheduling.release(), [])
+
+        counts = dict(
+            Job.objects.filter(id__in=admitted)
+            .values_list("workflow__name")
+            .annotate(Count("id"))
+        )
+        self.assertEqual(
+            counts, {"TestWorkflowIncrement": 1, "TestWorkflowWeighted": 2}
+        )
+
+    def test_submit_many(self, send):
+        """
+        Test submitting many Jobs at once sends the not limited Jobs as a single group, and queues the Jobs over the limits
+        """
+        jobs = [self._create_job("TestWorkflowSuccess") for _ in range(2)]
+        jobs += [self._create_job("TestWorkflowLimited") for _ in range(3)]
+
+        with mock.patch("django_wfe.tasks.process_job.broker.enqueue") as enqueue:
+            sent = scheduling.submit_many(jobs)
+
+        self.assertEqual(sent, [job.id for job in jobs[:4]])
+        self.assertEqual(
+            [call.args[0].kwargs for call in enqueue.call_args_list],
+            [{"job_id": job.id} for job in jobs[:2]],
+        )
+        self.assertEqual(
+            [call.kwargs for call in send.call_args_list],
+            [{"job_id": job.id} for job in jobs[2:4]],
+        )
+        self.assertEqual(
+            list(Job.objects.order_by("id").values_list("state", flat=True)),
+            [JobState.PENDING] * 4 + [JobState.QUEUED],
+        )
@@ -0,0 +1,923 @@
+import os
+import pstats
+import asyncio
+import datetime
+import tempfile
+import threading
+from unittest import mock
+from asgiref.sync import async_to_sync
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from django_wfe import aio, leases, process_pool, rate_limits, warmup
+from django_wfe.middleware import WarmUpMiddleware
+from django_wfe.models import (
+    Workflow,
+    Job,
+    JobState,
+    MapChunk,
+    ChunkState,
+    RateLimitBucket,
+)
+from django_wfe.tasks import process_job, process_map_chunk, wake_job
+from django_wfe.utils import requeue_expired_jobs, wake_up_waiting_jobs
+from django_wfe.tests.wdk_models import IncrementMapStep
+
+
+@override_settings(WFE_WORKFLOWS="django_wfe.tests.wdf_models")
+class SubWorkflowTest(TestCase):
+
+    fixtures = [
+        "django_wfe/tests/wdk_fixtures.json",
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        # create the temporary log directory
+        cls.tmp_log_dir = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+
+        # remove temporary log dir
+        cls.tmp_log_dir.cleanup()
+
+    def test_sub_workflow_execution(self):
+        """
+        Test Job.execute() method on TestWorkflowSubWorkflow workflow, launching TestWorkflowIncrement as a child Job
+        """
+        workflow = Workflow.objects.get(name="TestWorkflowSubWorkflow")
+
+        job = Job(
+            workflow_id=workflow.id,
+            logfile=os.path.join(self.tmp_log_dir.name, "django_wfe_tmp.log"),
+        )
+        job.save()
+
+        with mock.patch.object(process_job, "send") as send:
+            job.execute()
+
+            job.refresh_from_db()
+            child = job.children.get()
+
+            self.assertEqual(
+                job.state,
+                JobState.WAITING,
+                "Expected parent Job state to be JobState.WAITING, after launching the child Job",
+            )
+            self.assertEqual(child.storage["input"], 1)
+            send.assert_called_once_with(job_id=child.id)
+
+            # execute the child Job
+            child.logfile = job.logfile
+            child.execute()
+
+            child.refresh_from_db()
+            job.refresh_from_db()
+
+            self.assertEqual(child.state, JobState.FINISHED)
+            self.assertEqual(child.result, 2)
+            self.assertEqual(
+                job.state,
+                JobState.PENDING,
+                "Expected parent Job to be resumed after the child Job finished",
+            )
+            send.assert_called_with(job_id=job.id)
+
+            # resume the parent Job
+            job.execute()
+            job.refresh_from_db()
+
+        self.assertEqual(job.state, JobState.FINISHED)
+        self.assertEqual(
+            job.result, 2, "Child Job's result wasn't passed to the parent Job"
+        )
+
+    def test_child_ended_before_parent_suspended(self):
+        """
+        Test the parent Job resumed spuriously is woken up, when its child ends before the parent is marked as waiting
+        """
+        workflow = Workflow.objects.get(name="TestWorkflowSubWorkflow")
+
+        job = Job(
+            workflow_id=workflow.id,
+            logfile=os.path.join(self.tmp_log_dir.name, "django_wfe_tmp.log"),
+        )
+        job.save()
+
+        with mock.patch.object(process_job, "send") as send:
+            job.execute()
+            child = job.children.get()
+            child.logfile = job.logfile
+
+            # the parent is resumed spuriously, while its child is still being executed
+            Job.objects.filter(id=job.id).update(state=JobState.PENDING)
+            self.assertTrue(job.claim())
+            job.refresh_from_db()
+
+            save_state = Job._save_state
+
+            def end_child(self, *args, **kwargs):
+                if self.id == job.id and self.state == JobState.WAITING:
+                    # the child ends (and fails to wake the parent, which is not waiting yet)
+                    child.execute()
+                save_state(self, *args, **kwargs)
+
+            with mock.patch.object(Job, "_save_state", end_child):
+                job.execute()
+
+            job.refresh_from_db()
+            self.assertEqual(job.state, JobState.PENDING)
+            send.assert_called_with(job_id=job.id)
+
+    def test_wake_not_waiting_job(self):
+        """
+        Test Job.wake() doesn't resume Jobs which are not suspended
+        """
+        workflow = Workflow.objects.get(name="TestWorkflowSuccess")
+
+        job = Job(
+            workflow_id=workflow.id,
+            state=JobState.ONGOING,
+            logfile=os.path.join(self.tmp_log_dir.name, "django_wfe_tmp.log"),
+        )
+        job.save()
+
+        with mock.patch.object(process_job, "send") as send:
+            self.assertFalse(Job.wake(job.id))
+
+        send.assert_not_called()
+
+
+@override_settings(WFE_WORKFLOWS="django_wfe.tests.wdf_models")
+class MapStepTest(TestCase):
+
+    fixtures = [
+        "django_wfe/tests/wdk_fixtures.json",
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        # create the temporary log directory
+        cls.tmp_log_dir = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+
+        # remove temporary log dir
+        cls.tmp_log_dir.cleanup()
+
+    def test_map_step_execution(self):
+        """
+        Test Job.execute() method on TestWorkflowMap workflow
+        """
+        workflow = Workflow.objects.get(name="TestWorkflowMap")
+
+        job = Job(
+            workflow_id=workflow.id,
+            logfile=os.path.join(self.tmp_log_dir.name, "django_wfe_tmp.log"),
+        )
+        job.save()
+
+        with mock.patch.object(process_job, "send"), mock.patch.object(
+            process_map_chunk, "send"
+        ) as send_chunk:
+            job.execute()
+            job.refresh_from_db()
+
+            self.assertEqual(job.state, JobState.WAITING)
+            self.assertEqual(job.map_progress, {"total": 3, "finished": 0, "failed": 0})
+            # progress counted along with the Jobs in the REST API
+            annotated = MapChunk.annotate_progress(Job.objects.filter(id=job.id)).get()
+            with self.assertNumQueries(0):
+                self.assertEqual(
+                    annotated.map_progress, {"total": 3, "finished": 0, "failed": 0}
+                )
+            self.assertEqual(
+                send_chunk.call_count,
+                IncrementMapStep.CONCURRENCY,
+                "Number of enqueued chunks exceeds MapStep.CONCURRENCY",
+            )
+
+            # execute chunks in the order of enqueueing
+            while MapChunk.objects.filter(state=ChunkState.QUEUED).exists():
+                chunk = MapChunk.objects.filter(state=ChunkState.QUEUED).first()
+                chunk.execute()
+
+            job.refresh_from_db()
+            self.assertEqual(job.state, JobState.PENDING)
+            self.assertEqual(job.map_progress, {"total": 3, "finished": 3, "failed": 0})
+            annotated = MapChunk.annotate_progress(Job.objects.filter(id=job.id)).get()
+            self.assertEqual(
+                annotated.map_progress, {"total": 3, "finished": 3, "failed": 0}
+            )
+            other = Job(
+                workflow=Workflow.objects.get(name="TestWorkflowSuccess"),
+                logfile=job.logfile,
+            )
+            other.save()
+            self.assertIsNone(
+                MapChunk.annotate_progress(Job.objects.filter(id=other.id))
+                .get()
+                .map_progress
+            )
+
+            # resume the Job
+            job.execute()
+            job.refresh_from_db()
+
+        self.assertEqual(job.state, JobState.FINISHED)
+        self.assertEqual(job.result, [1, 2, 3, 4, 5])
+
+    def test_last_chunk_ended_before_job_suspended(self):
+        """
+        Test the Job resumed spuriously is woken up, when its last chunk ends before the Job is marked as waiting
+        """
+        workflow = Workflow.objects.get(name="TestWorkflowMap")
+
+        job = Job(
+            workflow_id=workflow.id,
+            logfile=os.path.join(self.tmp_log_dir.name, "django_wfe_tmp.log"),
+        )
+        job.save()
+
+        with mock.patch.object(process_job, "send") as send, mock.patch.object(
+            process_map_chunk, "send"
+        ):
+            job.execute()
+
+            # execute all chunks but the last one
+            while MapChunk.objects.exclude(state=ChunkState.FINISHED).count() > 1:
+                MapChunk.objects.filter(state=ChunkState.QUEUED).first().execute()
+            last_chunk = MapChunk.objects.get(state=ChunkState.QUEUED)
+
+            # the Job is resumed spuriously, while its last chunk is still being executed
+            Job.objects.filter(id=job.id).update(state=JobState.PENDING)
+            self.assertTrue(job.claim())
+            job.refresh_from_db()
+
+            save_state = Job._save_state
+
+            def end_chunk(self, *args, **kwargs):
+                if self.id == job.id and self.state == JobState.WAITING:
+                    # the last chunk ends (and fails to wake the Job, which is not waiting yet)
+                    last_chunk.execute()
+                save_state(self, *args, **kwargs)
+
+            with mock.patch.object(Job, "_save_state", end_chunk):
+                job.execute()
+
+            job.refresh_from_db()
+            self.assertEqual(job.state, JobState.PENDING)
+            send.assert_called_with(job_id=job.id)
+
+    def test_log_compressed_by_last_chunk(self):
+        """
+        Test the log of the Job ended while its chunk is executed is compressed once the chunk ends
+        """
+        workflow = Workflow.objects.get(name="TestWorkflowMap")
+
+        job = Job(
+            workflow_id=workflow.id,
+            logfile=os.path.join(self.tmp_log_dir.name, "django_wfe_compressed.log"),
+        )
+        job.save()
+
+        with mock.patch.object(process_job, "send"), mock.patch.object(
+            process_map_chunk, "send"
+        ):
+            job.execute()
+            job.refresh_from_db()
+
+            def end_job(*args, **kwargs):
+                # the Job ends (e.g. is cancelled) while the chunk is executed
+                job._end_cancelled()
+                self.assertFalse(os.path.exists(job.compressed_logfile))
+                return 1
+
+            chunk = MapChunk.objects.filter(state=ChunkState.QUEUED).first()
+            with mock.patch.object(
+                job.import_class(job.current_step).STEP,
+                "_perform_execute",
+                side_effect=end_job,
+            ):
+                chunk.execute()
+
+        self.assertFalse(os.path.exists(job.logfile))
+        with job.open_log() as log:
+            self.assertIn(b"chunk #0 finished", log.read())
+
+    def test_chunk_redelivered_after_crash(self):
+        """
+        Test the chunk left ONGOING by the crashed worker is executed again, once its lease has expired
+        """
+        workflow = Workflow.objects.get(name="TestWorkflowMap")
+
+        job = Job(
+            workflow_id=workflow.id,
+            logfile=os.path.join(self.tmp_log_dir.name, "django_wfe_tmp.log"),
+        )
+        job.save()
+
+        with mock.patch.object(process_job, "send"), mock.patch.object(
+            process_map_chunk, "send"
+        ) as send_chunk:
+            job.execute()
+
+            first, second = MapChunk.objects.filter(state=ChunkState.QUEUED).order_by(
+                "index"
+            )
+
+            # the workers claiming the chunks crash before executing them
+            for chunk in (first, second):
+                self.assertTrue(chunk.claim())
+
+            # the leases are still held
+            first.execute()
+            first.refresh_from_db()
+            self.assertEqual(first.state, ChunkState.ONGOING)
+            self.assertIsNone(first.result)
+
+            MapChunk.objects.filter(id__in=[first.id, second.id]).update(
+                claimed_at=leases.expired_before() - datetime.timedelta(seconds=1)
+            )
+
+            # the first chunk's message is redelivered
+            first.execute()
+            first.refresh_from_db()
+            self.assertEqual(first.state, ChunkState.FINISHED)
+
+            # the second chunk's message is lost, the chunk is re-queued by the watchdog
+            send_chunk.reset_mock()
+            requeue_expired_jobs()
+            second.refresh_from_db()
+            self.assertEqual(second.state, ChunkState.QUEUED)
+            send_chunk.assert_any_call(chunk_id=second.id)
+
+            second.execute()
+            second.refresh_from_db()
+
+        self.assertEqual(second.state, ChunkState.FINISHED)
+
+    def test_chunks_of_ended_job(self):
+        """
+        Test chunks of the cancelled Job are not executed, and are marked as cancelled
+        """
+        workflow = Workflow.objects.get(name="TestWorkflowMap")
+
+        job = Job(
+            workflow_id=workflow.id,
+            logfile=os.path.join(self.tmp_log_dir.name, "django_wfe_tmp.log"),
+        )
+        job.save()
+
+        with mock.patch.object(process_job, "send"), mock.patch.object(
+            process_map_chunk, "send"
+        ):
+            job.execute()
+
+            chunk = MapChunk.objects.filter(state=ChunkState.QUEUED).first()
+            Job.objects.filter(id=job.id).update(state=JobState.CANCELLED)
+            chunk.execute()
+
+        chunk.refresh_from_db()
+        self.assertEqual(chunk.state, ChunkState.CANCELLED)
+        self.assertIsNone(chunk.result)
+
+
+@override_settings(WFE_WORKFLOWS="django_wfe.tests.wdf_models")
+class WaitStepTest(TestCase):
+
+    fixtures = [
+        "django_wfe/tests/wdk_fixtures.json",
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        # create the temporary log directory
+        cls.tmp_log_dir = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+
+        # remove temporary log dir
+        cls.tmp_log_dir.cleanup()
+
+    def test_wait_step_execution(self):
+        """
+        Test Job.execute() method on TestWorkflowWait workflow
+        """
+        workflow = Workflow.objects.get(name="TestWorkflowWait")
+
+        job = Job(
+            workflow_id=workflow.id,
+            logfile=os.path.join(self.tmp_log_dir.name, "django_wfe_tmp.log"),
+        )
+        job.save()
+
+        with mock.patch.object(process_job, "send"), mock.patch.object(
+            wake_job, "send_with_options"
+        ) as send_wake:
+            job.execute()
+            job.refresh_from_db()
+
+            self.assertEqual(job.state, JobState.WAITING)
+            self.assertIsNotNone(job.wake_at)
+            self.assertAlmostEqual(
+                send_wake.call_args[1]["delay"], 60 * 1000, delta=1000
+            )
+
+            # resume the Job too early
+            Job.wake(job.id)
+            job.refresh_from_db()
+            job.execute()
+            job.refresh_from_db()
+
+            self.assertEqual(
+                job.state,
+                JobState.WAITING,
+                "Job woken before its wake up time should be suspended again",
+            )
+            self.assertEqual(send_wake.call_count, 2)
+
+            # resume the Job after its wake up time with the watchdog's scan
+            later = timezone.now() + datetime.timedelta(seconds=61)
+            with mock.patch.object(timezone, "now", return_value=later):
+                wake_up_waiting_jobs()
+                job.refresh_from_db()
+                self.assertEqual(job.state, JobState.PENDING)
+
+                job.execute()
+                job.refresh_from_db()
+
+        self.assertEqual(job.state, JobState.FINISHED)
+        self.assertIsNone(job.wake_at)
+        self.assertEqual(
+            job.result,
+            job.storage["data"][1]["result"],
+            "Wait Step should pass its _input to the next Step",
+        )
+
+
+@override_settings(WFE_WORKFLOWS="django_wfe.tests.wdf_models")
+class RateLimitTest(TestCase):
+
+    fixtures = [
+        "django_wfe/tests/wdk_fixtures.json",
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        # create the temporary log directory
+        cls.tmp_log_dir = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+
+        # remove temporary log dir
+        cls.tmp_log_dir.cleanup()
+
+    def _create_job(self, name="TestWorkflowRateLimit"):
+        job = Job(
+            workflow=Workflow.objects.get(name=name),
+            logfile=os.path.join(self.tmp_log_dir.name, "django_wfe_tmp.log"),
+        )
+        job.save()
+
+        return job
+
+    def test_parse_rate(self):
+        self.assertEqual(rate_limits.parse_rate("50/s"), (50, 50))
+        self.assertEqual(rate_limits.parse_rate("120/m"), (2, 120))
+        self.assertEqual(rate_limits.parse_rate(0.5), (0.5, 1))
+
+        for rate in ("50/d", "fast", "0/s"):
+            with self.assertRaises(ValueError):
+                rate_limits.parse_rate(rate)
+
+    def test_local_rate_limiter(self):
+        limiter = rate_limits.LocalRateLimiter()
+
+        waits = [limiter.reserve("service", rate=10, capacity=2) for _ in range(4)]
+
+        self.assertEqual(waits[:2], [0, 0])
+        # the next calls are reserved one after another
+        self.assertAlmostEqual(waits[2], 0.1, delta=0.01)
+        self.assertAlmostEqual(waits[3], 0.2, delta=0.01)
+
+    def test_rate_limited_step(self):
+        """
+        Test Job.execute() method on TestWorkflowRateLimit workflow, which Step's RATE_LIMIT is exceeded
+        """
+        first, second = self._create_job(), self._create_job()
+
+        with mock.patch.object(process_job, "send"), mock.patch.object(
+            wake_job, "send_with_options"
+        ) as send_wake:
+            first.execute()
+            first.refresh_from_db()
+            self.assertEqual(first.state, JobState.FINISHED)
+
+            # the second call is deferred, without blocking the worker
+            second.execute()
+            second.refresh_from_db()
+            self.assertEqual(second.state, JobState.WAITING)
+            self.assertAlmostEqual(
+                send_wake.call_args[1]["delay"], 3600 * 1000, delta=1000
+            )
+
+            bucket = RateLimitBucket.objects.get(
+                key="django_wfe.tests.wdk_models.RateLimitedStep"
+            )
+            self.assertAlmostEqual(bucket.tokens, -1, delta=0.01)
+
+            # the reserved call is executed, once it's due
+            later = timezone.now() + datetime.timedelta(seconds=3601)
+            with mock.patch.object(timezone, "now", return_value=later):
+                wake_up_waiting_jobs()
+                second.refresh_from_db()
+                second.execute()
+                second.refresh_from_db()
+
+            self.assertEqual(second.state, JobState.FINISHED)
+            self.assertIsNone(second.wake_at)
+            self.assertEqual(second.result, 1)
+
+            bucket.refresh_from_db()
+            self.assertAlmostEqual(bucket.tokens, -1, delta=0.01)
+
+    def test_rate_limited_wait_step(self):
+        """
+        Test the rate-limited Wait Step is deferred by its rate limit, and then waits for its own delay
+        """
+        first, second = (
+            self._create_job("TestWorkflowRateLimitWait"),
+            self._create_job("TestWorkflowRateLimitWait"),
+        )
+
+        def resume(job, seconds):
+            later = timezone.now() + datetime.timedelta(seconds=seconds)
+            with mock.patch.object(timezone, "now", return_value=later):
+                wake_up_waiting_jobs()
+                job.refresh_from_db()
+                job.execute()
+                job.refresh_from_db()
+
+        with mock.patch.object(process_job, "send"), mock.patch.object(
+            wake_job, "send_with_options"
+        ):
+            for job in (first, second):
+                job.execute()
+                job.refresh_from_db()
+                self.assertEqual(job.state, JobState.WAITING)
+
+            # the first Job waits for its delay
+            self.assertAlmostEqual(
+                (first.wake_at - timezone.now()).total_seconds(), 60, delta=5
+            )
+            resume(first, 61)
+            self.assertEqual(first.state, JobState.FINISHED)
+
+            # the second Job is deferred by the rate limit, and then waits for its delay
+            self.assertAlmostEqual(
+                (second.wake_at - timezone.now()).total_seconds(), 3600, delta=5
+            )
+            resume(second, 3601)
+            self.assertEqual(second.state, JobState.WAITING)
+            self.assertAlmostEqual(
+                (second.wake_at - timezone.now()).total_seconds(), 3661, delta=5
+            )
+            resume(second, 3662)
+            self.assertEqual(second.state, JobState.FINISHED)
+            self.assertIsNone(second.wake_at)
+
+        # the calls are reserved only once
+        bucket = RateLimitBucket.objects.get(
+            key="django_wfe.tests.wdk_models.RateLimitedWaitStep"
+        )
+        self.assertAlmostEqual(bucket.tokens, -1, delta=0.01)
+
+    def test_rate_limited_map_step(self):
+        """
+        Test the chunk of the MapStep, which STEP's RATE_LIMIT is exceeded, is deferred until its reserved call is due
+        """
+        job = self._create_job("TestWorkflowMapRateLimit")
+
+        with mock.patch.object(process_job, "send"), mock.patch.object(
+            process_map_chunk, "send"
+        ), mock.patch.object(process_map_chunk, "send_with_options") as send_chunk:
+            job.execute()
+
+            chunk = MapChunk.objects.get(job=job, index=0)
+            chunk.execute()
+            chunk.refresh_from_db()
+
+            # the first item takes the only token, the second one is deferred
+            self.assertEqual(chunk.state, ChunkState.QUEUED)
+            self.assertEqual(chunk.result, [1])
+            self.assertAlmostEqual(
+                send_chunk.call_args[1]["delay"], 3600 * 1000, delta=1000
+            )
+
+            later = timezone.now() + datetime.timedelta(seconds=3601)
+            with mock.patch.object(timezone, "now", return_value=later):
+                chunk.execute()
+            chunk.refresh_from_db()
+
+        self.assertEqual(chunk.state, ChunkState.FINISHED)
+        self.assertEqual(chunk.result, [1, 2])
+        self.assertIsNone(chunk.wake_at)
+
+        # the calls are reserved only once
+        bucket = RateLimitBucket.objects.get(
+            key="django_wfe.tests.wdk_models.RateLimitedIncrementStep"
+        )
+        self.assertAlmostEqual(bucket.tokens, -1, delta=0.01)
+
+    def test_rate_limited_input_step(self):
+        """
+        Test the rate-limited Step requiring an external input is executed with its input, once it's deferred
+        """
+        first, second = (
+            self._create_job("TestWorkflowRateLimitInput"),
+            self._create_job("TestWorkflowRateLimitInput"),
+        )
+
+        with mock.patch.object(process_job, "send"), mock.patch.object(
+            wake_job, "send_with_options"
+        ):
+            for job in (first, second):
+                job.execute()
+                job.refresh_from_db()
+                job.provide_external_input({"external_int": 1})
+                job.execute()
+                job.refresh_from_db()
+
+            self.assertEqual(first.state, JobState.FINISHED)
+            self.assertEqual(second.state, JobState.WAITING)
+
+            later = timezone.now() + datetime.timedelta(seconds=3601)
+            with mock.patch.object(timezone, "now", return_value=later):
+                wake_up_waiting_jobs()
+                second.refresh_from_db()
+                second.execute()
+                second.refresh_from_db()
+
+        self.assertEqual(second.state, JobState.FINISHED)
+        self.assertEqual(second.result, 1)
+
+
+@override_settings(WFE_WORKFLOWS="django_wfe.tests.wdf_models")
+class AsyncStepTest(TransactionTestCase):
+
+    fixtures = [
+        "django_wfe/tests/wdk_fixtures.json",
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        # create the temporary log directory
+        cls.tmp_log_dir = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+
+        # remove temporary log dir
+        cls.tmp_log_dir.cleanup()
+
+    def test_execute_async_step(self):
+        """
+        Test Job.execute() method on TestWorkflowAsync workflow
+        """
+        workflow = Workflow.objects.get(name="TestWorkflowAsync")
+
+        job = Job(
+            workflow_id=workflow.id,
+            logfile=os.path.join(self.tmp_log_dir.name, "django_wfe_tmp.log"),
+        )
+        job.save()
+
+        job.execute()
+        job.refresh_from_db()
+
+        self.assertEqual(job.state, JobState.FINISHED)
+        self.assertEqual(job.result, 2)
+
+    def test_aexecute_async_step(self):
+        """
+        Test Job.aexecute() coroutine on TestWorkflowAsync workflow
+        """
+        workflow = Workflow.objects.get(name="TestWorkflowAsync")
+
+        job = Job(
+            workflow_id=workflow.id,
+            logfile=os.path.join(self.tmp_log_dir.name, "django_wfe_tmp.log"),
+        )
+        job.save()
+        job = Job.objects.select_related("workflow").get(id=job.id)
+
+        async_to_sync(job.aexecute)()
+        job.refresh_from_db()
+
+        self.assertEqual(job.state, JobState.FINISHED)
+        self.assertEqual(job.current_step_number, 2)
+        self.assertEqual(job.result, 2)
+
+    def test_aexecute_profiled(self):
+        """
+        Test only the synchronous Steps of the profiled Job are profiled by Job.aexecute() coroutine
+        """
+        workflow = Workflow.objects.get(name="TestWorkflowAsync")
+
+        job = Job(
+            workflow_id=workflow.id,
+            logfile=os.path.join(self.tmp_log_dir.name, "django_wfe_profiled.log"),
+            profile=True,
+        )
+        job.save()
+        job = Job.objects.select_related("workflow").get(id=job.id)
+
+        async_to_sync(job.aexecute)()
+        job.refresh_from_db()
+        self.assertEqual(job.state, JobState.FINISHED)
+
+        stats = pstats.Stats(job.profile_file)
+        self.assertEqual(
+            [
+                function
+                for filename, _, function in stats.stats
+                if filename.endswith("wdk_models.py")
+            ],
+            ["execute"],
+        )
+        with job.open_log() as log:
+            self.assertIn(
+                "'AsyncIncrementStep': async Step executed on the event loop is not profiled",
+                log.read().decode(),
+            )
+
+    def test_async_worker(self):
+        """
+        Test process_job actor in the asyncio worker mode executes the Job on the event loop, without waiting for it
+        """
+        workflow = Workflow.objects.get(name="TestWorkflowAsync")
+
+        job = Job(
+            workflow_id=workflow.id,
+            logfile=os.path.join(self.tmp_log_dir.name, "django_wfe_tmp.log"),
+        )
+        job.save()
+
+        futures, waited = [], []
+        returned = threading.Event()
+        aexecute = Job.aexecute
+
+        async def delayed_aexecute(self):
+            # the Job is executed once the worker thread has returned
+            waited.append(
+                await asyncio.get_running_loop().run_in_executor(None, returned.wait, 1)
+            )
+            await aexecute(self)
+
+        def submit(coroutine):
+            futures.append(aio.get_event_loop_thread().submit(coroutine))
+            return futures[-1]
+
+        with mock.patch("django_wfe.tasks.WFE_ASYNC_WORKER", True), mock.patch.object(
+            aio, "submit", side_effect=submit
+        ), mock.patch.object(Job, "aexecute", delayed_aexecute):
+            process_job(job_id=job.id)
+            returned.set()
+            futures[0].result(timeout=5)
+
+        self.assertEqual(waited, [True], "Worker thread waited for the Job")
+        job.refresh_from_db()
+        self.assertEqual(job.state, JobState.FINISHED)
+        self.assertEqual(job.result, 2)
+
+
+@override_settings(WFE_WORKFLOWS="django_wfe.tests.wdf_models")
+class ProcessExecutorTest(TestCase):
+
+    fixtures = [
+        "django_wfe/tests/wdk_fixtures.json",
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        # create the temporary log directory
+        cls.tmp_log_dir = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+
+        # remove temporary log dir
+        cls.tmp_log_dir.cleanup()
+
+    def _execute(self, numbers):
+        workflow = Workflow.objects.get(name="TestWorkflowProcess")
+
+        job = Job(
+            workflow_id=workflow.id,
+            storage={"data": [], "input": numbers},
+            logfile=os.path.join(self.tmp_log_dir.name, "django_wfe_tmp.log"),
+        )
+        job.save()
+
+        job.execute()
+        job.refresh_from_db()
+
+        return job
+
+    def test_process_executor(self):
+        """
+        Test Job.execute() method on TestWorkflowProcess workflow
+        """
+        job = self._execute(list(range(100)))
+
+        self.assertEqual(job.state, JobState.FINISHED)
+        self.assertEqual(job.result, sum(range(100)))
+
+        with job.open_log() as log:
+            self.assertIn(
+                "Summing 100 numbers",
+                log.read().decode(),
+                "Output of the Step executed in the process pool wasn't logged",
+            )
+
+    def test_process_executor_profiled(self):
+        """
+        Test the Step executed in the process pool is profiled in the pool's process
+        """
+        workflow = Workflow.objects.get(name="TestWorkflowProcess")
+
+        job = Job(
+            workflow_id=workflow.id,
+            storage={"data": [], "input": list(range(10))},
+            logfile=os.path.join(self.tmp_log_dir.name, "django_wfe_profiled.log"),
+            profile=True,
+        )
+        job.save()
+        job.execute()
+
+        stats = pstats.Stats(job.profile_file)
+        self.assertIn(
+            "execute",
+            [
+                function
+                for filename, _, function in stats.stats
+                if filename.endswith("wdk_models.py")
+            ],
+        )
+
+    def test_process_executor_large_payload(self):
+        """
+        Test passing payloads exceeding WFE_PROCESS_INLINE_LIMIT to the process pool with temporary files
+        """
+        with mock.patch.object(process_pool, "WFE_PROCESS_INLINE_LIMIT", 0):
+            job = self._execute(list(range(100000)))
+
+        self.assertEqual(job.state, JobState.FINISHED)
+        self.assertEqual(job.result, sum(range(100000)))
+
+
+class WarmUpTest(TestCase):
+    def test_warm_up(self):
+        """
+        Test warm_up() prepares the Workflows of WFE_WORKFLOWS along with their sub-workflows and MapSteps' Steps
+        """
+        with mock.patch.object(warmup, "WFE_WORKFLOWS", "django_wfe.tests.wdk_models"):
+            stats = warmup.warm_up()
+
+        workflows = warmup.get_workflows("django_wfe.tests.wdk_models")
+        self.assertEqual(
+            stats["workflows"], len([cls for cls in workflows if cls.DIGRAPH])
+        )
+        self.assertGreater(stats["steps"], len(workflows))
+
+    def test_warm_up_middleware(self):
+        """
+        Test WarmUpMiddleware warms up the worker process on its boot
+        """
+        with mock.patch.object(warmup, "warm_up") as warm_up:
+            WarmUpMiddleware().before_worker_boot(broker=None, worker=None)
+
+        warm_up.assert_called_once_with()
@@ -0,0 +1,225 @@
+import os
+import uuid
+import pickle
+import decimal
+import datetime
+import tempfile
+import unittest
+import threading
+from unittest import mock
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from django_wfe.models import Workflow, Job, JobState
+from django_wfe import storage_codecs
+from django_wfe.storage_codecs import BaseStorageCodec, get_codec
+from django_wfe.tasks import process_job
+from django_wfe.views import JobViewSet
+
+
+class PickleCodec(BaseStorageCodec):
+    binary = True
+
+    def encode(self, obj) -> bytes:
+        return pickle.dumps(obj)
+
+    def decode(self, data: bytes):
+        return pickle.loads(data)
+
+
+class StorageCodecsTest(unittest.TestCase):
+
+    value = {
+        "datetime": datetime.datetime(2020, 5, 21, 8, 54),
+        "date": datetime.date(2020, 5, 21),
+        "decimal": decimal.Decimal("0.25"),
+        "uuid": uuid.UUID(int=1),
+        "set": {1},
+    }
+
+    expected = {
+        "datetime": "2020-05-21T08:54:00",
+        "date": "2020-05-21",
+        "decimal": "0.25",
+        "uuid": str(uuid.UUID(int=1)),
+        "set": [1],
+    }
+
+    def _test_codec(self, name):
+        try:
+            codec = get_codec(name)
+        except ImportError:
+            self.skipTest(f"{name} codec dependencies are not installed")
+
+        self.assertEqual(codec.decode(codec.encode(self.value)), self.expected)
+
+    def test_json_codec(self):
+        self._test_codec("json")
+
+    def test_orjson_codec(self):
+        self._test_codec("orjson")
+
+    def test_msgpack_codec(self):
+        self._test_codec("msgpack")
+
+    def test_msgpack_zstd_codec(self):
+        self._test_codec("msgpack+zstd")
+
+    def test_msgpack_zstd_codec_threads(self):
+        """
+        Test every thread uses its own zstandard compressor, as they are not thread-safe
+        """
+        try:
+            codec = get_codec("msgpack+zstd")
+        except ImportError:
+            self.skipTest("msgpack+zstd codec dependencies are not installed")
+
+        compressors = []
+        threads = [
+            threading.Thread(target=lambda: compressors.append(codec.compressor))
+            for _ in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertIsNot(compressors[0], compressors[1])
+        self.assertIs(codec.compressor, codec.compressor)
+
+    def test_unregistered_codec(self):
+        """
+        Test codecs, which are neither built-in nor registered, are not imported
+        """
+        with mock.patch.object(storage_codecs, "import_string") as import_string:
+            with self.assertRaises(ValueError):
+                get_codec("django_wfe.tests.test_storage_codecs.PickleCodec")
+
+        import_string.assert_not_called()
+
+    def test_numpy_values(self):
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest("numpy is not installed")
+
+        codec = get_codec("json")
+        value = {"scalar": numpy.float64(0.5), "array": numpy.arange(3)}
+
+        self.assertEqual(
+            codec.decode(codec.encode(value)), {"scalar": 0.5, "array": [0, 1, 2]}
+        )
+
+
+@override_settings(WFE_WORKFLOWS="django_wfe.tests.wdf_models")
+class JobStorageCodecTest(TestCase):
+
+    fixtures = [
+        "django_wfe/tests/wdk_fixtures.json",
+    ]
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+
+        # create the temporary log directory
+        cls.tmp_log_dir = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+
+        # remove temporary log dir
+        cls.tmp_log_dir.cleanup()
+
+    @mock.patch.dict(
+        storage_codecs.WFE_STORAGE_CODECS,
+        {"pickle": "django_wfe.tests.test_storage_codecs.PickleCodec"},
+    )
+    def test_binary_codec_storage(self):
+        """
+        Test keeping Job's storage in the binary column with a registered custom codec
+        """
+        workflow = Workflow.objects.get(name="TestWorkflowSuccess")
+        storage = {"data": [{"step": "__start__", "result": {1, 2}}]}
+
+        job = Job(
+            workflow_id=workflow.id,
+            storage=storage,
+            storage_codec="pickle",
+            logfile=os.path.join(self.tmp_log_dir.name, "django_wfe_tmp.log"),
+        )
+        job.save()
+
+        job = Job.objects.get(id=job.id)
+
+        self.assertIsNotNone(job.storage_blob)
+        self.assertEqual(
+            job.storage, storage, "Storage wasn't decoded from the binary column"
+        )
+
+    def test_default_codec(self):
+        """
+        Test Job's storage codec defaults to WFE_STORAGE_CODEC
+        """
+        workflow = Workflow.objects.get(name="TestWorkflowSuccess")
+
+        job = Job(
+            workflow_id=workflow.id,
+            storage={"data": [{"step": "__start__", "result": decimal.Decimal("1")}]},
+            logfile=os.path.join(self.tmp_log_dir.name, "django_wfe_tmp.log"),
+        )
+        job.save()
+        job.refresh_from_db()
+
+        self.assertEqual(job.storage_codec, "json")
+        self.assertIsNone(job.storage_blob)
+        self.assertEqual(job.storage["data"][0]["result"], "1")
+
+    def test_execute_typed_result_workflow(self):
+        """
+        Test Job.execute() storing results with datetimes, Decimals and sets with every built-in codec
+        """
+        workflow = Workflow.objects.get(name="TestWorkflowTypedResult")
+        expected = {"at": "2020-05-21T08:54:00", "amount": "0.25", "tags": ["tile"]}
+
+        for codec in (None, "json", "orjson", "msgpack", "msgpack+zstd"):
+            with self.subTest(codec=codec):
+                try:
+                    get_codec(codec)
+                except ImportError:
+                    continue
+
+                job = Job(
+                    workflow_id=workflow.id,
+                    storage_codec=codec,
+                    logfile=os.path.join(self.tmp_log_dir.name, "django_wfe_tmp.log"),
+                )
+                job.save()
+
+                job.execute()
+                job = Job.objects.get(id=job.id)
+
+                self.assertEqual(job.state, JobState.FINISHED)
+                self.assertEqual(job.result, [expected])
+
+    @mock.patch.object(process_job, "send")
+    def test_create_api_codec(self, send):
+        """
+        Test the codec of the Job created with the REST API cannot be selected by the client
+        """
+        workflow = Workflow.objects.get(name="TestWorkflowSuccess")
+        request = APIRequestFactory().post(
+            "/jobs/",
+            {
+                "workflow_id": workflow.id,
+                "storage_codec": "django_wfe.tests.test_storage_codecs.PickleCodec",
+            },
+            format="json",
+        )
+        force_authenticate(request, user=User(username="test"))
+        response = JobViewSet.as_view({"post": "create"})(request)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Job.objects.get(id=response.data["id"]).storage_codec, "json")
@@ -1,3 +1,6 @@
+import asyncio
+import decimal
+import datetime
 from random import randint
 from django_wfe import steps, workflows
 from pydantic import BaseModel
@@ -42,6 +45,137 @@ class ErrorStep(steps.Step):
         raise Exception("Some exception")
 
 
+class IncrementStep(steps.Step):
+    def execute(self, _input=None, external_input=None, *args, **kwargs):
+        return (_input or 0) + 1
+
+
+class KeptIncrementStep(IncrementStep):
+    RETENTION = "keep"
+
+
+class LastIncrementStep(IncrementStep):
+    pass
+
+
+class IncrementSubWorkflow(steps.SubWorkflow):
+    WORKFLOW = "django_wfe.tests.wdk_models.TestWorkflowIncrement"
+
+
+class CountSubWorkflow(steps.SubWorkflow):
+    WORKFLOW = "django_wfe.tests.wdk_models.TestWorkflowCount"
+
+
+class RangeStep(steps.Step):
+    def execute(self, _input=None, external_input=None, *args, **kwargs):
+        return list(range(5))
+
+
+class IncrementMapStep(steps.MapStep):
+    STEP = IncrementStep
+    CHUNK_SIZE = 2
+    CONCURRENCY = 2
+
+
+class WaitStep(steps.Wait):
+    DELAY = 60
+
+
+class AsyncIncrementStep(steps.Step):
+    async def execute(self, _input=None, external_input=None, *args, **kwargs):
+        await asyncio.sleep(0)
+        return (_input or 0) + 1
+
+
+class ProcessSumStep(steps.Step):
+    executor = "process"
+
+    def execute(self, _input=None, external_input=None, *args, **kwargs):
+        print(f"Summing {len(_input)} numbers")
+        return sum(_input)
+
+
+class LargeResultStep(steps.Step):
+    def execute(self, _input=None, external_input=None, *args, **kwargs):
+        return [{"tile": i, "value": i * 2} for i in range(1000)]
+
+
+class TypedResultStep(steps.Step):
+    def execute(self, _input=None, external_input=None, *args, **kwargs):
+        return [
+            {
+                "at": datetime.datetime(2020, 5, 21, 8, 54),
+                "amount": decimal.Decimal("0.25"),
+                "tags": {"tile"},
+            }
+            for _ in range(_input or 1)
+        ]
+
+
+class PassThroughStep(steps.Step):
+    def execute(self, _input=None, external_input=None, *args, **kwargs):
+        return _input
+
+
+class CountStep(steps.Step):
+    def execute(self, _input=None, external_input=None, *args, **kwargs):
+        return len(_input)
+
+
+class ContextWriteStep(steps.Step):
+    def execute(self, _input=None, external_input=None, *args, **kwargs):
+        self.context["multiplier"] = 3
+        return 2
+
+
+class ContextReadStep(steps.Step):
+    def execute(self, _input=None, external_input=None, *args, **kwargs):
+        return _input * self.context["multiplier"]
+
+
+class CancellingStep(steps.Step):
+    def execute(self, _input=None, external_input=None, *args, **kwargs):
+        from django_wfe.models import Job
+
+        # simulate the cancellation ordered by another process during the execution
+        Job.cancel(Job.objects.filter(id=self.job.id))
+        return _input
+
+
+class ProgressStep(steps.Step):
+    def execute(self, _input=None, external_input=None, *args, **kwargs):
+        total = 1000
+        for item in range(1, total + 1):
+            self.report_progress(item / total, f"item {item}")
+
+        return total
+
+
+class RateLimitedStep(steps.Step):
+    RATE_LIMIT = "1/h"
+
+    def execute(self, _input=None, external_input=None, *args, **kwargs):
+        return 1
+
+
+class RateLimitedInputStep(ExternalInputStep):
+    RATE_LIMIT = "1/h"
+
+
+class RateLimitedWaitStep(steps.Wait):
+    DELAY = 60
+    RATE_LIMIT = "1/h"
+
+
+class RateLimitedIncrementStep(IncrementStep):
+    RATE_LIMIT = "1/h"
+
+
+class RateLimitedMapStep(steps.MapStep):
+    STEP = RateLimitedIncrementStep
+    CHUNK_SIZE = 2
+
+
 class Decision(steps.Decision):
     def transition(self, _input=None, *args, **kwargs):
         return _input
@@ -89,3 +223,172 @@ class TestWorkflowEmpty(workflows.Workflow):
     DIGRAPH = {
         steps.__start__: [],
     }
+
+
+class TestWorkflowIncrement(workflows.Workflow):
+
+    DIGRAPH = {
+        steps.__start__: [IncrementStep],
+    }
+
+
+class TestWorkflowSubWorkflow(workflows.Workflow):
+
+    DIGRAPH = {
+        steps.__start__: [IncrementStep],
+        IncrementStep: [IncrementSubWorkflow],
+    }
+
+
+class TestWorkflowProcess(workflows.Workflow):
+
+    DIGRAPH = {
+        steps.__start__: [ProcessSumStep],
+    }
+
+
+class TestWorkflowLargeResult(workflows.Workflow):
+
+    DIGRAPH = {
+        steps.__start__: [LargeResultStep],
+        LargeResultStep: [PassThroughStep],
+        PassThroughStep: [CountStep],
+    }
+
+
+class TestWorkflowTypedResult(workflows.Workflow):
+
+    DIGRAPH = {
+        steps.__start__: [TypedResultStep],
+        TypedResultStep: [PassThroughStep],
+    }
+
+
+class TestWorkflowCount(workflows.Workflow):
+
+    DIGRAPH = {
+        steps.__start__: [CountStep],
+    }
+
+
+class TestWorkflowLargeResultSubWorkflow(workflows.Workflow):
+
+    DIGRAPH = {
+        steps.__start__: [LargeResultStep],
+        LargeResultStep: [CountSubWorkflow],
+    }
+
+
+class TestWorkflowMap(workflows.Workflow):
+
+    DIGRAPH = {
+        steps.__start__: [RangeStep],
+        RangeStep: [IncrementMapStep],
+    }
+
+
+class TestWorkflowWait(workflows.Workflow):
+
+    DIGRAPH = {
+        steps.__start__: [RandomIntStep],
+        RandomIntStep: [WaitStep],
+    }
+
+
+class TestWorkflowAsync(workflows.Workflow):
+
+    DIGRAPH = {
+        steps.__start__: [IncrementStep],
+        IncrementStep: [AsyncIncrementStep],
+    }
+
+
+class TestWorkflowContext(workflows.Workflow):
+
+    DIGRAPH = {
+        steps.__start__: [ContextWriteStep],
+        ContextWriteStep: [ContextReadStep],
+    }
+
+
+class TestWorkflowRetention(workflows.Workflow):
+
+    RETENTION = "drop_after_consumed"
+
+    DIGRAPH = {
+        steps.__start__: [IncrementStep],
+        IncrementStep: [KeptIncrementStep],
+        KeptIncrementStep: [LastIncrementStep],
+    }
+
+
+class TestWorkflowCancel(workflows.Workflow):
+
+    DIGRAPH = {
+        steps.__start__: [IncrementStep],
+        IncrementStep: [CancellingStep],
+        CancellingStep: [LastIncrementStep],
+    }
+
+
+class TestWorkflowProgress(workflows.Workflow):
+
+    DIGRAPH = {
+        steps.__start__: [ProgressStep],
+    }
+
+
+class TestWorkflowLimited(workflows.Workflow):
+
+    MAX_CONCURRENT_JOBS = 2
+
+    DIGRAPH = {
+        steps.__start__: [IncrementStep],
+    }
+
+
+class TestWorkflowLimitedInput(workflows.Workflow):
+
+    MAX_CONCURRENT_JOBS = 1
+
+    DIGRAPH = {
+        steps.__start__: [ExternalInputStep],
+    }
+
+
+class TestWorkflowWeighted(workflows.Workflow):
+
+    WEIGHT = 2
+
+    DIGRAPH = {
+        steps.__start__: [IncrementStep],
+    }
+
+
+class TestWorkflowRateLimit(workflows.Workflow):
+
+    DIGRAPH = {
+        steps.__start__: [RateLimitedStep],
+    }
+
+
+class TestWorkflowRateLimitInput(workflows.Workflow):
+
+    DIGRAPH = {
+        steps.__start__: [RateLimitedInputStep],
+    }
+
+
+class TestWorkflowMapRateLimit(workflows.Workflow):
+
+    DIGRAPH = {
+        steps.__start__: [RangeStep],
+        RangeStep: [RateLimitedMapStep],
+    }
+
+
+class TestWorkflowRateLimitWait(workflows.Workflow):
+
+    DIGRAPH = {
+        steps.__start__: [RateLimitedWaitStep],
+    }
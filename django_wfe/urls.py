@@ -7,8 +7,20 @@ app_name = "django_wfe"
 router = routers.DefaultRouter()
 router.register(r"workflows", views.WorkflowViewSet)
 router.register(r"jobs", views.JobViewSet)
+router.register(r"events", views.JobEventViewSet)
 
 urlpatterns = [
+    # declared before the router's URLs, not to be matched as a Job's ID
+    path(
+        "jobs/notifications",
+        views.JobNotificationsView.as_view(),
+        name="job_notifications",
+    ),
     path("", include(router.urls)),
     path("jobs/<int:job_id>/logs", views.JobLogsView.as_view(), name="job_logs"),
+    path(
+        "jobs/<int:job_id>/profile",
+        views.JobProfileView.as_view(),
+        name="job_profile",
+    ),
 ]
@@ -1,59 +1,81 @@
 import atexit
 import importlib
-from collections.abc import Iterable
+import traceback
 
 from django.db.models import ObjectDoesNotExist
+from django.utils import timezone
 from django.db.utils import ProgrammingError
 from apscheduler.schedulers.background import BlockingScheduler
 
+from . import scheduling
+from .election import LeaderElection
 from .settings import WFE_WORKFLOWS, WFE_WATCHDOG_INTERVAL
-from .models import Job, Workflow, Watchdog
+from .models import Job, JobState, MapChunk, Workflow, Watchdog
+from .warmup import get_workflows_modules
 from .workflows import WorkflowType
 
 
 def set_watchdog_on_wdk_models():
     """
-    Method updating database with user defined Workflows.
+    Method running the watchdog process. Every node may run it: every WFE_WATCHDOG_INTERVAL seconds the process
+    attempts to become the leader (see django_wfe.election), and only the leader performs the watchdog's work.
 
     :return: None
     """
 
+    if WFE_WATCHDOG_INTERVAL <= 0:
+        print(
+            f"Watchdog turned of by WFE_WATCHDOG_INTERVAL equal: {WFE_WATCHDOG_INTERVAL}"
+        )
+        return
+
     try:
-        watchdog = Watchdog.load()
+        Watchdog.load()
     except ProgrammingError:
         # raised in case of not existing models in db (e.g. on the python manage.py migrate)
         print("Watchdog singleton cannot be fetched from db.")
         return
 
-    if not watchdog.running and WFE_WATCHDOG_INTERVAL > 0:
-        # order deregister_watchdog() executions as exit function.
-        atexit.register(deregister_watchdog)
-
-        # mark watchdog as running
-        watchdog.running = True
-        watchdog.save()
-        # schedule periodic watchdog's execution
-        scheduler = BlockingScheduler(daemon=True)
-        scheduler.add_job(update_wdk_models, "interval", seconds=WFE_WATCHDOG_INTERVAL)
-        scheduler.start()
-    elif WFE_WATCHDOG_INTERVAL <= 0:
-        print(
-            f"Watchdog turned of by WFE_WATCHDOG_INTERVAL equal: {WFE_WATCHDOG_INTERVAL}"
-        )
-    elif watchdog.running:
-        print(f"Watchdog process already running.")
+    election = LeaderElection()
+    # order the leadership's release as exit function (killed process' leadership is taken over anyway)
+    atexit.register(election.resign)
+
+    # schedule periodic watchdog's execution, starting right away
+    scheduler = BlockingScheduler(daemon=True)
+    scheduler.add_job(
+        run_watchdog,
+        "interval",
+        args=[election],
+        seconds=WFE_WATCHDOG_INTERVAL,
+        next_run_time=timezone.now(),
+    )
+    scheduler.start()
 
 
-def deregister_watchdog():
+def run_watchdog(election: LeaderElection):
     """
-    A function setting Watchdog running flag False.
-    Should be executed on the main process exit.
+    A function performing the watchdog's work, if the process is the elected leader
 
+    :param election: LeaderElection instance of the process
     :return: None
     """
-    w = Watchdog.load()
-    w.running = False
-    w.save()
+
+    if not election.elect():
+        return
+
+    for task in (
+        update_wdk_models,
+        wake_up_waiting_jobs,
+        cancel_overdue_jobs,
+        admit_queued_jobs,
+        requeue_expired_jobs,
+    ):
+        try:
+            task()
+        except Exception:
+            # failure of a task does not prevent the others
+            print(f"Watchdog's {task.__name__} failed:")
+            traceback.print_exc()
 
 
 def update_wdk_models():
@@ -68,13 +90,8 @@ def update_wdk_models():
         print(f"WARNING: Module's path for django-wfe Workflows is None.")
         return
 
-    if not isinstance(WFE_WORKFLOWS, str) and isinstance(WFE_WORKFLOWS, Iterable):
-        wfe_workflow_files = WFE_WORKFLOWS
-    else:
-        wfe_workflow_files = [WFE_WORKFLOWS]
-
     # insert missing workflows to the database
-    for wfe_workflow_file in wfe_workflow_files:
+    for wfe_workflow_file in get_workflows_modules():
 
         # import the module
         model_definitions_module = importlib.import_module(wfe_workflow_file)
@@ -117,3 +134,60 @@ def update_wdk_models():
             if workflow.deleted:
                 workflow.deleted = False
                 workflow.save()
+
+
+def wake_up_waiting_jobs():
+    """
+    A function resuming suspended Jobs, which wake up time has passed
+    (a fallback for lost or undelivered delayed wake_job messages).
+
+    :return: None
+    """
+
+    job_ids = Job.objects.filter(
+        state=JobState.WAITING, wake_at__lte=timezone.now()
+    ).values_list("id", flat=True)
+
+    for job_id in job_ids:
+        Job.wake(job_id)
+
+
+def cancel_overdue_jobs():
+    """
+    A function cancelling the Jobs, which deadline has passed while they were not executed
+    (e.g. waiting for the user's input or for a sub-workflow).
+
+    :return: None
+    """
+
+    Job.cancel(
+        Job.objects.filter(deadline__lte=timezone.now()).exclude(
+            state__in=JobState.TERMINAL
+        )
+    )
+
+
+def admit_queued_jobs():
+    """
+    A function admitting the queued Jobs, if there are free slots
+    (a fallback for the slots released without admitting the next Jobs, e.g. after changing the limits).
+
+    :return: None
+    """
+
+    scheduling.release()
+
+
+def requeue_expired_jobs():
+    """
+    A function re-queueing the ONGOING Jobs and MapStep's chunks, which lease has expired
+    (a fallback for the Jobs and chunks of the crashed workers, which messages were not redelivered).
+
+    :return: None
+    """
+
+    for job_id in Job.requeue_expired():
+        print(f"Job {job_id} re-queued after its lease has expired.")
+
+    for chunk_id in MapChunk.requeue_expired():
+        print(f"Map chunk {chunk_id} re-queued after its lease has expired.")
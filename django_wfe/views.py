@@ -1,11 +1,46 @@
-from django.http import FileResponse
+import os
+import json
+
+from django.db.models import Avg, Count, Max
+from django.db.models.functions import TruncDay
+from django.http import FileResponse, StreamingHttpResponse
 from django.core.exceptions import ObjectDoesNotExist
-from rest_framework import views, viewsets, mixins, permissions
+from django.utils.cache import patch_vary_headers
+from django.utils.dateparse import parse_datetime
+from rest_framework import views, viewsets, mixins, pagination, permissions
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 
-from .models import Job, Workflow
-from .serializers import JobSerializer, WorkflowSerializer
-from .tasks import process_job
+from . import notifications
+from .app_utils import provide_inputs
+from .models import Job, JobEvent, JobState, MapChunk, Workflow
+from .serializers import JobEventSerializer, JobSerializer, WorkflowSerializer
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Function checking if the Accept-Encoding header accepts the gzip coding, with a non-zero q-value
+    (explicitly, or with the "*" wildcard if gzip is not listed)
+
+    :param accept_encoding: value of the Accept-Encoding header
+    :return: True if the gzip coding is accepted
+    """
+    qvalues = {}
+    for coding in accept_encoding.split(","):
+        name, *params = [part.strip() for part in coding.split(";")]
+        qvalue = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    qvalue = float(value)
+                except ValueError:
+                    qvalue = 0.0
+        if name:
+            qvalues[name.lower()] = qvalue
+
+    return qvalues.get("gzip", qvalues.get("x-gzip", qvalues.get("*", 0.0))) > 0
 
 
 class WorkflowViewSet(viewsets.ReadOnlyModelViewSet):
@@ -24,10 +59,260 @@ class JobViewSet(
     serializer_class = JobSerializer
     permission_classes = [permissions.IsAuthenticated]
 
-    def perform_create(self, serializer):
-        job = serializer.save()
-        # send Job's execution to Dramatiq on Job's creation
-        process_job.send(job_id=job.id)
+    def get_queryset(self):
+        # MapSteps' progress is counted in the same query, instead of a query per listed Job
+        return MapChunk.annotate_progress(super().get_queryset())
+
+    def create(self, request, *args, **kwargs):
+        """
+        Creates a Job (or a list of Jobs). Jobs with an already used idempotency_key are not created again,
+        the existing Jobs are returned instead.
+        """
+        many = isinstance(request.data, list)
+
+        serializer = self.get_serializer(data=request.data, many=many)
+        serializer.is_valid(raise_exception=True)
+
+        jobs = Job.create_idempotent(
+            [
+                Job(**data)
+                for data in (
+                    serializer.validated_data if many else [serializer.validated_data]
+                )
+            ]
+        )
+        for job, created in jobs:
+            if created:
+                # send Job's execution to Dramatiq on Job's creation (unless it's queued by the concurrency limits)
+                job.submit()
+
+        data = self.get_serializer([job for job, _ in jobs], many=True).data
+        status = 201 if any(created for _, created in jobs) else 200
+
+        return Response(data if many else data[0], status=status)
+
+    @action(detail=True, methods=["post"])
+    def cancel(self, request, pk=None):
+        job = self.get_object()
+        Job.cancel(Job.objects.filter(id=job.id))
+
+        job = self.get_object()
+        return Response(self.get_serializer(job).data)
+
+    @action(detail=False, methods=["post"], url_path="cancel")
+    def cancel_workflow(self, request):
+        """
+        Cancels all not ended Jobs of the Workflow provided with the workflow_id
+        """
+        try:
+            workflow_id = int(request.data.get("workflow_id"))
+        except (TypeError, ValueError):
+            raise ValidationError({"workflow_id": "Workflow ID is required."})
+
+        cancelled = Job.cancel(self.get_queryset().filter(workflow_id=workflow_id))
+
+        return Response({"cancelled": cancelled})
+
+    @action(detail=False, methods=["post"])
+    def inputs(self, request):
+        """
+        Provides external inputs of multiple Jobs at once ({job_id: input}) and resumes their execution.
+        Jobs, which could not receive their input, are returned with the errors, without failing the others.
+        """
+        if not isinstance(request.data, dict) or not all(
+            str(job_id).isdigit() for job_id in request.data
+        ):
+            raise ValidationError("Object mapping Job IDs to their inputs is required.")
+
+        errors = provide_inputs(request.data)
+
+        return Response(
+            {
+                "resumed": sorted(
+                    int(job_id) for job_id in request.data if int(job_id) not in errors
+                ),
+                "errors": errors,
+            }
+        )
+
+
+class JobEventPagination(pagination.CursorPagination):
+    """
+    Cursor pagination of the events, from the newest ones (stable while new events are saved)
+    """
+
+    ordering = ("-timestamp", "-id")
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+
+class JobEventViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Structured events of the Jobs' executions.
+
+    Events can be filtered with job, workflow, step, step_number, event, error, since and until
+    (ISO 8601 timestamps) query parameters, and aggregated with the stats action, grouping them by
+    the comma separated fields of the group_by query parameter. Listed events are paginated with a cursor.
+    """
+
+    queryset = JobEvent.objects.all()
+    serializer_class = JobEventSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = JobEventPagination
+
+    FILTERS = {
+        "job": "job_id",
+        "workflow": "workflow_id",
+        "step": "step",
+        "step_number": "step_number",
+        "event": "event",
+        "error": "error",
+        "since": "timestamp__gte",
+        "until": "timestamp__lt",
+    }
+    # fields, by which the events can be grouped (or the expressions calculating them)
+    # filters of the integer fields
+    INTEGER_FILTERS = ("job", "workflow", "step_number")
+    GROUPS = {
+        "workflow": "workflow",
+        "step": "step",
+        "event": "event",
+        "error": "error",
+        "day": TruncDay("timestamp"),
+    }
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        filters = {}
+        for param, lookup in self.FILTERS.items():
+            value = self.request.query_params.get(param)
+            if value is None:
+                continue
+
+            if param in ("since", "until"):
+                try:
+                    value = parse_datetime(value)
+                except ValueError:
+                    value = None
+                if value is None:
+                    raise ValidationError({param: "Invalid ISO 8601 timestamp."})
+            elif param in self.INTEGER_FILTERS:
+                try:
+                    value = int(value)
+                except ValueError:
+                    raise ValidationError({param: "Integer expected."})
+
+            filters[lookup] = value
+
+        return queryset.filter(**filters).order_by("-timestamp", "-id")
+
+    @action(detail=False)
+    def stats(self, request):
+        group_by = [
+            group
+            for group in request.query_params.get("group_by", "step,event").split(",")
+            if group
+        ]
+
+        unknown = set(group_by) - set(self.GROUPS)
+        if unknown:
+            raise ValidationError(
+                {"group_by": f"Unknown fields: {', '.join(sorted(unknown))}."}
+            )
+
+        stats = (
+            self.get_queryset()
+            .order_by()
+            .values(
+                *[group for group in group_by if isinstance(self.GROUPS[group], str)],
+                **{
+                    group: self.GROUPS[group]
+                    for group in group_by
+                    if not isinstance(self.GROUPS[group], str)
+                },
+            )
+            .annotate(
+                count=Count("id"),
+                avg_duration=Avg("duration"),
+                max_duration=Max("duration"),
+            )
+            .order_by("-count")
+        )
+
+        return Response(list(stats))
+
+
+class JobNotificationsView(views.APIView):
+    """
+    Server-Sent Events stream of the state changes of the Jobs, which IDs are provided with the comma separated
+    ids query parameter. The current states are sent first, and the stream ends once all the Jobs have ended.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    # interval in seconds of the comments keeping the connection alive
+    KEEPALIVE_INTERVAL = 15
+
+    def get(self, request):
+        try:
+            job_ids = {
+                int(job_id)
+                for job_id in request.query_params.get("ids", "").split(",")
+                if job_id
+            }
+        except ValueError:
+            raise ValidationError({"ids": "Comma separated Job IDs expected."})
+
+        if not job_ids:
+            raise ValidationError({"ids": "At least one Job ID is required."})
+
+        # subscribe before reading the current states, so no change is missed
+        subscription = notifications.subscribe(job_ids)
+
+        response = StreamingHttpResponse(
+            self.stream(subscription), content_type="text/event-stream"
+        )
+        response["Cache-Control"] = "no-cache"
+        # disable buffering of the stream by nginx
+        response["X-Accel-Buffering"] = "no"
+
+        return response
+
+    def stream(self, subscription):
+        try:
+            active = set()
+            for job in Job.objects.filter(id__in=subscription.job_ids).values(
+                "id", "state", "current_step", "current_step_number", "progress"
+            ):
+                yield self.event(
+                    {
+                        "job": job["id"],
+                        "state": job["state"],
+                        "step": job["current_step"],
+                        "step_number": job["current_step_number"],
+                        "progress": job["progress"],
+                    }
+                )
+                if job["state"] not in JobState.TERMINAL:
+                    active.add(job["id"])
+
+            while active:
+                payload = subscription.get(timeout=self.KEEPALIVE_INTERVAL)
+                if payload is None:
+                    yield ": keepalive\n\n"
+                    continue
+
+                yield self.event(payload)
+                if payload["state"] in JobState.TERMINAL:
+                    active.discard(payload["job"])
+        finally:
+            subscription.close()
+
+    @staticmethod
+    def event(payload):
+        return f"event: state\ndata: {json.dumps(payload)}\n\n"
 
 
 class JobLogsView(views.APIView):
@@ -37,7 +322,53 @@ class JobLogsView(views.APIView):
         except ObjectDoesNotExist:
             return Response("Job not found", status=404)
 
-        try:
+        if not os.path.exists(job.compressed_logfile):
+            if not os.path.exists(job.logfile):
+                return Response("Log file not found", status=404)
+
             return FileResponse(open(job.logfile, "rb"))
-        except FileNotFoundError:
-            return Response("Log file not found", status=404)
+
+        if os.path.exists(job.logfile):
+            # lines written after the log was compressed follow the compressed ones
+            return StreamingHttpResponse(
+                self.read(job.open_log()), content_type="text/plain"
+            )
+
+        # logs of the ended Jobs are compressed
+        if accepts_gzip(request.META.get("HTTP_ACCEPT_ENCODING", "")):
+            response = FileResponse(
+                open(job.compressed_logfile, "rb"), content_type="text/plain"
+            )
+            response["Content-Encoding"] = "gzip"
+        else:
+            response = StreamingHttpResponse(
+                self.read(job.open_log()), content_type="text/plain"
+            )
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        return response
+
+    @staticmethod
+    def read(log, chunk_size=64 * 1024):
+        with log:
+            for chunk in iter(lambda: log.read(chunk_size), b""):
+                yield chunk
+
+
+class JobProfileView(views.APIView):
+    def get(self, request, job_id):
+        try:
+            job = Job.objects.get(id=job_id)
+        except ObjectDoesNotExist:
+            return Response("Job not found", status=404)
+
+        if not os.path.exists(job.profile_file):
+            return Response("Profile not found", status=404)
+
+        # pstats file, to be loaded with e.g. "python -m pstats" or snakeviz
+        return FileResponse(
+            open(job.profile_file, "rb"),
+            as_attachment=True,
+            filename=f"job_{job.id}.prof",
+            content_type="application/octet-stream",
+        )
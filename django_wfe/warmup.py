@@ -0,0 +1,134 @@
+"""
+The module implementing the warm-up of the Dramatiq worker processes.
+
+The first Job executed by a fresh worker would otherwise pay for importing the user defined Workflows' modules
+(and the Steps' modules, pydantic models and optional dependencies imported by them). The warm-up imports
+all modules of WFE_WORKFLOWS along with the Steps of their DIGRAPHs (including MapSteps' Steps and Sub-workflows),
+builds the JSON schemas of the Steps' UserInputSchema models, and initializes the storage codecs and the rate limiter,
+so the first Job is executed as fast as the following ones.
+
+Usage (in the settings.py, executed in every worker process before it starts consuming the messages):
+DRAMATIQ_BROKER = {
+    ...
+    "MIDDLEWARE": [
+        ...
+        "django_wfe.middleware.WarmUpMiddleware",
+    ]
+}
+"""
+
+import time
+import typing
+import logging
+import importlib
+
+from django.utils.module_loading import import_string
+
+from .settings import WFE_WORKFLOWS, WFE_STORAGE_CODEC
+
+logger = logging.getLogger(__name__)
+
+
+def get_workflows_modules() -> typing.List[str]:
+    """
+    Function returning the python paths of the modules defined with WFE_WORKFLOWS setting
+
+    :return: list of the modules' paths
+    """
+    if WFE_WORKFLOWS is None:
+        return []
+
+    if isinstance(WFE_WORKFLOWS, str):
+        return [WFE_WORKFLOWS]
+
+    return list(WFE_WORKFLOWS)
+
+
+def get_workflows(module_path: str) -> typing.List[type]:
+    """
+    Function importing the module and returning the Workflows defined in it
+
+    :param module_path: python path of the module
+    :return: list of class objects inheriting from django_wfe.workflows.Workflow
+    """
+    from .workflows import WorkflowType
+
+    module = importlib.import_module(module_path)
+
+    return [cls for cls in module.__dict__.values() if isinstance(cls, WorkflowType)]
+
+
+def warm_up() -> typing.Dict:
+    """
+    Function importing and preparing all the user defined Workflows and their Steps
+
+    :return: dictionary with the numbers of the prepared Workflows and Steps, and the duration of the warm-up in seconds
+    """
+    started = time.perf_counter()
+
+    from . import rate_limits, steps
+    from .storage_codecs import get_codec
+
+    # module imported by the engine on the Jobs' end
+    from . import scheduling
+
+    workflows = []
+    for module_path in get_workflows_modules():
+        workflows += get_workflows(module_path)
+
+    codecs = {WFE_STORAGE_CODEC}
+    prepared_workflows, prepared_steps = set(), set()
+
+    while workflows:
+        WorkflowClass = workflows.pop()
+        if WorkflowClass in prepared_workflows or not WorkflowClass.DIGRAPH:
+            continue
+
+        prepared_workflows.add(WorkflowClass)
+        codecs.add(WorkflowClass.STORAGE_CODEC)
+
+        StepClasses = WorkflowClass._get_steps_classes()
+        while StepClasses:
+            StepClass = StepClasses.pop()
+            if StepClass in prepared_steps:
+                continue
+
+            prepared_steps.add(StepClass)
+
+            # pydantic models build their validators on the class creation, schemas are built on the first use
+            if StepClass.UserInputSchema.__fields__:
+                StepClass.UserInputSchema.schema()
+
+            if issubclass(StepClass, steps.MapStep) and StepClass.STEP is not None:
+                StepClasses.append(StepClass.STEP)
+
+            if (
+                issubclass(StepClass, steps.SubWorkflow)
+                and StepClass.WORKFLOW is not None
+            ):
+                workflows.append(
+                    import_string(StepClass.WORKFLOW)
+                    if isinstance(StepClass.WORKFLOW, str)
+                    else StepClass.WORKFLOW
+                )
+
+    # codecs and the rate limiter import their (optional) dependencies on the first use
+    for codec in codecs:
+        try:
+            get_codec(codec)
+        except ImportError as exception:
+            logger.warning(f"Storage codec {codec} cannot be used: {exception}")
+
+    rate_limits.get_limiter()
+
+    stats = {
+        "workflows": len(prepared_workflows),
+        "steps": len(prepared_steps),
+        "duration": time.perf_counter() - started,
+    }
+    logger.info(
+        f"Django WFE warm-up prepared {stats['workflows']} Workflows and {stats['steps']} Steps "
+        f"in {stats['duration'] * 1000:.1f} ms."
+    )
+
+    return stats
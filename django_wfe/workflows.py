@@ -12,6 +12,16 @@ class Workflow(metaclass=WorkflowType):
     """
 
     DIGRAPH = None
+    # codec serializing the Jobs' storage (WFE_STORAGE_CODEC setting, if not defined)
+    STORAGE_CODEC = None
+    # retention policy of the Steps' results (django_wfe.storage.Retention), unless defined by the Step
+    RETENTION = "keep"
+    # number of the most recent results kept with "keep_last_n" policy
+    RETENTION_LAST_N = 1
+    # maximum number of the concurrently executed Jobs of the Workflow (None: not limited)
+    MAX_CONCURRENT_JOBS = None
+    # share of the slots released to the Workflow's queued Jobs, relative to the other Workflows
+    WEIGHT = 1
 
     @classmethod
     def _get_steps_classes(cls):
@@ -11,6 +11,11 @@ setup_requires = [
     "wheel",
 ]
 
+extras_require = {
+    "orjson": ["orjson>=3.0"],
+    "msgpack": ["msgpack>=1.0", "zstandard>=0.15"],
+}
+
 setup(
     name='django-wfe',
     version=django_wfe.__version__,
@@ -40,4 +45,5 @@ setup(
     packages=find_packages(),
     include_package_data=True,
     install_requires=read_file('requirements.txt').splitlines(),
+    extras_require=extras_require,
 )